@@ -0,0 +1,53 @@
+import cv2
+import numpy as np
+from typing import List
+
+from .image import DecodedImage
+
+OUTPUT_FORMATS = ("png", "webp")
+
+def remove_background_tiled(image: DecodedImage, threshold: int = 240, strip_height: int = 256) -> np.ndarray:
+    """Return a BGRA copy of the image with near-white background made transparent.
+
+    Works in horizontal strips: color conversion writes straight into the
+    output array and the mask goes straight into its alpha channel, so the
+    only temporaries are one strip of grayscale pixels. This replaces the
+    gray, mask, split and merge copies of the whole image.
+    """
+    rgb = image.rgb
+    height, width = rgb.shape[:2]
+    bgra = np.empty((height, width, 4), dtype=np.uint8)
+    # Reuse the grayscale image if an earlier stage already built it
+    full_gray = image.cached_gray
+    strip = np.empty((min(strip_height, height), width), dtype=np.uint8)
+
+    for top in range(0, height, strip_height):
+        bottom = min(height, top + strip_height)
+        out = bgra[top:bottom]
+        cv2.cvtColor(rgb[top:bottom], cv2.COLOR_RGB2BGRA, dst=out)
+
+        gray = strip[:bottom - top]
+        if full_gray is not None:
+            gray[...] = full_gray[top:bottom]
+        else:
+            cv2.cvtColor(rgb[top:bottom], cv2.COLOR_RGB2GRAY, dst=gray)
+        cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY_INV, dst=gray)
+        out[..., 3] = gray
+
+    return bgra
+
+def encode_params(output_format: str, png_compression: int = 1, webp_quality: int = 90) -> List[int]:
+    """OpenCV encoder flags. PNG levels run 0-9; WebP quality 1-100, above 100 is lossless."""
+    if output_format == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+    if output_format == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, webp_quality]
+    raise ValueError(f"Unsupported background output format: {output_format}")
+
+def write_image(bgra: np.ndarray, output_path: str, output_format: str, params: List[int]) -> None:
+    """Encode in the requested format regardless of the path's extension."""
+    ok, encoded = cv2.imencode("." + output_format, bgra, params)
+    if not ok:
+        raise ValueError(f"Could not encode image as {output_format}")
+    with open(output_path, "wb") as f:
+        f.write(encoded.tobytes())
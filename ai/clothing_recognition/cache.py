@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ai.common.lru import LRUCache
+
+_UNCHECKED = object()
+
+class SQLiteStore:
+    """Persistent cache tier backed by a single SQLite file."""
+
+    def __init__(self, path: str = "cache/recognition.sqlite3"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS recognition_cache ("
+            " key TEXT PRIMARY KEY,"
+            " model_version TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+
+    def _connect(self) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+    def after_fork(self) -> None:
+        """Open a fresh connection; SQLite handles must not cross a fork."""
+        self._connect()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM recognition_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, model_version: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO recognition_cache (key, model_version, value, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, model_version, value, time.time())
+            )
+
+    def purge(self, keep_version: Optional[str] = None) -> None:
+        """Drop every entry, or every entry not produced by ``keep_version``."""
+        with self._lock:
+            if keep_version is None:
+                self._conn.execute("DELETE FROM recognition_cache")
+            else:
+                self._conn.execute(
+                    "DELETE FROM recognition_cache WHERE model_version != ?", (keep_version,)
+                )
+
+class RedisStore:
+    """Shared cache tier in Redis, for several recognition workers."""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        ttl_seconds: Optional[int] = 7 * 24 * 3600,
+        prefix: str = "wearmind:recognition:"
+    ):
+        import redis
+
+        # Same variable and default as Settings.REDIS_URL
+        self.client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, model_version: str, value: str) -> None:
+        self.client.set(self.prefix + key, value, ex=self.ttl_seconds)
+
+    def purge(self, keep_version: Optional[str] = None) -> None:
+        """Drop every entry, or every entry not produced by ``keep_version``."""
+        for redis_key in self.client.scan_iter(match=self.prefix + "*", count=1000):
+            if keep_version is None or not redis_key.decode().startswith(self.prefix + keep_version):
+                self.client.delete(redis_key)
+
+class RecognitionCache:
+    """Content-addressed cache of ``detect_clothing`` results.
+
+    Keys combine the model version with the caller's content key (the SHA-256
+    of the image bytes plus any setting that changes results). The model
+    version is a fingerprint of the classifier checkpoint, so replacing the
+    ``.pth`` file makes old entries unreachable; they are then purged from
+    both tiers.
+    """
+
+    def __init__(
+        self,
+        model_path: str = "models/clothing_classifier.pth",
+        memory_size: int = 1024,
+        store: Optional[Any] = None
+    ):
+        self.model_path = model_path
+        self.memory = LRUCache(max_entries=memory_size)
+        self.store = store
+        self.store_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._model_stat: Any = _UNCHECKED
+        self._model_version = ""
+        self._check_model()
+
+    @classmethod
+    def from_settings(cls, settings: Any, model_path: str = "models/clothing_classifier.pth") -> Optional["RecognitionCache"]:
+        """Build the cache described by the RECOGNITION_CACHE_* settings, or None if disabled."""
+        backend = settings.RECOGNITION_CACHE_BACKEND
+        if backend == "none":
+            return None
+        if backend == "redis":
+            store = RedisStore(settings.REDIS_URL)
+        elif backend == "sqlite":
+            store = SQLiteStore(settings.RECOGNITION_CACHE_PATH)
+        elif backend == "memory":
+            store = None
+        else:
+            raise ValueError(f"Unknown RECOGNITION_CACHE_BACKEND: {backend}")
+        return cls(model_path, memory_size=settings.RECOGNITION_CACHE_SIZE, store=store)
+
+    @property
+    def model_version(self) -> str:
+        self._check_model()
+        return self._model_version
+
+    def _check_model(self) -> None:
+        """Re-fingerprint the checkpoint if it changed on disk and invalidate stale entries."""
+        try:
+            stat = os.stat(self.model_path)
+            model_stat = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            model_stat = None
+        if model_stat == self._model_stat:
+            return
+
+        with self._lock:
+            if model_stat == self._model_stat:
+                return
+            digest = hashlib.sha256()
+            if model_stat is not None:
+                with open(self.model_path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+            self._model_stat = model_stat
+            self._model_version = digest.hexdigest()[:16]
+            self.memory.clear()
+            if self.store is not None:
+                self.store.purge(keep_version=self._model_version)
+
+    def _key(self, content_key: str) -> str:
+        return f"{self.model_version}:{content_key}"
+
+    def get(self, content_key: str) -> Optional[Dict[str, Any]]:
+        key = self._key(content_key)
+        result = self.memory.get(key)
+        if result is not None:
+            return dict(result)
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                result = json.loads(value)
+                self.memory.set(key, result)
+                self.store_hits += 1
+                return dict(result)
+        self.misses += 1
+        return None
+
+    def set(self, content_key: str, result: Dict[str, Any]) -> None:
+        key = self._key(content_key)
+        self.memory.set(key, dict(result))
+        if self.store is not None:
+            self.store.set(key, self.model_version, json.dumps(result))
+
+    def after_fork(self) -> None:
+        """Reset process-local state in a freshly forked worker."""
+        self._lock = threading.Lock()
+        self.memory = LRUCache(max_entries=self.memory.max_entries)
+        if hasattr(self.store, "after_fork"):
+            self.store.after_fork()
+
+    def invalidate(self) -> None:
+        """Drop every cached result from both tiers."""
+        self.memory.clear()
+        if self.store is not None:
+            self.store.purge()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per tier."""
+        memory_hits = self.memory.hits
+        lookups = memory_hits + self.store_hits + self.misses
+        return {
+            "model_version": self._model_version,
+            "memory_entries": len(self.memory),
+            "memory_hits": memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": (memory_hits + self.store_hits) / lookups if lookups else 0.0,
+        }
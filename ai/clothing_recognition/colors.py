@@ -0,0 +1,138 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .image import DecodedImage
+
+# Named garment colors (sRGB). Covers every name used by the style color rules.
+PALETTE: Dict[str, Tuple[int, int, int]] = {
+    "black": (20, 20, 20),
+    "charcoal": (54, 69, 79),
+    "gray": (128, 128, 128),
+    "silver": (192, 192, 192),
+    "white": (245, 245, 245),
+    "cream": (255, 253, 208),
+    "beige": (222, 204, 170),
+    "khaki": (195, 176, 145),
+    "tan": (210, 180, 140),
+    "camel": (193, 154, 107),
+    "brown": (110, 70, 40),
+    "maroon": (128, 0, 0),
+    "burgundy": (128, 0, 32),
+    "red": (200, 30, 30),
+    "coral": (255, 127, 80),
+    "orange": (245, 130, 30),
+    "mustard": (225, 173, 1),
+    "yellow": (250, 220, 50),
+    "olive": (107, 112, 40),
+    "green": (40, 140, 60),
+    "mint": (170, 240, 209),
+    "teal": (0, 128, 128),
+    "light_blue": (150, 200, 235),
+    "blue": (30, 80, 200),
+    "denim": (21, 96, 189),
+    "navy": (20, 30, 80),
+    "lavender": (190, 170, 230),
+    "purple": (110, 40, 140),
+    "pink": (250, 180, 200),
+    "magenta": (200, 30, 130),
+}
+
+# sRGB (D65) to CIE XYZ
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+], dtype=np.float32)
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883], dtype=np.float32)
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """Convert an (..., 3) array of 0-255 sRGB values to CIELAB."""
+    c = np.asarray(rgb, dtype=np.float32) / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = (c @ _RGB_TO_XYZ.T) / _D65_WHITE
+    delta = 6.0 / 29.0
+    f = np.where(xyz > delta ** 3, np.cbrt(xyz), xyz / (3 * delta ** 2) + 4.0 / 29.0)
+    return np.stack([
+        116.0 * f[..., 1] - 16.0,
+        500.0 * (f[..., 0] - f[..., 1]),
+        200.0 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+class ColorEngine:
+    """Dominant-color extraction from a quantized color histogram.
+
+    Pixels are taken from a downscaled copy of the image, optionally with the
+    near-white studio background masked out, and counted into a coarse RGB
+    histogram. Every histogram bin is mapped to its nearest palette name in
+    CIELAB once, up front, so per-image naming is a single ``bincount``.
+    """
+
+    def __init__(
+        self,
+        palette: Optional[Dict[str, Tuple[int, int, int]]] = None,
+        bits_per_channel: int = 5,
+        max_side: int = 256,
+        max_pixels: int = 20000,
+        mask_background: bool = True,
+        background_threshold: int = 240,
+        seed: int = 0
+    ):
+        palette = palette or PALETTE
+        self.names: List[str] = list(palette.keys())
+        self.palette_lab = rgb_to_lab(np.array(list(palette.values()), dtype=np.float32))
+        self.bits = bits_per_channel
+        self.max_side = max_side
+        self.max_pixels = max_pixels
+        self.mask_background = mask_background
+        self.background_threshold = background_threshold
+        self.seed = seed
+        self._bin_to_name = self._build_lookup()
+
+    def _build_lookup(self) -> np.ndarray:
+        """Map every quantized RGB bin to the index of its nearest palette color."""
+        levels = 1 << self.bits
+        step = 256 // levels
+        centers = np.arange(levels, dtype=np.float32) * step + step / 2.0
+        r, g, b = np.meshgrid(centers, centers, centers, indexing="ij")
+        bin_lab = rgb_to_lab(np.stack([r, g, b], axis=-1).reshape(-1, 3))
+        distances = ((bin_lab[:, None, :] - self.palette_lab[None, :, :]) ** 2).sum(axis=-1)
+        return distances.argmin(axis=1).astype(np.intp)
+
+    def nearest_names(self, rgb: np.ndarray) -> List[str]:
+        """Name each row of an (N, 3) RGB array by its nearest palette color in CIELAB."""
+        lab = rgb_to_lab(np.asarray(rgb, dtype=np.float32).reshape(-1, 3))
+        distances = ((lab[:, None, :] - self.palette_lab[None, :, :]) ** 2).sum(axis=-1)
+        return [self.names[i] for i in distances.argmin(axis=1)]
+
+    def sample_pixels(self, image: DecodedImage) -> np.ndarray:
+        """Return an (N, 3) uint8 sample of foreground pixels."""
+        pixels = image.downscaled(self.max_side).reshape(-1, 3)
+        if len(pixels) > self.max_pixels:
+            # A fresh generator per call: the same image always gets the same sample,
+            # whatever ran before it, and concurrent calls share no state
+            rng = np.random.default_rng(self.seed)
+            pixels = pixels[rng.choice(len(pixels), self.max_pixels, replace=False)]
+
+        if self.mask_background:
+            # Same near-white cut-off remove_background uses for studio shots
+            luma = pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+            foreground = pixels[luma <= self.background_threshold]
+            # A white garment on a white background would otherwise vanish entirely
+            if len(foreground) > 0:
+                pixels = foreground
+        return pixels
+
+    def dominant_colors(self, image: DecodedImage, num_colors: int = 3) -> List[str]:
+        """Return up to ``num_colors`` distinct palette names, most common first."""
+        pixels = self.sample_pixels(image)
+        shift = 8 - self.bits
+        q = (pixels >> shift).astype(np.intp)
+        bins = (q[:, 0] << (2 * self.bits)) | (q[:, 1] << self.bits) | q[:, 2]
+
+        # Histogram over bins, then fold bins onto palette names
+        name_counts = np.bincount(
+            self._bin_to_name[bins],
+            minlength=len(self.names)
+        )
+        order = np.argsort(-name_counts, kind="stable")[:num_colors]
+        return [self.names[i] for i in order if name_counts[i] > 0]
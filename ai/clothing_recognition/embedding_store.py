@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+class EmbeddingStore:
+    """Append-only float16 embedding file, memory-mapped, with ids and tombstones.
+
+    A store is a directory holding ``vectors.f16`` (capacity x dim),
+    ``ids.i64`` and ``alive.u1`` as raw memory-mapped arrays plus a small
+    ``meta.json``. Files grow by doubling, so adding is amortized O(batch);
+    deleting only clears the row's ``alive`` flag until ``compact`` rewrites
+    the files. Vectors are L2-normalized on add so dot products are cosine
+    similarities.
+    """
+
+    def __init__(self, path: str, dim: Optional[int] = None, initial_capacity: int = 1024):
+        """Open the store at ``path``, creating it with ``dim`` (default 2048) if it is new.
+
+        An existing store keeps its dimension; passing a different ``dim``
+        raises ValueError rather than reading its rows with the wrong width.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if dim is not None and dim != meta["dim"]:
+                raise ValueError(f"{path} holds {meta['dim']}-dimensional embeddings, not {dim}")
+            self.dim, self.count, self.capacity = meta["dim"], meta["count"], meta["capacity"]
+        else:
+            self.dim, self.count, self.capacity = dim or 2048, 0, initial_capacity
+        self._open()
+        self._rows: Dict[int, int] = {
+            int(item_id): row
+            for row, item_id in enumerate(self._ids[:self.count])
+            if self._alive[row]
+        }
+        self._write_meta()
+
+    def _open(self) -> None:
+        self._vectors = self._memmap("vectors.f16", np.float16, (self.capacity, self.dim))
+        self._ids = self._memmap("ids.i64", np.int64, (self.capacity,))
+        self._alive = self._memmap("alive.u1", np.uint8, (self.capacity,))
+
+    def _memmap(self, name: str, dtype, shape) -> np.memmap:
+        file_path = os.path.join(self.path, name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        # Create or extend the file; new bytes read as zeros
+        with open(file_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(file_path, dtype=dtype, mode="r+", shape=shape)
+
+    def _write_meta(self) -> None:
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({"dim": self.dim, "count": self.count, "capacity": self.capacity}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def _grow(self, needed: int) -> None:
+        if needed <= self.capacity:
+            return
+        self.flush()
+        while self.capacity < needed:
+            self.capacity *= 2
+        self._open()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id: int) -> bool:
+        return int(item_id) in self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Every stored row, including deleted ones; check ``alive`` before use."""
+        return self._vectors[:self.count]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self.count]
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self._alive[:self.count].view(bool)
+
+    def row_of(self, item_id: int) -> Optional[int]:
+        return self._rows.get(int(item_id))
+
+    def get(self, item_id: int) -> Optional[np.ndarray]:
+        row = self.row_of(item_id)
+        return None if row is None else np.asarray(self._vectors[row], dtype=np.float32)
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray) -> np.ndarray:
+        """Append vectors under ``ids`` (replacing existing ones) and return their rows."""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+        with self._lock:
+            self.delete(ids)
+            start = self.count
+            self._grow(start + len(ids))
+            rows = np.arange(start, start + len(ids))
+            self._vectors[rows] = vectors
+            self._ids[rows] = ids
+            self._alive[rows] = 1
+            self.count += len(ids)
+            for item_id, row in zip(ids.tolist(), rows.tolist()):
+                self._rows[item_id] = row
+            self._write_meta()
+        return rows
+
+    def delete(self, ids: Iterable[int]) -> int:
+        """Tombstone the given ids; unknown ids are ignored. Returns how many were deleted."""
+        deleted = 0
+        with self._lock:
+            for item_id in ids:
+                row = self._rows.pop(int(item_id), None)
+                if row is not None:
+                    self._alive[row] = 0
+                    deleted += 1
+        return deleted
+
+    def compact(self) -> np.ndarray:
+        """Drop deleted rows from the files; returns the old row number of each kept row."""
+        with self._lock:
+            keep = np.flatnonzero(self.alive)
+            if len(keep) == self.count:
+                return keep
+            # Compacting in place is safe because keep[i] >= i
+            for start in range(0, len(keep), 65536):
+                chunk = keep[start:start + 65536]
+                self._vectors[start:start + len(chunk)] = self._vectors[chunk]
+                self._ids[start:start + len(chunk)] = self._ids[chunk]
+            self._alive[:len(keep)] = 1
+            self._alive[len(keep):self.count] = 0
+            self.count = len(keep)
+            self._rows = {int(item_id): row for row, item_id in enumerate(self._ids[:self.count])}
+            self.flush()
+            return keep
+
+    def deleted_fraction(self) -> float:
+        return 1 - len(self._rows) / self.count if self.count else 0.0
+
+    def flush(self) -> None:
+        with self._lock:
+            for array in (self._vectors, self._ids, self._alive):
+                array.flush()
+            self._write_meta()
@@ -0,0 +1,61 @@
+from typing import TYPE_CHECKING, List
+
+import numpy as np
+
+from .image import DecodedImage, ImageSource
+
+if TYPE_CHECKING:
+    import torch
+
+class EmbeddingExtractor:
+    """Garment embeddings from the classifier's penultimate layer.
+
+    Reuses the fp32 ResNet50 of a ClothingRecognitionService with its final
+    Linear layer dropped, so no extra weights are loaded: each image becomes
+    the 2048-d pooled feature vector, L2-normalized so a dot product is the
+    cosine similarity. Follows the service if it reloads its checkpoint.
+    """
+
+    def __init__(self, service, batch_size: int = 32):
+        self.service = service
+        self.batch_size = batch_size
+        self._source = None
+        self._backbone = None
+
+    @property
+    def dim(self) -> int:
+        return self.service.base_model.fc.in_features
+
+    @property
+    def backbone(self) -> "torch.nn.Module":
+        import torch
+
+        base_model = self.service.base_model
+        if base_model is not self._source:
+            # Everything up to and including global average pooling; modules are shared, not copied
+            self._backbone = torch.nn.Sequential(*list(base_model.children())[:-1]).eval()
+            self._source = base_model
+        return self._backbone
+
+    def embed(self, images: List[ImageSource]) -> np.ndarray:
+        """(N, dim) float32 unit vectors, one per image."""
+        decoded = [DecodedImage.from_source(image) for image in images]
+        embeddings = np.empty((len(decoded), self.dim), dtype=np.float32)
+        for start in range(0, len(decoded), self.batch_size):
+            chunk = decoded[start:start + self.batch_size]
+            embeddings[start:start + len(chunk)] = self._embed_tensors(
+                [self.service.preprocess(image.pil) for image in chunk]
+            )
+        return embeddings
+
+    def embed_one(self, image: ImageSource) -> np.ndarray:
+        return self.embed([image])[0]
+
+    def _embed_tensors(self, tensors: List["torch.Tensor"]) -> np.ndarray:
+        import torch
+
+        input_batch = torch.stack(tensors).to(self.service.device)
+        with torch.no_grad():
+            features = torch.flatten(self.backbone(input_batch), 1)
+            features = torch.nn.functional.normalize(features, dim=1)
+        return features.cpu().numpy()
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import cv2
+import numpy as np
+from PIL import Image
+from typing import Dict, Optional, Tuple, Union
+
+class DecodedImage:
+    """An image decoded once and shared by every recognition stage.
+
+    The RGB array is decoded from the raw bytes on first access. Grayscale,
+    BGR, PIL and downscaled versions are derived from it lazily and cached,
+    so each stage pays only for the representations it actually uses.
+    """
+
+    def __init__(self, data: Optional[bytes] = None, rgb: Optional[np.ndarray] = None):
+        if data is None and rgb is None:
+            raise ValueError("DecodedImage needs encoded bytes or an RGB array")
+        self.data = data
+        self._rgb = rgb
+        self._bgr: Optional[np.ndarray] = None
+        self._gray: Optional[np.ndarray] = None
+        self._pil: Optional[Image.Image] = None
+        self._downscaled: Dict[int, np.ndarray] = {}
+        self._content_hash: Optional[str] = None
+
+    @classmethod
+    def from_source(cls, source: "ImageSource") -> "DecodedImage":
+        """Wrap a path, encoded bytes, array or PIL image without decoding twice."""
+        if isinstance(source, DecodedImage):
+            return source
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                return cls(data=f.read())
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return cls(data=bytes(source))
+        if isinstance(source, Image.Image):
+            image = cls(rgb=np.asarray(source.convert("RGB")))
+            if source.mode == "RGB":
+                image._pil = source
+            return image
+        if isinstance(source, np.ndarray):
+            return cls(rgb=_as_rgb(source))
+        raise TypeError(f"Unsupported image source: {type(source).__name__}")
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the encoded bytes, or of the pixel array when there are none."""
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            if self.data is not None:
+                digest.update(self.data)
+            else:
+                digest.update(str(self._rgb.shape).encode())
+                digest.update(np.ascontiguousarray(self._rgb).tobytes())
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """Decoded HxWx3 uint8 RGB array."""
+        if self._rgb is None:
+            buffer = np.frombuffer(self.data, dtype=np.uint8)
+            bgr = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+            if bgr is None:
+                raise ValueError("Could not decode image data")
+            # Convert in place rather than keeping a second full-size copy
+            self._rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=bgr)
+        return self._rgb
+
+    def decode(self) -> "DecodedImage":
+        """Decode the encoded bytes now rather than on first use; returns self."""
+        self.rgb
+        return self
+
+    @property
+    def bgr(self) -> np.ndarray:
+        """HxWx3 uint8 BGR array for OpenCV writers."""
+        if self._bgr is None:
+            self._bgr = cv2.cvtColor(self.rgb, cv2.COLOR_RGB2BGR)
+        return self._bgr
+
+    @property
+    def gray(self) -> np.ndarray:
+        """HxW uint8 grayscale array."""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY)
+        return self._gray
+
+    @property
+    def cached_gray(self) -> Optional[np.ndarray]:
+        """The grayscale array if an earlier stage already built it, else None; never converts."""
+        return self._gray
+
+    @property
+    def pil(self) -> Image.Image:
+        """PIL view of the RGB array for torchvision transforms."""
+        if self._pil is None:
+            self._pil = Image.fromarray(self.rgb)
+        return self._pil
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """(width, height) of the full-resolution image."""
+        height, width = self.rgb.shape[:2]
+        return width, height
+
+    def downscaled(self, max_side: int) -> np.ndarray:
+        """RGB array whose longer side is at most ``max_side`` pixels."""
+        if max_side not in self._downscaled:
+            height, width = self.rgb.shape[:2]
+            scale = max_side / max(height, width)
+            if scale >= 1:
+                self._downscaled[max_side] = self.rgb
+            else:
+                size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                self._downscaled[max_side] = cv2.resize(self.rgb, size, interpolation=cv2.INTER_AREA)
+        return self._downscaled[max_side]
+
+def _as_rgb(array: np.ndarray) -> np.ndarray:
+    """Normalise a caller-supplied array to HxWx3 uint8 RGB."""
+    if array.dtype != np.uint8:
+        raise ValueError("Image arrays must be uint8")
+    if array.ndim == 2:
+        return cv2.cvtColor(array, cv2.COLOR_GRAY2RGB)
+    if array.ndim == 3 and array.shape[2] == 4:
+        return cv2.cvtColor(array, cv2.COLOR_RGBA2RGB)
+    if array.ndim == 3 and array.shape[2] == 3:
+        return array
+    raise ValueError(f"Unsupported image array shape: {array.shape}")
+
+ImageSource = Union[str, os.PathLike, bytes, bytearray, memoryview, np.ndarray, Image.Image, DecodedImage]
@@ -0,0 +1,101 @@
+import copy
+import warnings
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+if TYPE_CHECKING:
+    import torch
+
+INFERENCE_MODES = ("eager", "torchscript", "compile", "dynamic_int8", "static_int8")
+
+@dataclass
+class InferenceConfig:
+    """How the classifier is compiled and run on CPU nodes.
+
+    ``mode`` is one of INFERENCE_MODES. The int8 modes only run on CPU;
+    ``dynamic_int8`` quantizes the final Linear layer only, while
+    ``static_int8`` quantizes the convolutions too and needs calibration
+    batches to pick activation ranges.
+    """
+    mode: str = "eager"
+    channels_last: bool = False
+    num_threads: Optional[int] = None
+    num_interop_threads: Optional[int] = None
+
+    def __post_init__(self):
+        if self.mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode: {self.mode}")
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "InferenceConfig":
+        return cls(
+            mode=settings.CLASSIFIER_INFERENCE_MODE,
+            channels_last=settings.CLASSIFIER_CHANNELS_LAST,
+            num_threads=settings.TORCH_NUM_THREADS,
+            num_interop_threads=settings.TORCH_NUM_INTEROP_THREADS
+        )
+
+def apply_thread_settings(config: InferenceConfig) -> None:
+    """Apply explicit intra-op and inter-op thread counts to this process."""
+    import torch
+
+    if config.num_threads:
+        torch.set_num_threads(config.num_threads)
+    if config.num_interop_threads:
+        try:
+            torch.set_num_interop_threads(config.num_interop_threads)
+        except RuntimeError:
+            # Only settable before the first inter-op parallel work in the process
+            warnings.warn("torch inter-op threads already initialised; keeping current setting")
+
+def optimize_model(
+    model: "torch.nn.Module",
+    config: InferenceConfig,
+    example_input: "torch.Tensor",
+    calibration_batches: Optional[Iterable["torch.Tensor"]] = None
+) -> "torch.nn.Module":
+    """Return an inference-ready variant of an eval-mode fp32 model.
+
+    ``model`` itself is left untouched so it can serve as the fp32 reference.
+    """
+    import torch
+
+    memory_format = torch.channels_last if config.channels_last else torch.contiguous_format
+    device = next(model.parameters()).device
+    if config.mode in ("dynamic_int8", "static_int8") and device.type != "cpu":
+        raise ValueError(f"{config.mode} inference is only supported on CPU")
+    calibration_batches = list(calibration_batches or [])
+    if config.mode == "static_int8" and not calibration_batches:
+        # Observers fed no representative data would pick meaningless ranges
+        raise ValueError("static_int8 inference needs calibration batches")
+
+    example_input = example_input.to(device).contiguous(memory_format=memory_format)
+    optimized = copy.deepcopy(model) if config.mode != "eager" or config.channels_last else model
+    optimized = optimized.to(memory_format=memory_format)
+
+    with torch.no_grad():
+        if config.mode == "torchscript":
+            optimized = torch.jit.trace(optimized, example_input)
+            optimized = torch.jit.optimize_for_inference(torch.jit.freeze(optimized))
+        elif config.mode == "compile":
+            optimized = torch.compile(optimized)
+        elif config.mode == "dynamic_int8":
+            optimized = torch.ao.quantization.quantize_dynamic(
+                optimized, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        elif config.mode == "static_int8":
+            from torch.ao.quantization import get_default_qconfig_mapping
+            from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+            prepared = prepare_fx(
+                optimized, get_default_qconfig_mapping("x86"), example_inputs=(example_input,)
+            )
+            # Observers record activation ranges from the calibration images
+            for batch in calibration_batches:
+                prepared(batch.to(device).contiguous(memory_format=memory_format))
+            optimized = convert_fx(prepared)
+
+        # First call triggers tracing/compilation so requests don't pay for it
+        optimized(example_input)
+
+    return optimized
@@ -0,0 +1,118 @@
+import gc
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .image import ImageSource
+
+# The service each forked worker serves. It is set in the parent right before
+# the workers fork, so children inherit the loaded model instead of reloading it.
+_worker_service = None
+
+class PoolBusyError(RuntimeError):
+    """Raised when the pool's pending-request bound is reached."""
+
+def _init_worker(threads_per_worker: int) -> None:
+    import torch
+    torch.set_num_threads(threads_per_worker)
+    import cv2
+    cv2.setNumThreads(threads_per_worker)
+    _worker_service.after_fork()
+
+def _ping() -> int:
+    return os.getpid()
+
+def _detect(image: ImageSource) -> Dict[str, Any]:
+    return _worker_service.detect_clothing(image)
+
+def _detect_batch(images: List[ImageSource]) -> List[Dict[str, Any]]:
+    return _worker_service.detect_clothing_batch(images)
+
+class RecognitionProcessPool:
+    """Spread ``detect_clothing`` over forked worker processes sharing one copy of the weights.
+
+    The model is loaded once in the parent and its tensors are moved into
+    shared memory before forking, so every worker maps the same pages instead
+    of holding a private copy. At most ``max_pending`` requests are queued or
+    running at once; ``submit`` blocks (or raises PoolBusyError after
+    ``timeout`` seconds) until a slot frees up.
+    """
+
+    def __init__(
+        self,
+        service: Any,
+        num_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        threads_per_worker: int = 1
+    ):
+        global _worker_service
+        import torch
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("RecognitionProcessPool needs the 'fork' start method")
+
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.num_workers
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+        # Shared-memory tensors stay shared even when a worker touches them,
+        # and frozen GC generations keep the collector from dirtying inherited pages
+        for model in (service.model, getattr(service, "base_model", None)):
+            if isinstance(model, torch.nn.Module):
+                model.share_memory()
+        gc.collect()
+        gc.freeze()
+
+        _worker_service = service
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(threads_per_worker,)
+        )
+        # The first submit forks every worker, so do it now while the parent is idle
+        self._executor.submit(_ping).result()
+
+    def submit(self, image: ImageSource, timeout: Optional[float] = None) -> Future:
+        """Queue one image; blocks while ``max_pending`` requests are outstanding."""
+        return self._submit(_detect, image, timeout)
+
+    def submit_batch(self, images: List[ImageSource], timeout: Optional[float] = None) -> Future:
+        """Queue a list of images to be classified in one worker with batched forward passes."""
+        return self._submit(_detect_batch, images, timeout)
+
+    def detect_clothing(self, image: ImageSource, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.submit(image, timeout).result()
+
+    def map(self, images: Iterable[ImageSource]) -> Iterator[Dict[str, Any]]:
+        """Classify a stream of images in order, keeping at most ``max_pending`` in flight."""
+        pending: List[Future] = []
+        for image in images:
+            if len(pending) >= self.max_pending:
+                yield pending.pop(0).result()
+            pending.append(self.submit(image))
+        for future in pending:
+            yield future.result()
+
+    def _submit(self, fn, argument: Any, timeout: Optional[float]) -> Future:
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolBusyError(f"{self.max_pending} recognition requests already pending")
+        try:
+            future = self._executor.submit(fn, argument)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        gc.unfreeze()
+
+    def __enter__(self) -> "RecognitionProcessPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,25 +1,59 @@
-import torch
-import torchvision
 import cv2
 import numpy as np
 from PIL import Image
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .background import OUTPUT_FORMATS, encode_params, remove_background_tiled, write_image
+from .batching import MicroBatcher
+from .cache import RecognitionCache
+from .colors import ColorEngine
+from .image import DecodedImage, ImageSource
+from .optimize import InferenceConfig, apply_thread_settings, optimize_model
+
+if TYPE_CHECKING:
+    import torch
+
+CALIBRATION_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+def calibration_image_paths(directory: Optional[str]) -> List[str]:
+    """Image files directly under ``directory``, in name order."""
+    if not directory:
+        return []
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.lower().endswith(CALIBRATION_EXTENSIONS)
+    ]
 
 class ClothingRecognitionService:
-    def __init__(self):
+    def __init__(
+        self,
+        model_path: str = "models/clothing_classifier.pth",
+        max_batch_size: int = 32,
+        micro_batching: bool = False,
+        max_wait_ms: float = 5.0,
+        color_method: str = "histogram",
+        cache: Optional[RecognitionCache] = None,
+        inference: Optional[InferenceConfig] = None,
+        calibration_images: Optional[List[ImageSource]] = None,
+        background_format: str = "png",
+        png_compression: int = 1,
+        webp_quality: int = 90
+    ):
+        # torch and torchvision take seconds to import, so only a service pays for them
+        import torch
+        import torchvision
+
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = self._load_model()
-        self.preprocess = torchvision.transforms.Compose([
-            torchvision.transforms.Resize(256),
-            torchvision.transforms.CenterCrop(224),
-            torchvision.transforms.ToTensor(),
-            torchvision.transforms.Normalize(
-                mean=[0.485, 0.456, 0.406],
-                std=[0.229, 0.224, 0.225]
-            )
-        ])
-        
+        self.model_path = model_path
+        self.max_batch_size = max_batch_size
+        self.inference = inference or InferenceConfig()
+        self.calibration_images = calibration_images
+        apply_thread_settings(self.inference)
+
         # Clothing categories
         self.categories = {
             0: "top",
@@ -29,6 +63,17 @@ class ClothingRecognitionService:
             4: "shoes",
             5: "accessory"
         }
+
+        self.preprocess = torchvision.transforms.Compose([
+            torchvision.transforms.Resize(256),
+            torchvision.transforms.CenterCrop(224),
+            torchvision.transforms.ToTensor(),
+            torchvision.transforms.Normalize(
+                mean=[0.485, 0.456, 0.406],
+                std=[0.229, 0.224, 0.225]
+            )
+        ])
+        self.model = self._load_model()
         
         # Color names
         self.colors = {
@@ -44,36 +89,193 @@ class ClothingRecognitionService:
             "purple": (128, 0, 128)
         }
 
-    def _load_model(self) -> torch.nn.Module:
+        # "histogram" uses the fast ColorEngine; "kmeans" keeps the original
+        # full-resolution clustering for accuracy comparisons
+        if color_method not in ("histogram", "kmeans"):
+            raise ValueError(f"Unknown color_method: {color_method}")
+        self.color_method = color_method
+        self.color_engine = ColorEngine()
+
+        # Background removal output; PNG encoding dominates its cost at high levels
+        if background_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown background_format: {background_format}")
+        self.background_format = background_format
+        self.png_compression = png_compression
+        self.webp_quality = webp_quality
+
+        # Results are cached by image content; the model is reloaded when the
+        # cache sees a new checkpoint so fresh entries come from fresh weights
+        self.cache = cache
+        self._model_lock = threading.Lock()
+        self._model_version = cache.model_version if cache is not None else None
+
+        # Optional front end that merges concurrent detect_clothing calls
+        self._batcher: Optional[MicroBatcher] = None
+        if micro_batching:
+            self.enable_micro_batching(max_batch_size, max_wait_ms)
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "ClothingRecognitionService":
+        """Build the service from the application Settings."""
+        return cls(
+            cache=RecognitionCache.from_settings(settings),
+            inference=InferenceConfig.from_settings(settings),
+            calibration_images=calibration_image_paths(settings.CLASSIFIER_CALIBRATION_DIR),
+            background_format=settings.BACKGROUND_FORMAT,
+            png_compression=settings.BACKGROUND_PNG_COMPRESSION,
+            webp_quality=settings.BACKGROUND_WEBP_QUALITY
+        )
+
+    def _load_model(self) -> "torch.nn.Module":
         """Load pre-trained ResNet model for clothing classification."""
-        model = torchvision.models.resnet50(pretrained=True)
+        import torch
+        import torchvision
+
+        # Every weight comes from our checkpoint, so skip the ImageNet download
+        model = torchvision.models.resnet50(weights=None)
         # Modify the last layer for our clothing categories
         num_ftrs = model.fc.in_features
         model.fc = torch.nn.Linear(num_ftrs, len(self.categories))
-        model.load_state_dict(torch.load("models/clothing_classifier.pth"))
+        model.load_state_dict(torch.load(self.model_path, map_location=self.device))
         model = model.to(self.device)
         model.eval()
-        return model
 
-    def detect_clothing(self, image_path: str) -> Dict[str, Any]:
-        """Detect and classify clothing in an image."""
-        # Load and preprocess image
-        image = Image.open(image_path).convert('RGB')
-        input_tensor = self.preprocess(image)
-        input_batch = input_tensor.unsqueeze(0).to(self.device)
+        # Keep the fp32 model as the reference; serve the configured variant
+        self.base_model = model
+        return optimize_model(
+            model,
+            self.inference,
+            example_input=torch.zeros(1, 3, 224, 224),
+            calibration_batches=self._calibration_batches()
+        )
+
+    def _calibration_batches(self) -> List["torch.Tensor"]:
+        """Preprocessed batches used to calibrate static int8 quantization."""
+        import torch
+
+        if self.inference.mode != "static_int8":
+            return []
+        if not self.calibration_images:
+            raise ValueError(
+                "static_int8 inference needs calibration_images (CLASSIFIER_CALIBRATION_DIR in settings)"
+            )
+        images = self.calibration_images
+        return [
+            torch.stack([
+                self.preprocess(DecodedImage.from_source(image).pil)
+                for image in images[start:start + self.max_batch_size]
+            ])
+            for start in range(0, len(images), self.max_batch_size)
+        ]
+
+    def warmup(self) -> None:
+        """Run one dummy forward pass so the first request doesn't pay for kernel setup."""
+        import torch
+
+        self._classify_tensors([torch.zeros(3, 224, 224)])
+
+    def after_fork(self) -> None:
+        """Reset threads, locks and handles that don't survive into a forked worker."""
+        # The batcher's thread only exists in the parent
+        self._batcher = None
+        self._model_lock = threading.Lock()
+        if self.cache is not None:
+            self.cache.after_fork()
+
+    def enable_micro_batching(self, max_batch_size: int = 32, max_wait_ms: float = 5.0) -> None:
+        """Route single-image classification through a shared micro-batcher."""
+        self.disable_micro_batching()
+        self._batcher = MicroBatcher(
+            self._classify_tensors,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
+        )
+
+    def disable_micro_batching(self) -> None:
+        """Stop the micro-batcher, flushing any queued requests."""
+        if self._batcher is not None:
+            self._batcher.close()
+            self._batcher = None
+
+    def detect_clothing(self, image: ImageSource) -> Dict[str, Any]:
+        """Detect and classify clothing in an image path, encoded bytes or array."""
+        # Decode once; every stage below reuses this image
+        image = DecodedImage.from_source(image)
+        cached = self._cached_result(image)
+        if cached is not None:
+            return cached
+        input_tensor = self.preprocess(image.pil)
+
+        # Get model predictions, sharing a forward pass with concurrent callers if enabled
+        if self._batcher is not None:
+            category_idx, confidence = self._batcher(input_tensor)
+        else:
+            category_idx, confidence = self._classify_tensors([input_tensor])[0]
+
+        result = self._build_result(image, category_idx, confidence)
+        self._store_result(image, result)
+        return result
+
+    def detect_clothing_batch(self, images: List[ImageSource]) -> List[Dict[str, Any]]:
+        """Detect and classify clothing in many images with batched forward passes."""
+        decoded = [DecodedImage.from_source(image) for image in images]
+        results: List[Optional[Dict[str, Any]]] = [self._cached_result(image) for image in decoded]
+
+        # Only cache misses go through the model
+        pending = [i for i, result in enumerate(results) if result is None]
+        for start in range(0, len(pending), self.max_batch_size):
+            chunk = pending[start:start + self.max_batch_size]
+            predictions = self._classify_tensors([self.preprocess(decoded[i].pil) for i in chunk])
+            for i, (category_idx, confidence) in zip(chunk, predictions):
+                results[i] = self._build_result(decoded[i], category_idx, confidence)
+                self._store_result(decoded[i], results[i])
+        return results
 
-        # Get model predictions
+    def _cache_key(self, image: DecodedImage) -> str:
+        # Quantized modes can change predictions, so they get their own entries
+        return f"{self.color_method}:{self.inference.mode}:{image.content_hash}"
+
+    def _cached_result(self, image: DecodedImage) -> Optional[Dict[str, Any]]:
+        """Return a cached result for this image, if any."""
+        if self.cache is None:
+            return None
+        self._sync_model_version()
+        return self.cache.get(self._cache_key(image))
+
+    def _store_result(self, image: DecodedImage, result: Dict[str, Any]) -> None:
+        if self.cache is not None:
+            self.cache.set(self._cache_key(image), result)
+
+    def _sync_model_version(self) -> None:
+        """Reload the classifier if its checkpoint changed since it was loaded."""
+        version = self.cache.model_version
+        if version == self._model_version:
+            return
+        with self._model_lock:
+            if version != self._model_version:
+                self.model = self._load_model()
+                self._model_version = version
+
+    def _classify_tensors(self, tensors: List["torch.Tensor"]) -> List[Tuple[int, float]]:
+        """Run one forward pass over preprocessed images and return (category, confidence) pairs."""
+        import torch
+
+        input_batch = torch.stack(tensors).to(self.device)
+        if self.inference.channels_last:
+            input_batch = input_batch.contiguous(memory_format=torch.channels_last)
         with torch.no_grad():
             output = self.model(input_batch)
-            probabilities = torch.nn.functional.softmax(output[0], dim=0)
-            category_idx = torch.argmax(probabilities).item()
-            confidence = probabilities[category_idx].item()
+            probabilities = torch.nn.functional.softmax(output, dim=1)
+            confidences, category_idxs = torch.max(probabilities, dim=1)
+        return list(zip(category_idxs.tolist(), confidences.tolist()))
 
+    def _build_result(self, image: DecodedImage, category_idx: int, confidence: float) -> Dict[str, Any]:
+        """Combine a classification with color and pattern analysis."""
         # Get dominant colors
-        colors = self._get_dominant_colors(image_path)
+        colors = self._get_dominant_colors(image)
 
         # Get pattern
-        pattern = self._detect_pattern(image_path)
+        pattern = self._detect_pattern(image)
 
         return {
             "category": self.categories[category_idx],
@@ -82,13 +284,16 @@ class ClothingRecognitionService:
             "pattern": pattern
         }
 
-    def _get_dominant_colors(self, image_path: str, num_colors: int = 3) -> List[str]:
+    def _get_dominant_colors(self, image: DecodedImage, num_colors: int = 3) -> List[str]:
         """Extract dominant colors from the image."""
-        image = cv2.imread(image_path)
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
+        if self.color_method == "kmeans":
+            return self._get_dominant_colors_kmeans(image, num_colors)
+        return self.color_engine.dominant_colors(image, num_colors)
+
+    def _get_dominant_colors_kmeans(self, image: DecodedImage, num_colors: int = 3) -> List[str]:
+        """Extract dominant colors with full-resolution k-means (legacy path)."""
         # Reshape the image to be a list of pixels
-        pixels = image.reshape(-1, 3)
+        pixels = image.rgb.reshape(-1, 3)
         
         # Perform k-means clustering
         criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 200, 0.1)
@@ -118,13 +323,10 @@ class ClothingRecognitionService:
         
         return dominant_colors
 
-    def _detect_pattern(self, image_path: str) -> str:
+    def _detect_pattern(self, image: DecodedImage) -> str:
         """Detect patterns in the clothing."""
-        image = cv2.imread(image_path)
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
         # Apply edge detection
-        edges = cv2.Canny(gray, 100, 200)
+        edges = cv2.Canny(image.gray, 100, 200)
         
         # Calculate pattern features
         edge_density = np.sum(edges) / (edges.shape[0] * edges.shape[1])
@@ -134,20 +336,38 @@ class ClothingRecognitionService:
         else:
             return "solid"
 
-    def remove_background(self, image_path: str, output_path: str) -> None:
+    def remove_background(
+        self,
+        image: ImageSource,
+        output_path: str,
+        output_format: Optional[str] = None
+    ) -> None:
         """Remove background from clothing image."""
-        image = cv2.imread(image_path)
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Apply threshold
-        _, mask = cv2.threshold(gray, 240, 255, cv2.THRESH_BINARY_INV)
-        
-        # Create transparent background
-        b, g, r = cv2.split(image)
-        rgba = [b, g, r, mask]
-        dst = cv2.merge(rgba, 4)
-        
+        image = DecodedImage.from_source(image)
+        output_format = output_format or self.background_format
+
+        # Threshold near-white pixels into the alpha channel, strip by strip
+        bgra = remove_background_tiled(image)
+
         # Save result
-        cv2.imwrite(output_path, dst) 
\ No newline at end of file
+        params = encode_params(output_format, self.png_compression, self.webp_quality)
+        write_image(bgra, output_path, output_format, params)
+
+    def remove_background_batch(
+        self,
+        jobs: List[Tuple[ImageSource, str]],
+        max_workers: Optional[int] = None,
+        output_format: Optional[str] = None
+    ) -> None:
+        """Remove backgrounds from many (image, output_path) pairs on a thread pool.
+
+        OpenCV releases the GIL while converting and encoding, so threads run
+        in parallel; at most ``max_workers`` images are decoded at a time.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            futures = [
+                pool.submit(self.remove_background, image, output_path, output_format)
+                for image, output_path in jobs
+            ]
+            for future in futures:
+                future.result()
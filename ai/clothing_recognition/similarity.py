@@ -0,0 +1,223 @@
+import os
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .embedding_store import EmbeddingStore
+
+INDEX_MODES = ("exact", "ivf")
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` largest scores, best first."""
+    if len(scores) > k:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+class SimilarityIndex:
+    """Nearest-neighbour search over an EmbeddingStore by cosine similarity.
+
+    ``exact`` scans the memory-mapped vectors in chunks, which is fine up to
+    a few hundred thousand items; most of its cost is widening float16
+    chunks, paid once per ``search`` call, so batch queries where possible.
+    ``ivf`` clusters the vectors into ``nlist`` k-means cells and only scans
+    the ``nprobe`` cells nearest each query; recall rises with ``nprobe``
+    (see benchmarks/bench_similarity_index.py). Adds and deletes are
+    incremental: new vectors join their nearest cell and deleted rows are
+    skipped until ``compact``.
+    """
+
+    def __init__(
+        self,
+        store: EmbeddingStore,
+        mode: str = "exact",
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        chunk_rows: int = 65536
+    ):
+        if mode not in INDEX_MODES:
+            raise ValueError(f"Unknown index mode: {mode}")
+        self.store = store
+        self.mode = mode
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.chunk_rows = chunk_rows
+        self._lock = threading.RLock()
+        self.centroids: Optional[np.ndarray] = None
+        # Cell of every store row, and the rows of every cell
+        self.assignments = np.empty(0, dtype=np.int32)
+        self.lists: List[np.ndarray] = []
+        if mode == "ivf":
+            self._load_ivf()
+
+    @property
+    def _ivf_path(self) -> str:
+        return os.path.join(self.store.path, "ivf.npz")
+
+    def _load_ivf(self) -> None:
+        if not os.path.exists(self._ivf_path):
+            return
+        with np.load(self._ivf_path) as saved:
+            self.centroids = saved["centroids"]
+            self.assignments = saved["assignments"]
+        self.nlist = len(self.centroids)
+        if len(self.assignments) > self.store.count:
+            # The store was compacted after the save; re-file every row
+            self.assignments = np.empty(0, dtype=np.int32)
+        # Rows added by another process since the last save
+        self._assign_new_rows()
+        self._rebuild_lists()
+
+    def save(self) -> None:
+        """Persist the store and, in ivf mode, the trained cells."""
+        with self._lock:
+            self.store.flush()
+            if self.centroids is not None:
+                np.savez(self._ivf_path, centroids=self.centroids, assignments=self.assignments)
+
+    @property
+    def trained(self) -> bool:
+        return self.mode == "exact" or self.centroids is not None
+
+    def train(self, sample_size: int = 100_000, iterations: int = 20, seed: int = 0) -> None:
+        """Fit the ivf cells with k-means on a sample of the stored vectors."""
+        if self.mode != "ivf":
+            return
+        alive_rows = np.flatnonzero(self.store.alive)
+        if len(alive_rows) == 0:
+            raise ValueError("cannot train an ivf index on an empty store")
+        rng = np.random.default_rng(seed)
+        nlist = self.nlist or max(1, int(np.sqrt(len(alive_rows))))
+        nlist = min(nlist, len(alive_rows))
+        sample_rows = np.sort(rng.choice(alive_rows, size=min(sample_size, len(alive_rows)), replace=False))
+        sample = np.asarray(self.store.vectors[sample_rows], dtype=np.float32)
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            # Spherical k-means: assign by dot product, renormalize the means
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(labels, kind="stable")
+            counts = np.bincount(labels, minlength=nlist)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            empty = counts == 0
+            sums = np.zeros_like(centroids)
+            # reduceat over rows sorted by cell; far faster than np.add.at
+            sums[~empty] = np.add.reduceat(sample[order], starts[~empty], axis=0)
+            # Re-seed empty cells from random sample points
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        with self._lock:
+            self.centroids = centroids.astype(np.float32)
+            self.nlist = nlist
+            self.assignments = np.empty(0, dtype=np.int32)
+            self._assign_new_rows()
+            self._rebuild_lists()
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(np.asarray(vectors, dtype=np.float32) @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _assign_new_rows(self) -> None:
+        start = len(self.assignments)
+        if start >= self.store.count:
+            return
+        parts = [self.assignments]
+        for chunk_start in range(start, self.store.count, self.chunk_rows):
+            parts.append(self._assign(self.store.vectors[chunk_start:chunk_start + self.chunk_rows]))
+        self.assignments = np.concatenate(parts)
+
+    def _rebuild_lists(self) -> None:
+        order = np.argsort(self.assignments, kind="stable")
+        bounds = np.searchsorted(self.assignments[order], np.arange(self.nlist + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(self.nlist)]
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray) -> None:
+        """Store vectors and, once trained, file them into their nearest cells."""
+        with self._lock:
+            rows = self.store.add(ids, vectors)
+            if self.mode == "ivf" and self.centroids is not None:
+                self._assign_new_rows()
+                cells = self.assignments[rows]
+                for cell in np.unique(cells):
+                    self.lists[cell] = np.concatenate([self.lists[cell], rows[cells == cell]])
+
+    def delete(self, ids: Iterable[int]) -> int:
+        return self.store.delete(ids)
+
+    def compact(self) -> None:
+        """Rewrite the store without deleted rows and renumber the cells."""
+        with self._lock:
+            keep = self.store.compact()
+            if self.centroids is not None:
+                self.assignments = self.assignments[keep]
+                self._rebuild_lists()
+            self.save()
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        exclude_ids: Iterable[int] = ()
+    ) -> List[List[Tuple[int, float]]]:
+        """Top ``k`` (id, cosine similarity) pairs for each query vector, best first."""
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.store.dim)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        exclude = {int(item_id) for item_id in exclude_ids}
+        # Fetch extra neighbours so excluded ids don't leave the result short
+        fetch = k + len(exclude)
+        with self._lock:
+            if self.mode == "exact" or self.centroids is None:
+                hits = self._search_exact(queries, fetch)
+            else:
+                hits = self._search_ivf(queries, fetch)
+            # Rows map to ids only until the next add or compact, so resolve them under the lock
+            ids = self.store.ids
+            return [
+                [(int(ids[row]), float(score)) for row, score in zip(rows, scores) if int(ids[row]) not in exclude][:k]
+                for rows, scores in hits
+            ]
+
+    def similar_to(self, item_id: int, k: int = 10) -> List[Tuple[int, float]]:
+        """Nearest stored items to a stored item, excluding itself."""
+        vector = self.store.get(item_id)
+        if vector is None:
+            raise KeyError(item_id)
+        return self.search(vector, k, exclude_ids=[item_id])[0]
+
+    def _search_exact(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        best_rows = [np.empty(0, dtype=np.intp) for _ in queries]
+        best_scores = [np.empty(0, dtype=np.float32) for _ in queries]
+        alive = self.store.alive
+        for start in range(0, self.store.count, self.chunk_rows):
+            chunk = np.asarray(self.store.vectors[start:start + self.chunk_rows], dtype=np.float32)
+            scores = queries @ chunk.T
+            scores[:, ~alive[start:start + len(chunk)]] = -np.inf
+            for q in range(len(queries)):
+                # Merge this chunk's best with the running best
+                top = _top_k(scores[q], k)
+                rows = np.concatenate([best_rows[q], top + start])
+                merged = np.concatenate([best_scores[q], scores[q, top]])
+                keep = _top_k(merged, k)
+                best_rows[q], best_scores[q] = rows[keep], merged[keep]
+        return [self._drop_dead(rows, scores) for rows, scores in zip(best_rows, best_scores)]
+
+    def _search_ivf(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        cell_scores = queries @ self.centroids.T
+        nprobe = min(self.nprobe, self.nlist)
+        alive = self.store.alive
+        results = []
+        for q, query in enumerate(queries):
+            cells = _top_k(cell_scores[q], nprobe)
+            rows = np.concatenate([self.lists[cell] for cell in cells])
+            rows = np.sort(rows[alive[rows]])
+            scores = np.asarray(self.store.vectors[rows], dtype=np.float32) @ query
+            top = _top_k(scores, k)
+            results.append((rows[top], scores[top]))
+        return results
+
+    @staticmethod
+    def _drop_dead(rows: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        keep = np.isfinite(scores)
+        return rows[keep], scores[keep]
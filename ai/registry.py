@@ -0,0 +1,90 @@
+import importlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+# Service name -> "module:attribute". Modules are only imported when a
+# service is first used, so a process never pays for libraries it doesn't host.
+SERVICES: Dict[str, str] = {
+    "clothing_recognition": "ai.clothing_recognition.service:ClothingRecognitionService",
+    "style_recommendation": "ai.style_recommendation.service:StyleRecommendationService",
+    "virtual_tryon": "ai.virtual_tryon.service:VirtualTryOnService",
+}
+
+Factory = Union[str, Callable[[], Any]]
+
+def _resolve(factory: Factory) -> Callable[[], Any]:
+    if callable(factory):
+        return factory
+    module_name, _, attribute = factory.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+class ModelRegistry:
+    """Process-wide, lazily loaded AI services.
+
+    Services are constructed on first ``get``, or eagerly with ``warmup``.
+    Only services this process hosts can be loaded; by default that is the
+    comma-separated AI_SERVICES environment variable, or all of them.
+    """
+
+    def __init__(self, hosted: Optional[Iterable[str]] = None, factories: Optional[Dict[str, Factory]] = None):
+        self._factories: Dict[str, Factory] = dict(factories or SERVICES)
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self.load_times: Dict[str, float] = {}
+        if hosted is None:
+            env = os.getenv("AI_SERVICES")
+            hosted = env.split(",") if env else self._factories.keys()
+        self.host(hosted)
+
+    def register(self, name: str, factory: Factory) -> None:
+        """Add or replace a service factory; an already loaded instance is dropped."""
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def host(self, names: Iterable[str]) -> None:
+        """Declare the services this process serves."""
+        names = {name.strip() for name in names if name.strip()}
+        unknown = names - set(self._factories)
+        if unknown:
+            raise ValueError(f"Unknown AI services: {', '.join(sorted(unknown))}")
+        self.hosted = names
+
+    def get(self, name: str) -> Any:
+        """Return the service, constructing it on first use."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if name not in self.hosted:
+            raise LookupError(f"AI service '{name}' is not hosted by this process")
+
+        with self._registry_lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                start = time.perf_counter()
+                instance = _resolve(self._factories[name])()
+                self.load_times[name] = time.perf_counter() - start
+                self._instances[name] = instance
+        return instance
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> None:
+        """Load hosted services now and run their warm-up inference, if any."""
+        for name in sorted(names or self.hosted):
+            service = self.get(name)
+            if hasattr(service, "warmup"):
+                service.warmup()
+
+    def unload(self, name: str) -> None:
+        """Drop a loaded service so its memory can be reclaimed."""
+        with self._registry_lock:
+            self._instances.pop(name, None)
+
+registry = ModelRegistry()
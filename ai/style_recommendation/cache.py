@@ -0,0 +1,182 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ai.common.lru import LRUCache
+
+class MemoryStore:
+    """In-process cache tier with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.entries = LRUCache(max_entries=max_entries)
+        self.generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.entries.pop(key)
+            return None
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self.entries.set(key, (time.monotonic() + ttl_seconds, value))
+
+    def generation(self, user: str) -> int:
+        return self.generations.get(user, 0)
+
+    def bump_generation(self, user: str) -> int:
+        with self._lock:
+            self.generations[user] = self.generations.get(user, 0) + 1
+            return self.generations[user]
+
+    def clear(self) -> None:
+        self.entries.clear()
+        with self._lock:
+            self.generations.clear()
+
+class RedisStore:
+    """Shared cache tier in Redis, so every API worker sees the same entries and invalidations."""
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "wearmind:recommendations:"):
+        import redis
+
+        # Same variable and default as Settings.REDIS_URL
+        self.client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl_seconds)))
+
+    def generation(self, user: str) -> int:
+        value = self.client.get(f"{self.prefix}generation:{user}")
+        return int(value) if value is not None else 0
+
+    def bump_generation(self, user: str) -> int:
+        return int(self.client.incr(f"{self.prefix}generation:{user}"))
+
+    def clear(self) -> None:
+        for redis_key in self.client.scan_iter(match=self.prefix + "*", count=1000):
+            self.client.delete(redis_key)
+
+class RecommendationCache:
+    """Cache of ``recommend_outfits`` results.
+
+    Keys combine the user's wardrobe version (or a hash of the wardrobe), the
+    profile fields the model sees, a quantized weather bucket and the
+    occasion, so a user reopening the stylist in similar weather gets the
+    same outfits without a model pass. Each user also has a generation
+    counter that is part of the key: ``invalidate`` bumps it, which makes
+    every older entry of that user unreachable until its TTL expires.
+    """
+
+    def __init__(
+        self,
+        store: Optional[Any] = None,
+        ttl_seconds: float = 3600,
+        temperature_step: float = 2.5,
+        humidity_step: float = 10,
+        precipitation_step: float = 1
+    ):
+        self.store = store if store is not None else MemoryStore()
+        self.ttl_seconds = ttl_seconds
+        # Temperature buckets share an edge with the 15°C outerwear cut-off
+        self.temperature_step = temperature_step
+        self.humidity_step = humidity_step
+        self.precipitation_step = precipitation_step
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> Optional["RecommendationCache"]:
+        """Build the cache described by the RECOMMENDATION_CACHE_* settings, or None if disabled."""
+        backend = settings.RECOMMENDATION_CACHE_BACKEND
+        if backend == "none":
+            return None
+        if backend == "redis":
+            store = RedisStore(settings.REDIS_URL)
+        elif backend == "memory":
+            store = MemoryStore(settings.RECOMMENDATION_CACHE_SIZE)
+        else:
+            raise ValueError(f"Unknown RECOMMENDATION_CACHE_BACKEND: {backend}")
+        return cls(store, ttl_seconds=settings.RECOMMENDATION_CACHE_TTL)
+
+    def weather_bucket(self, weather: Dict[str, Any]) -> List[int]:
+        """Weather rounded down to coarse steps; small changes keep the same bucket."""
+        return [
+            math.floor(weather.get("temperature", 20) / self.temperature_step),
+            math.floor(weather.get("humidity", 50) / self.humidity_step),
+            math.floor(weather.get("precipitation", 0) / self.precipitation_step),
+        ]
+
+    def key(
+        self,
+        user_profile: Dict[str, Any],
+        weather: Dict[str, Any],
+        occasion: str,
+        variant: Any = None
+    ) -> str:
+        """Cache key for one request; ``variant`` carries service settings that change results."""
+        wardrobe_version = user_profile.get("wardrobe_version")
+        if wardrobe_version is None:
+            wardrobe_version = hashlib.sha256(
+                json.dumps(user_profile.get("wardrobe", []), sort_keys=True, default=str).encode()
+            ).hexdigest()
+        parts = [
+            wardrobe_version,
+            # The profile fields used by _prepare_features
+            user_profile.get("height", 0),
+            user_profile.get("weight", 0),
+            user_profile.get("preferred_style", "casual"),
+            self.weather_bucket(weather),
+            occasion.lower(),
+            variant,
+        ]
+        digest = hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()[:32]
+        user = str(user_profile.get("id"))
+        return f"{user}:{self.store.generation(user)}:{digest}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        value = self.store.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, recommendations: List[Dict[str, Any]]) -> None:
+        self.store.set(key, json.dumps(recommendations, default=str), self.ttl_seconds)
+
+    def invalidate(self, user_id: Any) -> None:
+        """Drop every cached result of one user, e.g. after a wardrobe or profile change."""
+        self.store.bump_generation(str(user_id))
+        with self._lock:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for sizing the TTL and weather buckets."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,66 @@
+import argparse
+import os
+from typing import Optional
+
+import numpy as np
+
+LAYERS = ("fc1", "fc2", "fc3")
+
+def export_npz(model_path: str, npz_path: Optional[str] = None) -> str:
+    """Write the Linear weights of a StyleNet ``.pth`` to an ``.npz`` file and return its path."""
+    import torch
+
+    npz_path = npz_path or os.path.splitext(model_path)[0] + ".npz"
+    state = torch.load(model_path, map_location="cpu")
+    arrays = {}
+    for layer in LAYERS:
+        arrays[f"{layer}.weight"] = state[f"{layer}.weight"].float().numpy()
+        arrays[f"{layer}.bias"] = state[f"{layer}.bias"].float().numpy()
+    np.savez(npz_path, **arrays)
+    return npz_path
+
+class NumpyStyleNet:
+    """StyleNet forward pass (eval mode) as three float32 matmuls.
+
+    Weights are stored pre-transposed so a (N, 7) batch goes through
+    ``x @ W + b`` without copies; dropout is a no-op at inference. Export a
+    checkpoint with ``python -m ai.style_recommendation.numpy_model``.
+    """
+
+    def __init__(self, npz_path: str):
+        with np.load(npz_path) as arrays:
+            self.layers = [
+                (
+                    np.ascontiguousarray(arrays[f"{layer}.weight"].T, dtype=np.float32),
+                    arrays[f"{layer}.bias"].astype(np.float32)
+                )
+                for layer in LAYERS
+            ]
+        self.input_size = self.layers[0][0].shape[0]
+        self.num_classes = self.layers[-1][0].shape[1]
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        """Logits for a (7,) feature vector or a (N, 7) batch."""
+        x = np.asarray(features, dtype=np.float32)
+        (w1, b1), (w2, b2), (w3, b3) = self.layers
+        x = np.maximum(x @ w1 + b1, 0)
+        x = np.maximum(x @ w2 + b2, 0)
+        return x @ w3 + b3
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores along the last axis, highest first."""
+    return np.argsort(-scores, axis=-1, kind="stable")[..., :k]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export StyleNet weights for torch-free inference.")
+    parser.add_argument("model_path", nargs="?", default="models/style_recommender.pth")
+    parser.add_argument("--output", help="defaults to the model path with an .npz extension")
+    args = parser.parse_args()
+    print(export_npz(args.model_path, args.output))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+from .wardrobe_index import WardrobeIndex, item_colors
+
+class ColorCompatibility:
+    """``color_rules`` compiled into a symmetric color-by-color score matrix.
+
+    Pairs named in either direction of the rules score 1.0, a color with
+    itself scores ``same_color`` (tonal outfits are fine, not great), and
+    everything else, including colors the rules don't know, scores 0.
+    """
+
+    def __init__(self, color_rules: Dict[str, List[str]], same_color: float = 0.5):
+        names = sorted(set(color_rules) | {c for matches in color_rules.values() for c in matches})
+        self.index = {name: i for i, name in enumerate(names)}
+        # The last row/column stands for unknown colors
+        self.matrix = np.zeros((len(names) + 1, len(names) + 1), dtype=np.float32)
+        for color, matches in color_rules.items():
+            for match in matches:
+                self.matrix[self.index[color], self.index[match]] = 1.0
+                self.matrix[self.index[match], self.index[color]] = 1.0
+        np.fill_diagonal(self.matrix[:-1, :-1], same_color)
+        self.unknown = len(names)
+
+    def lookup(self, colors: List[Optional[str]]) -> np.ndarray:
+        return np.array([self.index.get(color, self.unknown) for color in colors], dtype=np.intp)
+
+class OutfitSearch:
+    """Beam search for the highest-scoring outfits in one style.
+
+    Each slot's candidates are pruned to the ``candidates_per_slot`` items
+    whose colors go best with the other slots' candidates; the pairwise
+    compatibility matrix is then built over that small pool only, so cost
+    does not grow with wardrobe size. A partial outfit's score is the sum of
+    compatibilities between all its items. Once ``time_budget`` seconds are
+    spent, the beam narrows to ``top_k`` so the search still completes.
+    """
+
+    def __init__(
+        self,
+        index: WardrobeIndex,
+        colors: ColorCompatibility,
+        beam_width: int = 32,
+        candidates_per_slot: int = 64,
+        time_budget: float = 0.05,
+        style_weight: float = 0.5
+    ):
+        self.index = index
+        self.colors = colors
+        self.beam_width = beam_width
+        self.candidates_per_slot = candidates_per_slot
+        self.time_budget = time_budget
+        self.style_weight = style_weight
+        # Main color of every wardrobe item, as a row of the color matrix
+        self.item_color = colors.lookup([(item_colors(item) or [None])[0] for item in index.items])
+
+    def top_k(self, style: str, slots: List[str], k: int, rng: np.random.Generator) -> List[Tuple[Dict[str, Any], float]]:
+        """Best ``k`` outfits as ({slot: item}, score), highest score first.
+
+        ``slots`` are wardrobe categories; slots with no candidates are left out.
+        """
+        deadline = time.perf_counter() + self.time_budget
+        pools = [(slot, self.index.select(style=style, category=slot)) for slot in slots]
+        pools = [(slot, candidates) for slot, candidates in pools if len(candidates)]
+        if not pools:
+            return []
+        pools = self._prune(pools, rng)
+
+        # Compatibility between every pair of candidates across all slots
+        universe = np.concatenate([candidates for _, candidates in pools])
+        pair_scores = self._pair_scores(universe)
+        offsets = np.cumsum([0] + [len(candidates) for _, candidates in pools])
+
+        # beams[b] holds positions into ``universe``, one per filled slot
+        beams = np.arange(offsets[0], offsets[1], dtype=np.intp)[:, None]
+        scores = np.zeros(len(beams), dtype=np.float32)
+
+        for slot_number in range(1, len(pools)):
+            width = k if time.perf_counter() > deadline else self.beam_width
+            options = np.arange(offsets[slot_number], offsets[slot_number + 1], dtype=np.intp)
+            # (beams, options): gain of adding each option to each partial outfit
+            gains = pair_scores[beams][:, :, options].sum(axis=1)
+            expanded = (scores[:, None] + gains).ravel()
+            beam_ids, option_ids = np.divmod(np.arange(expanded.size), len(options))
+            beams = np.concatenate([beams[beam_ids], options[option_ids][:, None]], axis=1)
+            beams, scores = self._keep_best(beams, expanded, max(width, k))
+
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [
+            (
+                {slot: self.index.items[universe[position]] for (slot, _), position in zip(pools, beams[b])},
+                float(scores[b])
+            )
+            for b in order
+        ]
+
+    def _prune(self, pools: List[Tuple[str, np.ndarray]], rng: np.random.Generator) -> List[Tuple[str, np.ndarray]]:
+        """Keep each slot's candidates whose colors best match the rest of the pool."""
+        matrix = self.colors.matrix
+        color_counts = [np.bincount(self.item_color[candidates], minlength=len(matrix)) for _, candidates in pools]
+        total_counts = np.sum(color_counts, axis=0)
+        pruned = []
+        for i, (slot, candidates) in enumerate(pools):
+            if len(candidates) <= self.candidates_per_slot:
+                pruned.append((slot, candidates))
+                continue
+            affinity = matrix[self.item_color[candidates]] @ (total_counts - color_counts[i])
+            # Random jitter breaks ties so equally good items take turns
+            affinity = affinity + rng.random(len(candidates)) * 1e-3
+            keep = np.argpartition(-affinity, self.candidates_per_slot - 1)[:self.candidates_per_slot]
+            pruned.append((slot, candidates[keep]))
+        return pruned
+
+    def _pair_scores(self, positions: np.ndarray) -> np.ndarray:
+        """Color compatibility plus weighted style-tag overlap (Jaccard) for every pair."""
+        colors = self.item_color[positions]
+        scores = self.colors.matrix[colors[:, None], colors[None, :]]
+
+        tags = [set(self.index.items[p].get("style_tags") or []) for p in positions]
+        vocabulary = {tag: i for i, tag in enumerate(sorted(set().union(*tags)))}
+        if vocabulary:
+            multi_hot = np.zeros((len(positions), len(vocabulary)), dtype=np.float32)
+            for row, item_tags in enumerate(tags):
+                multi_hot[row, [vocabulary[tag] for tag in item_tags]] = 1.0
+            shared = multi_hot @ multi_hot.T
+            sizes = multi_hot.sum(axis=1)
+            union = sizes[:, None] + sizes[None, :] - shared
+            scores = scores + self.style_weight * np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+        return scores.astype(np.float32)
+
+    @staticmethod
+    def _keep_best(beams: np.ndarray, scores: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(scores) <= width:
+            return beams, scores
+        keep = np.argpartition(-scores, width - 1)[:width]
+        return beams[keep], scores[keep]
@@ -1,18 +1,40 @@
-import torch
-import torch.nn as nn
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 import os
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-import pandas as pd
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, repeat
+
+from ai.common.lru import LRUCache
+from .cache import RecommendationCache
+from .numpy_model import NumpyStyleNet, softmax, top_k
+from .outfit_search import ColorCompatibility, OutfitSearch
+from .wardrobe_index import WardrobeIndex
 
 class StyleRecommendationService:
-    def __init__(self):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    def __init__(
+        self,
+        model_path: str = "models/style_recommender.pth",
+        index_cache_size: int = 256,
+        outfit_mode: str = "sample",
+        search_width: int = 32,
+        search_time_budget: float = 0.05,
+        result_cache: Optional[RecommendationCache] = None,
+        inference_backend: str = "auto",
+        numpy_path: Optional[str] = None
+    ):
+        self.model_path = model_path
+        # Weights exported by ai.style_recommendation.numpy_model
+        self.numpy_path = numpy_path or os.path.splitext(model_path)[0] + ".npz"
+        self.inference_backend = self._resolve_backend(inference_backend)
+        self.device = None
         self.model = self._load_model()
-        self.scaler = StandardScaler()
+        self._scaler = None
         self.style_clusters = None
+        self._local = threading.local()
+        # Wardrobe indexes by (user id, wardrobe version)
+        self._indexes = LRUCache(max_entries=index_cache_size)
+        self.result_cache = result_cache
         
         # Style categories
         self.style_categories = {
@@ -38,14 +60,77 @@ class StyleRecommendationService:
             "pink": ["white", "black", "gray", "navy"],
             "purple": ["white", "black", "gray", "navy"]
         }
+        
+        # "sample" draws random outfits; "search" returns the best-scoring ones
+        if outfit_mode not in ("sample", "search"):
+            raise ValueError(f"Unknown outfit_mode: {outfit_mode}")
+        self.outfit_mode = outfit_mode
+        self.search_width = search_width
+        self.search_time_budget = search_time_budget
+        self.color_compatibility = ColorCompatibility(self.color_rules)
     
-    def _load_model(self) -> nn.Module:
+    @classmethod
+    def from_settings(cls, settings: Any, result_cache: Optional[RecommendationCache] = None) -> "StyleRecommendationService":
+        """Build the service from the application Settings."""
+        if result_cache is None:
+            result_cache = RecommendationCache.from_settings(settings)
+        return cls(result_cache=result_cache, inference_backend=settings.STYLE_INFERENCE_BACKEND)
+
+    @property
+    def _rng(self) -> np.random.Generator:
+        """Per-thread random generator; Generators must not be shared across threads."""
+        rng = getattr(self._local, "rng", None)
+        if rng is None:
+            rng = self._local.rng = np.random.default_rng()
+        return rng
+
+    @property
+    def scaler(self):
+        """Feature scaler; sklearn is imported on first use since it is slow to import."""
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+            self._scaler = StandardScaler()
+        return self._scaler
+
+    def _resolve_backend(self, backend: str) -> str:
+        """"numpy" needs an exported .npz; "auto" uses it unless the .pth is newer."""
+        if backend not in ("auto", "numpy", "torch"):
+            raise ValueError(f"Unknown inference backend: {backend}")
+        if backend != "auto":
+            return backend
+        if not os.path.exists(self.numpy_path):
+            return "torch"
+        if os.path.exists(self.model_path) and os.path.getmtime(self.model_path) > os.path.getmtime(self.numpy_path):
+            # The export is stale
+            return "torch"
+        return "numpy"
+
+    def _load_model(self) -> Any:
         """Load pre-trained style recommendation model."""
+        if self.inference_backend == "numpy":
+            return NumpyStyleNet(self.numpy_path)
+        import torch
+        from .model import StyleNet
+
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         model = StyleNet()
-        model.load_state_dict(torch.load("models/style_recommender.pth"))
+        model.load_state_dict(torch.load(self.model_path, map_location=self.device))
         model = model.to(self.device)
         model.eval()
         return model
+
+    def _style_logits(self, features: np.ndarray) -> np.ndarray:
+        """StyleNet logits for a (N, 7) float32 feature matrix."""
+        if self.inference_backend == "numpy":
+            return self.model(features)
+        import torch
+
+        with torch.no_grad():
+            return self.model(torch.from_numpy(features).to(self.device)).cpu().numpy()
+
+    def warmup(self) -> None:
+        """Run one dummy forward pass so the first request doesn't pay for kernel setup."""
+        self._style_logits(np.zeros((1, 7), dtype=np.float32))
     
     def recommend_outfits(
         self,
@@ -55,19 +140,109 @@ class StyleRecommendationService:
         num_recommendations: int = 5
     ) -> List[Dict[str, Any]]:
         """Generate outfit recommendations based on user profile and context."""
+        cache_key = self._result_key(user_profile, weather, occasion, num_recommendations)
+        if cache_key is not None:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         # Prepare input features
         features = self._prepare_features(user_profile, weather, occasion)
         
         # Get style predictions
-        with torch.no_grad():
-            features_tensor = torch.FloatTensor(features).unsqueeze(0).to(self.device)
-            style_scores = self.model(features_tensor)
-            style_probs = torch.softmax(style_scores, dim=1)
+        style_scores = self._style_logits(features.astype(np.float32)[None])
+        style_probs = softmax(style_scores)
         
         # Get top style categories
-        top_styles = torch.topk(style_probs, k=3, dim=1)[1].squeeze().tolist()
+        top_styles = top_k(style_probs, 3)[0].tolist()
         
-        # Generate outfit recommendations
+        recommendations = self._outfits_for_styles(user_profile, weather, occasion, top_styles, num_recommendations)
+        if cache_key is not None:
+            self.result_cache.set(cache_key, recommendations)
+        return recommendations
+    
+    def recommend_outfits_batch(
+        self,
+        profiles: Iterable[Dict[str, Any]],
+        weather_by_region: Dict[str, Dict[str, Any]],
+        occasion: str,
+        num_recommendations: int = 5,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 1024
+    ) -> Iterator[Tuple[Any, List[Dict[str, Any]]]]:
+        """Yield (user id, recommendations) for many users, in input order.
+
+        Each profile's ``region`` selects its weather from ``weather_by_region``
+        (falling back to the "default" entry). Profiles are consumed in chunks:
+        one feature matrix and one StyleNet pass per chunk, with outfit
+        generation fanned out over a thread pool. Only one chunk of results is
+        held in memory at a time. Users with a cached result skip the model.
+        """
+        profiles = iter(profiles)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while True:
+                chunk = list(islice(profiles, chunk_size))
+                if not chunk:
+                    return
+                weathers = [self._region_weather(profile, weather_by_region) for profile in chunk]
+                keys = [
+                    self._result_key(profile, weather, occasion, num_recommendations)
+                    for profile, weather in zip(chunk, weathers)
+                ]
+                results: List[Optional[List[Dict[str, Any]]]] = [
+                    self.result_cache.get(key) if key is not None else None for key in keys
+                ]
+                misses = [i for i, result in enumerate(results) if result is None]
+                
+                if misses:
+                    miss_profiles = [chunk[i] for i in misses]
+                    miss_weathers = [weathers[i] for i in misses]
+                    features = self._prepare_feature_matrix(miss_profiles, miss_weathers, occasion)
+                    
+                    # Get style predictions for the whole chunk at once
+                    top_styles = top_k(self._style_logits(features), 3).tolist()
+                    
+                    generated = pool.map(
+                        self._outfits_for_styles,
+                        miss_profiles,
+                        miss_weathers,
+                        repeat(occasion),
+                        top_styles,
+                        repeat(num_recommendations)
+                    )
+                    for i, recommendations in zip(misses, generated):
+                        results[i] = recommendations
+                        if keys[i] is not None:
+                            self.result_cache.set(keys[i], recommendations)
+                
+                for profile, recommendations in zip(chunk, results):
+                    yield profile.get("id"), recommendations
+    
+    def _result_key(
+        self,
+        user_profile: Dict[str, Any],
+        weather: Dict[str, Any],
+        occasion: str,
+        num_recommendations: int
+    ) -> Optional[str]:
+        """Result cache key, or None when caching is off or the user is anonymous."""
+        if self.result_cache is None or user_profile.get("id") is None:
+            return None
+        return self.result_cache.key(
+            user_profile, weather, occasion, variant=(num_recommendations, self.outfit_mode)
+        )
+    
+    def _outfits_for_styles(
+        self,
+        user_profile: Dict[str, Any],
+        weather: Dict[str, Any],
+        occasion: str,
+        top_styles: List[int],
+        num_recommendations: int
+    ) -> List[Dict[str, Any]]:
+        """Generate outfits for the predicted styles, best style first."""
+        # Generate outfit recommendations from one index of the wardrobe
+        index = self._wardrobe_index(user_profile)
         recommendations = []
         for style_idx in top_styles:
             style_name = list(self.style_categories.keys())[style_idx]
@@ -76,12 +251,56 @@ class StyleRecommendationService:
                 user_profile,
                 weather,
                 occasion,
-                num_recommendations
+                num_recommendations,
+                index=index
             )
             recommendations.extend(outfits)
         
         return recommendations[:num_recommendations]
     
+    def _region_weather(self, user_profile: Dict[str, Any], weather_by_region: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        return weather_by_region.get(user_profile.get("region"), weather_by_region.get("default", {}))
+    
+    def _prepare_feature_matrix(
+        self,
+        profiles: List[Dict[str, Any]],
+        weathers: List[Dict[str, Any]],
+        occasion: str
+    ) -> np.ndarray:
+        """Build the (N, 7) float32 feature matrix for many users, matching _prepare_features."""
+        matrix = np.empty((len(profiles), 7), dtype=np.float32)
+        
+        # User profile features
+        matrix[:, :3] = [
+            (
+                profile.get("height", 0),
+                profile.get("weight", 0),
+                self.style_categories.get(profile.get("preferred_style", "casual"), 0)
+            )
+            for profile in profiles
+        ]
+        
+        # Weather features; regions share dicts, so gather from one row per region
+        rows: Dict[int, int] = {}
+        table = []
+        region_rows = np.empty(len(weathers), dtype=np.intp)
+        for i, weather in enumerate(weathers):
+            row = rows.get(id(weather))
+            if row is None:
+                row = rows[id(weather)] = len(table)
+                table.append((
+                    weather.get("temperature", 20),
+                    weather.get("humidity", 50),
+                    weather.get("precipitation", 0)
+                ))
+            region_rows[i] = row
+        matrix[:, 3:6] = np.array(table, dtype=np.float32).reshape(-1, 3)[region_rows]
+        
+        # Occasion feature
+        matrix[:, 6] = self._get_occasion_score(occasion)
+        
+        return matrix
+    
     def _prepare_features(
         self,
         user_profile: Dict[str, Any],
@@ -121,98 +340,123 @@ class StyleRecommendationService:
         }
         return occasion_scores.get(occasion.lower(), 0.0)
     
+    def _wardrobe_index(self, user_profile: Dict[str, Any]) -> WardrobeIndex:
+        """Index of the user's wardrobe, reused across calls when a wardrobe version is given."""
+        wardrobe_items = user_profile.get("wardrobe", [])
+        version = user_profile.get("wardrobe_version")
+        if version is None:
+            return WardrobeIndex(wardrobe_items)
+        key = (user_profile.get("id"), version)
+        index = self._indexes.get(key)
+        if index is None:
+            index = WardrobeIndex(wardrobe_items)
+            self._indexes.set(key, index)
+        return index
+
     def _generate_outfits_for_style(
         self,
         style: str,
         user_profile: Dict[str, Any],
         weather: Dict[str, Any],
         occasion: str,
-        num_outfits: int
+        num_outfits: int,
+        index: Optional[WardrobeIndex] = None
     ) -> List[Dict[str, Any]]:
         """Generate outfit combinations for a specific style."""
-        outfits = []
-        
-        # Get user's wardrobe items
-        wardrobe_items = user_profile.get("wardrobe", [])
-        
-        # Filter items by style
-        style_items = [
-            item for item in wardrobe_items
-            if style in item.get("style_tags", [])
-        ]
+        if index is None:
+            index = self._wardrobe_index(user_profile)
+        if self.outfit_mode == "search":
+            return self._search_outfits(index, style, weather, occasion, num_outfits)
+        return self._create_outfits(index, style, weather, occasion, num_outfits)
+    
+    def _search_outfits(
+        self,
+        index: WardrobeIndex,
+        style: str,
+        weather: Dict[str, Any],
+        occasion: str,
+        num_outfits: int
+    ) -> List[Dict[str, Any]]:
+        """Best-scoring outfits by color compatibility and shared style tags."""
+        slots = ["top", "bottom", "shoes", "accessory"]
+        # Select outerwear based on temperature
+        if weather.get("temperature", 20) < 15:
+            slots.insert(2, "outerwear")
         
-        # Generate outfit combinations
-        for _ in range(num_outfits):
-            outfit = self._create_outfit(
-                style_items,
+        search = OutfitSearch(
+            index,
+            self.color_compatibility,
+            beam_width=self.search_width,
+            time_budget=self.search_time_budget
+        )
+        outfits = []
+        for items, score in search.top_k(style, slots, num_outfits, self._rng):
+            outfit = {
+                "top": items.get("top"),
+                "bottom": items.get("bottom"),
+                "outerwear": items.get("outerwear"),
+                "shoes": items.get("shoes"),
+                "accessories": [items["accessory"]] if "accessory" in items else [],
+                "score": score
+            }
+            outfit["style_explanation"] = self._generate_style_explanation(
+                outfit,
                 style,
                 weather,
                 occasion
             )
-            if outfit:
-                outfits.append(outfit)
-        
+            outfits.append(outfit)
         return outfits
     
-    def _create_outfit(
+    def _create_outfits(
         self,
-        items: List[Dict[str, Any]],
+        index: WardrobeIndex,
         style: str,
         weather: Dict[str, Any],
-        occasion: str
-    ) -> Dict[str, Any]:
-        """Create a single outfit combination."""
+        occasion: str,
+        num_outfits: int
+    ) -> List[Dict[str, Any]]:
+        """Create outfit combinations, drawing each slot for every outfit at once."""
         # Select items based on weather and occasion
         temperature = weather.get("temperature", 20)
         
-        outfit = {
-            "top": None,
-            "bottom": None,
-            "outerwear": None,
-            "shoes": None,
-            "accessories": []
-        }
-        
-        # Select top
-        tops = [item for item in items if item["category"] == "top"]
-        if tops:
-            outfit["top"] = np.random.choice(tops)
-        
-        # Select bottom
-        bottoms = [item for item in items if item["category"] == "bottom"]
-        if bottoms:
-            outfit["bottom"] = np.random.choice(bottoms)
-        
+        slots = ["top", "bottom", "shoes"]
         # Select outerwear based on temperature
         if temperature < 15:
-            outerwear = [item for item in items if item["category"] == "outerwear"]
-            if outerwear:
-                outfit["outerwear"] = np.random.choice(outerwear)
-        
-        # Select shoes
-        shoes = [item for item in items if item["category"] == "shoes"]
-        if shoes:
-            outfit["shoes"] = np.random.choice(shoes)
-        
-        # Select accessories
-        accessories = [item for item in items if item["category"] == "accessory"]
-        if accessories:
-            num_accessories = min(3, len(accessories))
-            outfit["accessories"] = list(np.random.choice(
-                accessories,
-                size=num_accessories,
-                replace=False
-            ))
-        
-        # Add style explanation
-        outfit["style_explanation"] = self._generate_style_explanation(
-            outfit,
-            style,
-            weather,
-            occasion
+            slots.append("outerwear")
+        draws = {
+            slot: index.sample(index.select(style=style, category=slot), num_outfits, self._rng)
+            for slot in slots
+        }
+        
+        # Select up to three distinct accessories per outfit
+        accessory_draws = index.sample_distinct(
+            index.select(style=style, category="accessory"), num_outfits, 3, self._rng
         )
         
-        return outfit
+        outfits = []
+        for i in range(num_outfits):
+            outfit = {
+                "top": None,
+                "bottom": None,
+                "outerwear": None,
+                "shoes": None,
+                "accessories": [index.items[position] for position in accessory_draws[i]]
+            }
+            for slot, positions in draws.items():
+                if positions is not None:
+                    outfit[slot] = index.items[positions[i]]
+            
+            # Add style explanation
+            outfit["style_explanation"] = self._generate_style_explanation(
+                outfit,
+                style,
+                weather,
+                occasion
+            )
+            outfits.append(outfit)
+        
+        return outfits
     
     def _generate_style_explanation(
         self,
@@ -234,19 +478,9 @@ class StyleRecommendationService:
         
         return explanation.strip()
 
-class StyleNet(nn.Module):
-    def __init__(self, input_size: int = 7, hidden_size: int = 64, num_classes: int = 7):
-        super(StyleNet, self).__init__()
-        self.fc1 = nn.Linear(input_size, hidden_size)
-        self.fc2 = nn.Linear(hidden_size, hidden_size)
-        self.fc3 = nn.Linear(hidden_size, num_classes)
-        self.relu = nn.ReLU()
-        self.dropout = nn.Dropout(0.2)
-    
-    def forward(self, x):
-        x = self.relu(self.fc1(x))
-        x = self.dropout(x)
-        x = self.relu(self.fc2(x))
-        x = self.dropout(x)
-        x = self.fc3(x)
-        return x 
\ No newline at end of file
+def __getattr__(name: str):
+    # StyleNet moved to .model; resolve it lazily so importing this module doesn't import torch
+    if name == "StyleNet":
+        from .model import StyleNet
+        return StyleNet
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,77 @@
+import numpy as np
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+def item_colors(item: Dict[str, Any]) -> List[str]:
+    """All color names of a wardrobe item, main color first."""
+    colors = []
+    if item.get("color"):
+        colors.append(item["color"])
+    for color in item.get("color_palette") or item.get("colors") or []:
+        if color not in colors:
+            colors.append(color)
+    return colors
+
+class WardrobeIndex:
+    """A user's wardrobe bucketed by category, style tag, season and color.
+
+    Each bucket is a sorted NumPy array of positions into ``items``, so
+    filters are array intersections and outfit sampling is a vectorized draw
+    instead of a scan of the wardrobe per slot and per outfit.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = list(items)
+        self.ids = np.array([item.get("id", i) for i, item in enumerate(self.items)])
+
+        buckets: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for position, item in enumerate(self.items):
+            buckets[("category", item.get("category"))].append(position)
+            for tag in item.get("style_tags") or []:
+                buckets[("style", tag)].append(position)
+            for season in item.get("seasons") or []:
+                buckets[("season", season)].append(position)
+            for color in item_colors(item):
+                buckets[("color", color)].append(position)
+        # Items can list a tag twice; buckets must stay sorted and unique for intersect1d
+        self.buckets = {key: np.unique(np.array(positions, dtype=np.intp)) for key, positions in buckets.items()}
+        self._empty = np.empty(0, dtype=np.intp)
+        self._selections: Dict[Tuple[Tuple[str, str], ...], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def bucket(self, kind: str, value: Any) -> np.ndarray:
+        return self.buckets.get((kind, value), self._empty)
+
+    def select(self, **filters: Any) -> np.ndarray:
+        """Positions of items matching every filter, e.g. ``select(style="casual", category="top")``."""
+        key = tuple(sorted(filters.items()))
+        if key not in self._selections:
+            if not filters:
+                result = np.arange(len(self.items), dtype=np.intp)
+            else:
+                arrays = sorted((self.bucket(kind, value) for kind, value in key), key=len)
+                result = arrays[0]
+                for array in arrays[1:]:
+                    if len(result) == 0:
+                        break
+                    result = np.intersect1d(result, array, assume_unique=True)
+            self._selections[key] = result
+        return self._selections[key]
+
+    def sample(self, candidates: np.ndarray, count: int, rng: np.random.Generator) -> Optional[np.ndarray]:
+        """``count`` independent draws (with replacement) from ``candidates``, or None if empty."""
+        if len(candidates) == 0:
+            return None
+        return candidates[rng.integers(0, len(candidates), size=count)]
+
+    def sample_distinct(self, candidates: np.ndarray, count: int, per_draw: int, rng: np.random.Generator) -> np.ndarray:
+        """``count`` draws of ``per_draw`` distinct candidates each, as a (count, k) array."""
+        k = min(per_draw, len(candidates))
+        if k == 0:
+            return np.empty((count, 0), dtype=np.intp)
+        # Smallest k of random keys per row is a uniform sample without replacement
+        keys = rng.random((count, len(candidates)))
+        picks = np.argpartition(keys, k - 1, axis=1)[:, :k]
+        return candidates[picks]
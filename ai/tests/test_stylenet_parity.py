@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from ai.style_recommendation.model import StyleNet
+from ai.style_recommendation.numpy_model import NumpyStyleNet, export_npz, top_k
+
+def features(count: int = 512, seed: int = 0) -> np.ndarray:
+    """Rows shaped like _prepare_feature_matrix output, in realistic ranges."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(150, 200, count),       # height
+        rng.uniform(40, 120, count),        # weight
+        rng.integers(0, 7, count),          # preferred style
+        rng.uniform(-10, 40, count),        # temperature
+        rng.uniform(0, 100, count),         # humidity
+        rng.uniform(0, 20, count),          # precipitation
+        rng.choice([0.0, 0.3, 0.6, 0.9], count),  # occasion
+    ]).astype(np.float32)
+
+@pytest.fixture(scope="module")
+def models(tmp_path_factory):
+    torch.manual_seed(0)
+    reference = StyleNet()
+    reference.eval()
+    model_path = str(tmp_path_factory.mktemp("stylenet") / "style_recommender.pth")
+    torch.save(reference.state_dict(), model_path)
+    return reference, NumpyStyleNet(export_npz(model_path))
+
+def test_logits_match_torch(models):
+    reference, numpy_model = models
+    x = features()
+    with torch.no_grad():
+        expected = reference(torch.from_numpy(x)).numpy()
+    scale = max(1.0, float(np.abs(expected).max()))
+    assert np.abs(numpy_model(x) - expected).max() / scale < 1e-4
+    # A single (7,) row goes through the same path as a batch
+    assert np.abs(numpy_model(x[0]) - expected[0]).max() / scale < 1e-4
+
+def test_top_k_matches_torch(models):
+    reference, numpy_model = models
+    x = features()
+    with torch.no_grad():
+        expected = reference(torch.from_numpy(x)).numpy()
+    np.testing.assert_array_equal(top_k(numpy_model(x), 3), top_k(expected, 3))
@@ -1,65 +1,260 @@
-import torch
-from diffusers import StableDiffusionPipeline, ControlNetModel, UniPCMultistepScheduler
-from diffusers.utils import load_image
+import cv2
 import numpy as np
 from PIL import Image
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, Callable, Iterator, List, Dict, Any, Optional, Tuple
+import hashlib
 import os
 
+from ai.common.lru import LRUCache
+from .video import StreamingVideoWriter
+
+if TYPE_CHECKING:
+    import torch
+    from diffusers import ControlNetModel, StableDiffusionControlNetPipeline
+
+DEFAULT_PROMPT = "A person wearing the clothing item"
+DEFAULT_NEGATIVE_PROMPT = "ugly, blurry, bad anatomy, bad proportions"
+
+# torch and diffusers take seconds to import, so they are imported where the
+# models are built and run; importing this module stays cheap
+
+def load_image(source: Any) -> Image.Image:
+    from diffusers.utils import load_image as diffusers_load_image
+    return diffusers_load_image(source)
+
 class VirtualTryOnService:
-    def __init__(self):
+    def __init__(
+        self,
+        prompt_cache_size: int = 256,
+        prompt_cache_bytes: int = 64 * 2**20,
+        control_cache_size: int = 64,
+        control_cache_bytes: int = 256 * 2**20
+    ):
+        import torch
+
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.controlnet = self._load_controlnet()
         self.pipeline = self._load_pipeline()
+        # Image-to-image view of the same components, for frames refined from earlier latents
+        self._refiner = None
+        # Tiny VAE decoder for previews, loaded on first use
+        self._tiny_vae = None
         
-    def _load_controlnet(self) -> ControlNetModel:
+        # Text embeddings by prompt, and control images by person-image content hash
+        self.prompt_cache = LRUCache(
+            max_entries=prompt_cache_size,
+            max_bytes=prompt_cache_bytes,
+            sizeof=lambda embeds: embeds.element_size() * embeds.nelement()
+        )
+        self.control_cache = LRUCache(
+            max_entries=control_cache_size,
+            max_bytes=control_cache_bytes,
+            sizeof=lambda image: image.width * image.height * len(image.getbands())
+        )
+        
+    def _load_controlnet(self) -> "ControlNetModel":
         """Load ControlNet model for pose and body shape control."""
+        import torch
+        from diffusers import ControlNetModel
+
         controlnet = ControlNetModel.from_pretrained(
             "lllyasviel/ControlNet",
             torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32
         )
         return controlnet.to(self.device)
     
-    def _load_pipeline(self) -> StableDiffusionPipeline:
+    def _load_pipeline(self) -> "StableDiffusionControlNetPipeline":
         """Load Stable Diffusion pipeline with ControlNet."""
-        pipeline = StableDiffusionPipeline.from_pretrained(
+        import torch
+        from diffusers import StableDiffusionControlNetPipeline, UniPCMultistepScheduler
+
+        pipeline = StableDiffusionControlNetPipeline.from_pretrained(
             "runwayml/stable-diffusion-v1-5",
             controlnet=self.controlnet,
             torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32
         )
+        # The garment photo conditions generation through an IP-Adapter
+        pipeline.load_ip_adapter("h94/IP-Adapter", subfolder="models", weight_name="ip-adapter_sd15.bin")
         pipeline.scheduler = UniPCMultistepScheduler.from_config(pipeline.scheduler.config)
         pipeline = pipeline.to(self.device)
         return pipeline
     
+    @property
+    def refiner(self):
+        """ControlNet img2img pipeline sharing every weight with ``self.pipeline``."""
+        if self._refiner is None:
+            from diffusers import StableDiffusionControlNetImg2ImgPipeline
+            self._refiner = StableDiffusionControlNetImg2ImgPipeline(**self.pipeline.components)
+        return self._refiner
+    
     def generate_tryon(
         self,
         person_image: str,
         clothing_image: str,
-        prompt: str = "A person wearing the clothing item",
-        negative_prompt: str = "ugly, blurry, bad anatomy, bad proportions",
+        prompt: str = DEFAULT_PROMPT,
+        negative_prompt: str = DEFAULT_NEGATIVE_PROMPT,
         num_inference_steps: int = 20,
-        guidance_scale: float = 7.5
+        guidance_scale: float = 7.5,
+        progress: Optional[Callable[[int, int], None]] = None
     ) -> Image.Image:
-        """Generate virtual try-on image."""
+        """Generate virtual try-on image.
+
+        ``progress(steps_done, total_steps)`` is called after every denoising
+        step; an exception raised from it aborts generation.
+        """
         # Load and preprocess images
         person_img = load_image(person_image)
         clothing_img = load_image(clothing_image)
         
         # Generate control image (pose estimation)
-        control_image = self._get_control_image(person_img)
+        control_image = self._cached_control_image(person_img)
+        prompt_embeds, negative_prompt_embeds = self._encode_prompts([prompt], negative_prompt)
         
         # Generate try-on image
         image = self.pipeline(
-            prompt=prompt,
+            prompt_embeds=prompt_embeds,
+            negative_prompt_embeds=negative_prompt_embeds,
             image=control_image,
-            clothing_image=clothing_img,
-            negative_prompt=negative_prompt,
+            ip_adapter_image=clothing_img,
             num_inference_steps=num_inference_steps,
-            guidance_scale=guidance_scale
+            guidance_scale=guidance_scale,
+            callback_on_step_end=self._step_callback(progress, num_inference_steps)
         ).images[0]
         
         return image
     
+    def generate_tryon_progressive(
+        self,
+        person_image: str,
+        clothing_image: str,
+        prompt: str = DEFAULT_PROMPT,
+        negative_prompt: str = DEFAULT_NEGATIVE_PROMPT,
+        num_inference_steps: int = 20,
+        guidance_scale: float = 7.5,
+        preview_size: int = 256,
+        preview_steps: int = 6,
+        size: int = 512,
+        refine_strength: float = 0.6,
+        tiny_vae: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Iterator[Tuple[str, Image.Image]]:
+        """Yield ("preview", image) within a few steps, then ("final", image).
+
+        The preview is denoised at ``preview_size`` with ``preview_steps``
+        steps and decoded with the tiny VAE if ``tiny_vae`` is set. The final
+        image is not generated from scratch: the preview's latents are
+        upscaled to ``size`` and refined with the last ``refine_strength``
+        share of ``num_inference_steps``. Stop iterating after the preview to
+        skip the refinement.
+        """
+        person_img = load_image(person_image)
+        clothing_img = load_image(clothing_image)
+        control_image = self._cached_control_image(person_img)
+        prompt_embeds, negative_prompt_embeds = self._encode_prompts([prompt], negative_prompt)
+        refine_steps = min(int(num_inference_steps * refine_strength), num_inference_steps)
+        callback = self._step_callback(progress, preview_steps + refine_steps)
+        
+        # Fast low-resolution pass
+        latents = self.pipeline(
+            prompt_embeds=prompt_embeds,
+            negative_prompt_embeds=negative_prompt_embeds,
+            image=control_image,
+            ip_adapter_image=clothing_img,
+            height=preview_size,
+            width=preview_size,
+            num_inference_steps=preview_steps,
+            guidance_scale=guidance_scale,
+            output_type="latent",
+            callback_on_step_end=callback
+        ).images
+        yield "preview", self._decode_latents(latents, self.tiny_vae if tiny_vae else None)[0]
+        
+        # Refine from the upscaled preview latents at full resolution
+        import torch
+
+        latents = torch.nn.functional.interpolate(latents, size=(size // 8, size // 8), mode="bicubic")
+        image = self.refiner(
+            prompt_embeds=prompt_embeds,
+            negative_prompt_embeds=negative_prompt_embeds,
+            image=latents,
+            control_image=control_image,
+            ip_adapter_image=clothing_img,
+            height=size,
+            width=size,
+            strength=refine_strength,
+            num_inference_steps=num_inference_steps,
+            guidance_scale=guidance_scale,
+            callback_on_step_end=callback
+        ).images[0]
+        yield "final", image
+    
+    def _encode_prompts(self, prompts: List[str], negative_prompt: str) -> Tuple["torch.Tensor", "torch.Tensor"]:
+        """Text embeddings for each prompt and a matching stack of the negative prompt.
+
+        Embeddings come from ``prompt_cache``; the misses are encoded together
+        in one text-encoder pass.
+        """
+        import torch
+
+        unique = list(dict.fromkeys(prompts + [negative_prompt]))
+        embeds = {prompt: self.prompt_cache.get(prompt) for prompt in unique}
+        missing = [prompt for prompt, cached in embeds.items() if cached is None]
+        if missing:
+            with torch.no_grad():
+                encoded, _ = self.pipeline.encode_prompt(
+                    missing, self.device, num_images_per_prompt=1, do_classifier_free_guidance=False
+                )
+            for prompt, prompt_embeds in zip(missing, encoded):
+                # Copy out of the batch so the cache doesn't pin the whole batch tensor
+                embeds[prompt] = prompt_embeds = prompt_embeds.clone()
+                self.prompt_cache.set(prompt, prompt_embeds)
+        prompt_embeds = torch.stack([embeds[prompt] for prompt in prompts])
+        return prompt_embeds, embeds[negative_prompt].expand(len(prompts), -1, -1)
+    
+    def _cached_control_image(self, image: Image.Image) -> Image.Image:
+        """Control image for a person photo, reused across garments tried on the same photo."""
+        key = hashlib.sha256(f"{image.mode}:{image.size}:".encode() + image.tobytes()).hexdigest()
+        control_image = self.control_cache.get(key)
+        if control_image is None:
+            control_image = self._get_control_image(image)
+            self.control_cache.set(key, control_image)
+        return control_image
+    
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit rates and memory use of the prompt and control-image caches."""
+        return {"prompt_embeds": self.prompt_cache.stats(), "control_images": self.control_cache.stats()}
+    
+    def _step_callback(self, progress: Optional[Callable[[int, int], None]], total_steps: int):
+        """A diffusers ``callback_on_step_end`` counting steps across pipeline calls."""
+        if progress is None:
+            return None
+        done = [0]
+        
+        def on_step_end(pipeline, step, timestep, callback_kwargs):
+            done[0] += 1
+            progress(done[0], total_steps)
+            return callback_kwargs
+        
+        return on_step_end
+    
+    @property
+    def tiny_vae(self):
+        """TAESD, a distilled VAE decoder that is far cheaper than the full one at some cost in detail."""
+        if self._tiny_vae is None:
+            from diffusers import AutoencoderTiny
+            self._tiny_vae = AutoencoderTiny.from_pretrained(
+                "madebyollin/taesd", torch_dtype=self.pipeline.vae.dtype
+            ).to(self.device)
+        return self._tiny_vae
+    
+    def _decode_latents(self, latents: "torch.Tensor", vae=None) -> List[Image.Image]:
+        import torch
+
+        vae = vae or self.pipeline.vae
+        with torch.no_grad():
+            images = vae.decode(latents / vae.config.scaling_factor, return_dict=False)[0]
+        return self.pipeline.image_processor.postprocess(images, output_type="pil")
+    
     def _get_control_image(self, image: Image.Image) -> Image.Image:
         """Generate control image for pose and body shape."""
         # Convert to numpy array
@@ -92,22 +287,98 @@ class VirtualTryOnService:
         person_image: str,
         clothing_image: str,
         num_frames: int = 30,
-        output_path: str = "output.mp4"
+        output_path: str = "output.mp4",
+        num_inference_steps: int = 20,
+        guidance_scale: float = 7.5,
+        batch_size: int = 4,
+        refine_strength: Optional[float] = 0.4,
+        negative_prompt: str = DEFAULT_NEGATIVE_PROMPT,
+        progress: Optional[Callable[[int, int], None]] = None,
+        fps: int = 30,
+        segment_seconds: Optional[float] = None
     ) -> None:
-        """Generate try-on video with different poses."""
-        frames = []
+        """Generate try-on video with different poses.
+
+        Both images are decoded, the control image built and every prompt
+        encoded once for the whole video, and frames run through the
+        pipeline ``batch_size`` at a time. With ``refine_strength`` set, only
+        the first frame is denoised from noise: the others start from its
+        latents and run the last ``refine_strength`` share of the steps.
+        ``refine_strength=None`` denoises every frame in full. ``progress``
+        works as in ``generate_tryon``, counting the steps of every batch.
+
+        Frames are encoded as soon as each batch is done, so memory does not
+        grow with ``num_frames``. With ``segment_seconds`` set,
+        ``output_path`` is an HLS ``.m3u8`` playlist of H.264 MPEG-TS
+        segments that appear while the video renders.
+        """
+        # Shared conditioning for every frame
+        person_img = load_image(person_image)
+        clothing_img = load_image(clothing_image)
+        control_image = self._cached_control_image(person_img)
+        prompts = [f"{DEFAULT_PROMPT}, pose {i+1}/{num_frames}" for i in range(num_frames)]
+        prompt_embeds, negative_prompt_embeds = self._encode_prompts(prompts, negative_prompt)
         
-        for i in range(num_frames):
-            # Generate frame with slightly different pose
-            frame = self.generate_tryon(
-                person_image,
-                clothing_image,
-                prompt=f"A person wearing the clothing item, pose {i+1}/{num_frames}"
-            )
-            frames.append(frame)
+        # Denoising steps the whole video takes, for progress reporting
+        if refine_strength is None:
+            total_steps = -(-num_frames // batch_size) * num_inference_steps
+        else:
+            refine_steps = min(int(num_inference_steps * refine_strength), num_inference_steps)
+            total_steps = num_inference_steps + -(-(num_frames - 1) // batch_size) * refine_steps
+        callback = self._step_callback(progress, total_steps)
         
-        # Save as video
-        self._save_frames_as_video(frames, output_path)
+        writer = StreamingVideoWriter(
+            output_path, fps=fps, max_buffered=2 * batch_size, segment_seconds=segment_seconds
+        )
+        try:
+            start = 0
+            keyframe = None
+            if refine_strength is not None:
+                # Generate the keyframe whose latents seed the remaining frames
+                keyframe = self.pipeline(
+                    prompt_embeds=prompt_embeds[:1],
+                    negative_prompt_embeds=negative_prompt_embeds[:1],
+                    image=control_image,
+                    ip_adapter_image=clothing_img,
+                    num_inference_steps=num_inference_steps,
+                    guidance_scale=guidance_scale,
+                    output_type="latent",
+                    callback_on_step_end=callback
+                ).images
+                for frame in self._decode_latents(keyframe):
+                    writer.write(frame)
+                start = 1
+            
+            for batch_start in range(start, num_frames, batch_size):
+                batch = slice(batch_start, min(batch_start + batch_size, num_frames))
+                count = batch.stop - batch.start
+                if keyframe is None:
+                    output = self.pipeline(
+                        prompt_embeds=prompt_embeds[batch],
+                        negative_prompt_embeds=negative_prompt_embeds[batch],
+                        image=control_image,
+                        ip_adapter_image=[clothing_img] * count,
+                        num_inference_steps=num_inference_steps,
+                        guidance_scale=guidance_scale,
+                        callback_on_step_end=callback
+                    )
+                else:
+                    # Latents are passed as the init image, so the VAE encoder is skipped
+                    output = self.refiner(
+                        prompt_embeds=prompt_embeds[batch],
+                        negative_prompt_embeds=negative_prompt_embeds[batch],
+                        image=keyframe.expand(count, -1, -1, -1),
+                        control_image=control_image,
+                        ip_adapter_image=[clothing_img] * count,
+                        strength=refine_strength,
+                        num_inference_steps=num_inference_steps,
+                        guidance_scale=guidance_scale,
+                        callback_on_step_end=callback
+                    )
+                for frame in output.images:
+                    writer.write(frame)
+        finally:
+            writer.close()
     
     def _save_frames_as_video(
         self,
@@ -116,21 +387,6 @@ class VirtualTryOnService:
         fps: int = 30
     ) -> None:
         """Save frames as video file."""
-        import cv2
-        import numpy as np
-        
-        # Get frame dimensions
-        width, height = frames[0].size
-        
-        # Create video writer
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        video = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-        
-        # Write frames
-        for frame in frames:
-            # Convert PIL Image to OpenCV format
-            frame_cv = cv2.cvtColor(np.array(frame), cv2.COLOR_RGB2BGR)
-            video.write(frame_cv)
-        
-        # Release video writer
-        video.release() 
\ No newline at end of file
+        with StreamingVideoWriter(output_path, fps=fps) as writer:
+            for frame in frames:
+                writer.write(frame)
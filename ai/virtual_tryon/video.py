@@ -0,0 +1,158 @@
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import List, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+Frame = Union[Image.Image, np.ndarray]
+
+# Marks the end of the frame stream
+_CLOSE = object()
+
+def ffmpeg_binary() -> str:
+    """ffmpeg on the PATH, else the static build shipped with imageio-ffmpeg."""
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        raise RuntimeError("ffmpeg not found: install it or the imageio-ffmpeg package")
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+class StreamingVideoWriter:
+    """Encodes frames on a background thread as they are produced.
+
+    ``write`` hands a frame to a queue of at most ``max_buffered`` frames and
+    blocks when it is full, so memory stays bounded however long the video
+    is. Frames are RGB (PIL images or arrays) and piped one at a time by the
+    encoder thread to ffmpeg, which writes H.264 (yuv420p) that browsers
+    play: a faststart MP4 by default.
+
+    With ``segment_seconds`` set, the output is HLS instead: MPEG-TS
+    segments next to ``output_path`` and an event playlist that ffmpeg
+    updates as each segment completes, so playback can start before the
+    render finishes. ``output_path`` then names the ``.m3u8`` playlist.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        fps: int = 30,
+        max_buffered: int = 8,
+        segment_seconds: Optional[float] = None,
+        codec: str = "libx264",
+        crf: int = 23
+    ):
+        self.output_path = output_path
+        self.fps = fps
+        self.segment_seconds = segment_seconds
+        self.codec = codec
+        self.crf = crf
+        self.frames_written = 0
+        self._queue: "queue.Queue" = queue.Queue(max_buffered)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._process: Optional[subprocess.Popen] = None
+        self._log = None
+        self._thread = threading.Thread(target=self._run, name="video-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "StreamingVideoWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write(self, frame: Frame) -> None:
+        """Queue one frame, waiting while the encoder is ``max_buffered`` frames behind."""
+        if self._error is not None:
+            raise RuntimeError("video encoding failed") from self._error
+        self._queue.put(frame)
+
+    def close(self) -> None:
+        """Flush queued frames, finish the file or playlist and re-raise encoder errors."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("video encoding failed") from self._error
+
+    def _command(self, width: int, height: int) -> List[str]:
+        command = [
+            ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-",
+            # yuv420p needs even dimensions
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-c:v", self.codec, "-crf", str(self.crf), "-preset", "veryfast", "-pix_fmt", "yuv420p",
+        ]
+        if self.segment_seconds is None:
+            return command + ["-movflags", "+faststart", self.output_path]
+        stem = os.path.splitext(self.output_path)[0]
+        return command + [
+            # A keyframe at every segment boundary, so segments cut on time
+            "-force_key_frames", f"expr:gte(t,n_forced*{self.segment_seconds})",
+            "-f", "hls",
+            "-hls_time", str(self.segment_seconds),
+            "-hls_list_size", "0",
+            "-hls_playlist_type", "event",
+            "-hls_segment_type", "mpegts",
+            "-hls_segment_filename", f"{stem}_%05d.ts",
+            # Playlist updates are written to a temp file and renamed
+            "-hls_flags", "independent_segments+temp_file",
+            self.output_path,
+        ]
+
+    def _start(self, width: int, height: int) -> None:
+        self._log = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            self._command(width, height), stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._log
+        )
+
+    def _run(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is _CLOSE:
+                break
+            if self._error is not None:
+                # Keep draining so producers never block on a dead encoder
+                continue
+            try:
+                self._encode(frame)
+            except BaseException as exc:
+                self._error = exc
+        try:
+            self._finish()
+        except BaseException as exc:
+            self._error = self._error or exc
+
+    def _encode(self, frame: Frame) -> None:
+        if isinstance(frame, Image.Image) and frame.mode != "RGB":
+            frame = frame.convert("RGB")
+        pixels = np.ascontiguousarray(frame, dtype=np.uint8)
+        if self._process is None:
+            height, width = pixels.shape[:2]
+            self._start(width, height)
+        self._process.stdin.write(pixels.tobytes())
+        self.frames_written += 1
+
+    def _finish(self) -> None:
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self._process.wait()
+        self._log.seek(0)
+        message = self._log.read().decode(errors="replace").strip()
+        self._log.close()
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with status {returncode}: {message}")
@@ -0,0 +1,108 @@
+"""Initial schema
+
+Tables as they were before migrations were introduced. Databases created
+earlier with ``Base.metadata.create_all`` should be stamped instead:
+``alembic stamp 0001``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+body_type = sa.Enum("HOURGLASS", "PEAR", "APPLE", "RECTANGLE", "INVERTED_TRIANGLE", name="bodytype")
+clothing_type = sa.Enum("TOP", "BOTTOM", "DRESS", "OUTERWEAR", "SHOES", "ACCESSORY", name="clothingtype")
+season = sa.Enum("SPRING", "SUMMER", "FALL", "WINTER", "ALL_SEASON", name="season")
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("full_name", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "user_profiles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("gender", sa.String()),
+        sa.Column("height", sa.Float()),
+        sa.Column("weight", sa.Float()),
+        sa.Column("body_type", body_type),
+        sa.Column("skin_tone", sa.String()),
+        sa.Column("measurements", sa.JSON()),
+        sa.Column("preferred_styles", sa.JSON()),
+        sa.Column("color_preferences", sa.JSON()),
+        sa.Column("brand_preferences", sa.JSON()),
+        sa.Column("virtual_model_path", sa.String(), nullable=True),
+    )
+    op.create_index("ix_user_profiles_id", "user_profiles", ["id"])
+
+    op.create_table(
+        "wardrobe_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("name", sa.String()),
+        sa.Column("type", clothing_type),
+        sa.Column("brand", sa.String(), nullable=True),
+        sa.Column("purchase_date", sa.DateTime(), nullable=True),
+        sa.Column("purchase_price", sa.Float(), nullable=True),
+        sa.Column("image_path", sa.String()),
+        sa.Column("color", sa.String()),
+        sa.Column("pattern", sa.String(), nullable=True),
+        sa.Column("material", sa.String()),
+        sa.Column("seasons", sa.JSON()),
+        sa.Column("weather_conditions", sa.JSON()),
+        sa.Column("last_worn", sa.DateTime(), nullable=True),
+        sa.Column("wear_count", sa.Integer()),
+        sa.Column("style_tags", sa.JSON()),
+        sa.Column("color_palette", sa.JSON()),
+        sa.Column("fit_type", sa.String()),
+        sa.Column("virtual_model_path", sa.String(), nullable=True),
+    )
+    op.create_index("ix_wardrobe_items_id", "wardrobe_items", ["id"])
+
+    op.create_table(
+        "outfits",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("name", sa.String()),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("last_worn", sa.DateTime(), nullable=True),
+        sa.Column("wear_count", sa.Integer()),
+        sa.Column("style_tags", sa.JSON()),
+        sa.Column("occasion", sa.String()),
+        sa.Column("season", season),
+        sa.Column("confidence_score", sa.Float()),
+        sa.Column("style_explanation", sa.String()),
+    )
+    op.create_index("ix_outfits_id", "outfits", ["id"])
+
+    op.create_table(
+        "outfit_items",
+        sa.Column("outfit_id", sa.Integer(), sa.ForeignKey("outfits.id"), primary_key=True),
+        sa.Column("item_id", sa.Integer(), sa.ForeignKey("wardrobe_items.id"), primary_key=True),
+        sa.Column("position", sa.Integer()),
+    )
+
+def downgrade() -> None:
+    op.drop_table("outfit_items")
+    op.drop_table("outfits")
+    op.drop_table("wardrobe_items")
+    op.drop_table("user_profiles")
+    op.drop_table("users")
+    bind = op.get_bind()
+    for enum_type in (season, clothing_type, body_type):
+        enum_type.drop(bind, checkfirst=True)
@@ -0,0 +1,27 @@
+"""Wardrobe item content hashes and thumbnails
+
+Adds wardrobe_items.image_hash (indexed), which bulk ingestion uses to skip
+photos already in an owner's wardrobe, and wardrobe_items.thumbnail_path.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001a"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("wardrobe_items", sa.Column("image_hash", sa.String(), nullable=True))
+    op.add_column("wardrobe_items", sa.Column("thumbnail_path", sa.String(), nullable=True))
+    op.create_index("ix_wardrobe_items_image_hash", "wardrobe_items", ["image_hash"])
+
+def downgrade() -> None:
+    op.drop_index("ix_wardrobe_items_image_hash", table_name="wardrobe_items")
+    with op.batch_alter_table("wardrobe_items") as batch_op:
+        batch_op.drop_column("thumbnail_path")
+        batch_op.drop_column("image_hash")
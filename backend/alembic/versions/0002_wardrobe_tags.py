@@ -0,0 +1,84 @@
+"""Indexed wardrobe filters
+
+Adds wardrobe_item_tags, a normalized copy of each item's style tags,
+seasons, colors and weather conditions, backfilled from the JSON columns,
+plus (owner_id, id) and (owner_id, type, id) indexes on wardrobe_items for
+keyset-paginated listings. On PostgreSQL the indexes are built
+CONCURRENTLY so a large table stays writable during the upgrade.
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001a"
+branch_labels = None
+depends_on = None
+
+# (tag kind, item column) pairs, as in app.models.wardrobe.TAG_SOURCES
+TAG_COLUMNS = [
+    ("style", "style_tags"),
+    ("season", "seasons"),
+    ("color", "color"),
+    ("color", "color_palette"),
+    ("weather", "weather_conditions"),
+]
+
+ITEM_INDEXES = [
+    ("ix_wardrobe_items_owner_id_id", ["owner_id", "id"]),
+    ("ix_wardrobe_items_owner_type_id", ["owner_id", "type", "id"]),
+]
+
+def _create_indexes(table, indexes) -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, columns in indexes:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, columns in indexes:
+            op.create_index(name, table, columns)
+
+def _backfill_sql(dialect: str, kind: str, column: str, scalar: bool) -> str:
+    if scalar:
+        source, value = "wardrobe_items", column
+    elif dialect == "postgresql":
+        source = f"wardrobe_items CROSS JOIN LATERAL json_array_elements_text(" \
+                 f"CASE WHEN json_typeof({column}) = 'array' THEN {column} ELSE '[]' END) AS tag(value)"
+        value = "tag.value"
+    else:
+        source, value = f"wardrobe_items, json_each(wardrobe_items.{column}) AS tag", "tag.value"
+    select = (
+        f"SELECT wardrobe_items.id, wardrobe_items.owner_id, '{kind}', lower(trim({value})) FROM {source} "
+        f"WHERE wardrobe_items.owner_id IS NOT NULL AND coalesce(trim({value}), '') <> ''"
+    )
+    columns = "wardrobe_item_tags (item_id, owner_id, kind, value)"
+    if dialect == "postgresql":
+        return f"INSERT INTO {columns} {select} ON CONFLICT DO NOTHING"
+    return f"INSERT OR IGNORE INTO {columns} {select}"
+
+def upgrade() -> None:
+    op.create_table(
+        "wardrobe_item_tags",
+        sa.Column("item_id", sa.Integer(), sa.ForeignKey("wardrobe_items.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("kind", sa.String(16), primary_key=True),
+        sa.Column("value", sa.String(64), primary_key=True),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+    )
+
+    # Backfill in SQL so it also works with ``--sql``; values are trimmed and
+    # lower-cased like item_tags() does for new rows
+    dialect = op.get_bind().dialect.name
+    for kind, column in TAG_COLUMNS:
+        op.execute(_backfill_sql(dialect, kind, column, scalar=column == "color"))
+
+    _create_indexes("wardrobe_items", ITEM_INDEXES)
+    _create_indexes("wardrobe_item_tags", [("ix_wardrobe_item_tags_owner_kind_value", ["owner_id", "kind", "value", "item_id"])])
+
+def downgrade() -> None:
+    op.drop_index("ix_wardrobe_item_tags_owner_kind_value", table_name="wardrobe_item_tags")
+    op.drop_table("wardrobe_item_tags")
+    for name, _ in reversed(ITEM_INDEXES):
+        op.drop_index(name, table_name="wardrobe_items")
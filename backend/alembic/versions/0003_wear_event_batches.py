@@ -0,0 +1,26 @@
+"""Wear event batch log
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "wear_event_batches",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("event_count", sa.Integer()),
+        sa.Column("applied_at", sa.DateTime()),
+    )
+    op.create_index("ix_wear_event_batches_applied_at", "wear_event_batches", ["applied_at"])
+
+def downgrade() -> None:
+    op.drop_index("ix_wear_event_batches_applied_at", table_name="wear_event_batches")
+    op.drop_table("wear_event_batches")
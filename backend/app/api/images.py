@@ -0,0 +1,70 @@
+from fastapi import APIRouter, File, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from PIL import Image, UnidentifiedImageError
+
+from app.core.config import settings
+from app.core.images import image_store
+from app.services.image_store import IMMUTABLE_CACHE_CONTROL, StoredImage, parse_range
+
+router = APIRouter()
+
+def _urls(stored: StoredImage) -> dict:
+    # Bare derivative names negotiate AVIF or WebP from the Accept header
+    return {"original": stored.url(), "thumb": stored.url("thumb"), "medium": stored.url("medium")}
+
+@router.post("", status_code=201)
+async def upload_image(file: UploadFile = File(...)):
+    """Store an image once per content hash, with its thumbnail and medium derivatives."""
+    data = await file.read(settings.IMAGE_MAX_UPLOAD_BYTES + 1)
+    if len(data) > settings.IMAGE_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    try:
+        stored = await run_in_threadpool(image_store().put, data)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as exc:
+        raise HTTPException(status_code=422, detail=f"Not a supported image: {exc}")
+    return {**stored.as_dict(), "urls": _urls(stored)}
+
+@router.get("/{image_hash}")
+async def image_manifest(image_hash: str):
+    stored = await run_in_threadpool(image_store().manifest, image_hash)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Unknown image")
+    return {**stored.as_dict(), "urls": _urls(stored)}
+
+@router.get("/{image_hash}/{variant}")
+async def serve_image(image_hash: str, variant: str, request: Request):
+    """One variant, with a strong ETag, immutable caching and single byte-range support."""
+    store = image_store()
+    stored = await run_in_threadpool(store.manifest, image_hash)
+    name = stored.variant_for(variant, request.headers.get("accept", "")) if stored is not None else None
+    if name is None:
+        raise HTTPException(status_code=404, detail="Unknown image")
+    info = stored.variants[name]
+
+    # The content hash plus the variant identify the bytes exactly
+    etag = f'"{image_hash}-{name}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if name != variant:
+        headers["Vary"] = "Accept"
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    size = info["size"]
+    byte_range = None
+    # A stale If-Range validator means the client's partial copy is useless: send it all
+    if request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        store.backend.open_range(info["key"], start, end),
+        status_code=206 if byte_range else 200,
+        headers=headers,
+        media_type=info["content_type"]
+    )
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from typing import Dict, List
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from app.core.ai import registry
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.images import image_store
+from app.core.uploads import spool_upload
+from app.services.ingestion import IngestionPipeline, path_sources
+
+router = APIRouter()
+
+# Running and recently finished ingestion jobs of this process, by id;
+# finished ones are kept for INGEST_JOB_TTL seconds so clients can read the outcome
+_jobs: Dict[str, IngestionPipeline] = {}
+_finished_at: Dict[str, float] = {}
+_jobs_lock = threading.Lock()
+
+def _evict_finished() -> None:
+    cutoff = time.monotonic() - settings.INGEST_JOB_TTL
+    with _jobs_lock:
+        for job_id, finished in list(_finished_at.items()):
+            if finished < cutoff:
+                del _finished_at[job_id]
+                _jobs.pop(job_id, None)
+
+def _run(job_id: str, pipeline: IngestionPipeline, upload_dir: str, paths: List[str]) -> None:
+    try:
+        pipeline.run(path_sources(paths, max_member_bytes=settings.IMAGE_MAX_UPLOAD_BYTES))
+    finally:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        with _jobs_lock:
+            _finished_at[job_id] = time.monotonic()
+
+@router.post("/ingest", status_code=202)
+def start_ingest(owner_id: int = Form(...), files: List[UploadFile] = File(...)):
+    """Start importing uploaded photos and zip archives; poll the returned job for progress.
+
+    A plain ``def`` so FastAPI runs it in the threadpool: spooling uploads
+    and loading the classifier on first use would otherwise block the event loop.
+    """
+    _evict_finished()
+    # Spool uploads to disk so the pipeline streams them instead of holding them in memory
+    upload_dir = tempfile.mkdtemp(prefix="wardrobe-ingest-")
+    paths = []
+    for i, upload in enumerate(files):
+        # One directory per upload keeps the original file name for the item name
+        path = os.path.join(upload_dir, str(i), os.path.basename(upload.filename or "upload.jpg"))
+        os.makedirs(os.path.dirname(path))
+        try:
+            # Archives get their own cap; every photo, in an archive or not, gets the image cap
+            size = spool_upload(upload, path, settings.INGEST_MAX_ARCHIVE_BYTES)
+            if size > settings.IMAGE_MAX_UPLOAD_BYTES and not zipfile.is_zipfile(path):
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"{upload.filename} is larger than {settings.IMAGE_MAX_UPLOAD_BYTES} bytes"
+                )
+        except HTTPException:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            raise
+        paths.append(path)
+
+    job_id = uuid.uuid4().hex
+    pipeline = IngestionPipeline(
+        session_factory=SessionLocal,
+        recognition=registry.get("clothing_recognition"),
+        owner_id=owner_id,
+        image_store=image_store(),
+        max_pixels=settings.IMAGE_MAX_PIXELS
+    )
+    with _jobs_lock:
+        _jobs[job_id] = pipeline
+    threading.Thread(
+        target=_run, args=(job_id, pipeline, upload_dir, paths), name=f"ingest-{job_id}", daemon=True
+    ).start()
+    return {"job_id": job_id}
+
+@router.get("/ingest/{job_id}")
+async def ingest_progress(job_id: str):
+    """Per-stage progress and throughput of an ingestion job."""
+    _evict_finished()
+    pipeline = _jobs.get(job_id)
+    if pipeline is None:
+        raise HTTPException(status_code=404, detail="Unknown ingestion job")
+    return pipeline.report().as_dict()
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from app.core.database import pool_stats
+from app.core.wear import wear_flusher
+
+router = APIRouter()
+
+@router.get("/db-pool")
+async def db_pool():
+    """Connection pool occupancy and counters for the sync and async engines."""
+    return pool_stats()
+
+@router.get("/wear-buffer")
+async def wear_buffer_stats():
+    """Buffered wear events and what the flusher has applied so far."""
+    return wear_flusher().stats()
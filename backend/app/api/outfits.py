@@ -0,0 +1,61 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.wear import wear_buffer
+from app.models.wardrobe import Outfit, OutfitItem
+from app.repositories.outfits import list_outfits_async
+from app.repositories.wardrobe import MAX_PAGE_SIZE
+from app.services.wear_events import WearEvent, with_pending_wears
+
+router = APIRouter()
+
+def _outfit_dict(outfit: Outfit) -> dict:
+    return {
+        "id": outfit.id,
+        "name": outfit.name,
+        "description": outfit.description,
+        "occasion": outfit.occasion,
+        "season": outfit.season.value if outfit.season is not None else None,
+        "style_tags": outfit.style_tags,
+        "item_ids": [item.id for item in outfit.items],
+        "wear_count": outfit.wear_count,
+        "last_worn": outfit.last_worn.isoformat() if outfit.last_worn else None,
+    }
+
+@router.get("")
+async def list_user_outfits(
+    owner_id: int,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Page through an owner's outfits, newest first, with wear counts including unflushed wears."""
+    try:
+        page = await list_outfits_async(db, owner_id, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    # The Redis buffer answers over the network
+    outfits = await run_in_threadpool(
+        with_pending_wears, wear_buffer(), "outfit", [_outfit_dict(outfit) for outfit in page.outfits]
+    )
+    return {"outfits": outfits, "next_cursor": page.next_cursor}
+
+@router.post("/{outfit_id}/wear", status_code=202)
+async def wear_outfit(outfit_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Record that an outfit was worn; counts are updated by the next flush."""
+    rows = (await db.execute(
+        select(Outfit.id, OutfitItem.item_id)
+        .outerjoin(OutfitItem, OutfitItem.outfit_id == Outfit.id)
+        .where(Outfit.id == outfit_id)
+    )).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Unknown outfit")
+    event = WearEvent(outfit_id, [item_id for _, item_id in rows if item_id is not None])
+    # Appending may fsync the journal
+    await run_in_threadpool(wear_buffer().append, event)
+    return {"event_id": event.id}
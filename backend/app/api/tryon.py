@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import shutil
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse, StreamingResponse
+
+from app.core.ai import registry
+from app.core.config import settings
+from app.core.uploads import spool_upload
+from app.services.tryon_jobs import (
+    TERMINAL_STATUSES,
+    create_job_queue,
+    new_job,
+    result_storage_from_settings,
+)
+
+router = APIRouter()
+
+# Floor for /jobs/{id}/events polling, so a client cannot make it spin on the job store
+MIN_POLL_INTERVAL = 0.1
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def _jobs():
+    """The process-wide job queue, created on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = create_job_queue(settings, lambda: registry.get("virtual_tryon"))
+        return _queue
+
+def _job_or_404(job_id: str):
+    job = _jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown try-on job")
+    return job
+
+def _save_upload(upload: UploadFile, directory: str, name: str) -> str:
+    extension = os.path.splitext(upload.filename or "")[1].lower() or ".jpg"
+    path = os.path.join(directory, name + extension)
+    spool_upload(upload, path, settings.IMAGE_MAX_UPLOAD_BYTES)
+    return path
+
+# The handlers below are plain functions so FastAPI runs them in its threadpool:
+# uploads, the job store and the first build of the queue all block
+
+@router.post("/jobs", status_code=202)
+def submit_job(
+    person_image: UploadFile = File(...),
+    clothing_image: UploadFile = File(...),
+    kind: str = Form("tryon"),
+    lane: Optional[str] = Form(None),
+    num_inference_steps: int = Form(20),
+    num_frames: int = Form(30)
+):
+    """Queue a try-on image or video; interactive try-ons run ahead of batch videos by default."""
+    lane = lane or ("interactive" if kind == "tryon" else "batch")
+    params = {"num_inference_steps": num_inference_steps}
+    if kind == "video":
+        params["num_frames"] = num_frames
+    try:
+        job = new_job(kind, lane, "", "", params)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    input_dir = os.path.join(settings.TRYON_JOB_INPUT_DIR, job.id)
+    os.makedirs(input_dir, exist_ok=True)
+    try:
+        job.person_image = _save_upload(person_image, input_dir, "person")
+        job.clothing_image = _save_upload(clothing_image, input_dir, "clothing")
+    except HTTPException:
+        shutil.rmtree(input_dir, ignore_errors=True)
+        raise
+    _jobs().submit(job)
+    return {"job_id": job.id}
+
+@router.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    """Status and step progress of a job."""
+    return _job_or_404(job_id).as_dict()
+
+@router.post("/jobs/{job_id}/cancel", status_code=202)
+def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one at its next denoising step."""
+    _job_or_404(job_id)
+    _jobs().cancel(job_id)
+    return _job_or_404(job_id).as_dict()
+
+@router.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    """Redirect to the finished image or video."""
+    job = _job_or_404(job_id)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return RedirectResponse(result_storage_from_settings(settings).url(job.result_key), status_code=303)
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, poll_interval: float = 0.5):
+    """Server-sent events with the job's status whenever it changes, until it finishes."""
+    await run_in_threadpool(_job_or_404, job_id)
+    poll_interval = max(poll_interval, MIN_POLL_INTERVAL)
+
+    async def events():
+        last = None
+        while True:
+            job = await run_in_threadpool(_jobs().get, job_id)
+            state = job.as_dict()
+            if state != last:
+                yield f"event: progress\ndata: {json.dumps(state)}\n\n"
+                last = state
+            if job.status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(poll_interval)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
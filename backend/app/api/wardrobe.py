@@ -0,0 +1,55 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.wear import wear_buffer
+from app.models.wardrobe import WardrobeItem
+from app.repositories.wardrobe import MAX_PAGE_SIZE, WardrobeFilter, list_items_async
+from app.services.wear_events import with_pending_wears
+
+router = APIRouter()
+
+def _item_dict(item: WardrobeItem) -> dict:
+    return {
+        "id": item.id,
+        "name": item.name,
+        "type": item.type.value if item.type is not None else None,
+        "brand": item.brand,
+        "color": item.color,
+        "pattern": item.pattern,
+        "image_path": item.image_path,
+        "thumbnail_path": item.thumbnail_path,
+        "seasons": item.seasons,
+        "style_tags": item.style_tags,
+        "color_palette": item.color_palette,
+        "weather_conditions": item.weather_conditions,
+        "wear_count": item.wear_count,
+        "last_worn": item.last_worn.isoformat() if item.last_worn else None,
+    }
+
+@router.get("/items")
+async def list_wardrobe_items(
+    owner_id: int,
+    type: List[str] = Query([]),
+    style: List[str] = Query([]),
+    season: List[str] = Query([]),
+    color: List[str] = Query([]),
+    weather: List[str] = Query([]),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Page through an owner's items, newest first; repeat a parameter to match any of several values."""
+    try:
+        filters = WardrobeFilter(owner_id, types=type, styles=style, seasons=season, colors=color, weather=weather)
+        page = await list_items_async(db, filters, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    # The Redis buffer answers over the network
+    items = await run_in_threadpool(
+        with_pending_wears, wear_buffer(), "item", [_item_dict(item) for item in page.items]
+    )
+    return {"items": items, "next_cursor": page.next_cursor}
@@ -0,0 +1,54 @@
+"""Bulk-import garment photos into a user's wardrobe.
+
+Usage (from backend/, with the repository root on PYTHONPATH):
+
+    python -m app.cli.ingest --owner-id 1 ~/closet.zip ~/more-photos/
+
+Re-running the same command after a crash skips photos that were already
+imported.
+"""
+import argparse
+import sys
+
+from app.core.ai import registry
+from app.core.database import SessionLocal
+from app.services.ingestion import IngestReport, IngestionPipeline, path_sources
+
+def print_progress(report: IngestReport) -> None:
+    stages = "  ".join(
+        f"{name} {stats['processed']} ({stats['items_per_second']}/s)"
+        for name, stats in report.stages.items()
+    )
+    print(
+        f"\r[{report.elapsed:7.1f}s] created {report.created}  skipped {report.skipped}  "
+        f"failed {len(report.failures)}  |  {stages}",
+        end="", file=sys.stderr, flush=True
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="directories, zip files or images")
+    parser.add_argument("--owner-id", type=int, required=True)
+    parser.add_argument("--output-dir", default="static/wardrobe")
+    parser.add_argument("--io-workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--write-batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    pipeline = IngestionPipeline(
+        session_factory=SessionLocal,
+        recognition=registry.get("clothing_recognition"),
+        owner_id=args.owner_id,
+        output_dir=args.output_dir,
+        io_workers=args.io_workers,
+        batch_size=args.batch_size,
+        write_batch_size=args.write_batch_size,
+        progress=print_progress
+    )
+    report = pipeline.run(path_sources(args.paths))
+    print(file=sys.stderr)
+    for name, error in report.failures:
+        print(f"failed: {name}: {error}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+from ai.registry import registry
+from ai.style_recommendation.cache import RecommendationCache
+from app.core.config import settings
+from app.services.recommendation_cache import register_invalidation
+
+# Shared by the style service and the database listeners that invalidate it,
+# so writes invalidate cached results even in processes that never load the model
+recommendation_cache = RecommendationCache.from_settings(settings)
+if recommendation_cache is not None:
+    register_invalidation(recommendation_cache)
+
+def _clothing_recognition():
+    from ai.clothing_recognition.service import ClothingRecognitionService
+    return ClothingRecognitionService.from_settings(settings)
+
+def _style_recommendation():
+    from ai.style_recommendation.service import StyleRecommendationService
+    return StyleRecommendationService.from_settings(settings, result_cache=recommendation_cache)
+
+# Services are constructed on first use; see AI_SERVICES and AI_WARMUP_ON_STARTUP
+registry.register("clothing_recognition", _clothing_recognition)
+registry.register("style_recommendation", _style_recommendation)
+registry.host(settings.AI_SERVICES.split(","))
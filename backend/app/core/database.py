@@ -1,19 +1,117 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.core.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Async drivers for the sync URL's database
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def _async_url(url: str) -> str:
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def _pool_options(url: str) -> Dict[str, Any]:
+    """Engine pool settings from Settings; SQLite keeps the dialect's own pool."""
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_pool_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for async endpoints; shares the database, not the connections
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or _async_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_options(ASYNC_DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+# Pool activity counters, by engine name
+_pool_counters: Dict[str, Dict[str, int]] = {}
+
+def _count_pool_events(name: str, pool) -> None:
+    counters = _pool_counters[name] = {"connects": 0, "checkouts": 0, "invalidations": 0}
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        counters["connects"] += 1
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        counters["checkouts"] += 1
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        counters["invalidations"] += 1
+
+_count_pool_events("sync", engine.pool)
+_count_pool_events("async", async_engine.sync_engine.pool)
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Current occupancy and lifetime counters of both connection pools."""
+    stats = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        entry: Dict[str, Any] = {"pool": type(pool).__name__, **_pool_counters[name]}
+        # Only queue pools (the default outside SQLite) track occupancy
+        if isinstance(pool, QueuePool):
+            entry.update(
+                size=pool.size(),
+                checkedin=pool.checkedin(),
+                checkedout=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        stats[name] = entry
+    return stats
+
+class QueryCounter:
+    """Counts the statements an engine sends to the database inside a ``with`` block.
+
+    Pass ``async_engine.sync_engine`` to count async sessions. A batched
+    executemany counts once per round trip.
+    """
+
+    def __init__(self, bind=None):
+        self.bind = bind if bind is not None else engine
+        self.count = 0
+        self.statements: List[str] = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.bind, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        event.remove(self.bind, "before_cursor_execute", self._on_execute)
+
 # Dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Async session dependency for ``async def`` endpoints; never blocks the event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
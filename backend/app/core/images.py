@@ -0,0 +1,15 @@
+import threading
+
+from app.core.config import settings
+from app.services.image_store import ImageStore
+
+_store = None
+_lock = threading.Lock()
+
+def image_store() -> ImageStore:
+    """The process-wide image store, created on first use."""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = ImageStore.from_settings(settings)
+        return _store
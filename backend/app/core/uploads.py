@@ -0,0 +1,18 @@
+import os
+
+from fastapi import HTTPException, UploadFile
+
+def spool_upload(upload: UploadFile, path: str, max_bytes: int, chunk_size: int = 1024 * 1024) -> int:
+    """Copy an upload to ``path`` in chunks; 413 (and no file) once it passes ``max_bytes``."""
+    written = 0
+    with open(path, "wb") as f:
+        while True:
+            chunk = upload.file.read(chunk_size)
+            if not chunk:
+                return written
+            written += len(chunk)
+            if written > max_bytes:
+                break
+            f.write(chunk)
+    os.remove(path)
+    raise HTTPException(status_code=413, detail=f"{upload.filename or 'Upload'} is larger than {max_bytes} bytes")
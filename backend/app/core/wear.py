@@ -0,0 +1,19 @@
+import threading
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.wear_events import WearEventFlusher, create_wear_buffer
+
+_flusher = None
+_lock = threading.Lock()
+
+def wear_flusher() -> WearEventFlusher:
+    """The process-wide wear buffer and its flusher, created on first use."""
+    global _flusher
+    with _lock:
+        if _flusher is None:
+            _flusher = WearEventFlusher(create_wear_buffer(settings), SessionLocal, settings.WEAR_FLUSH_INTERVAL)
+        return _flusher
+
+def wear_buffer():
+    return wear_flusher().buffer
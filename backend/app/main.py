@@ -1,6 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from app.api import images, ingest, metrics, outfits, tryon, wardrobe
+from app.core.ai import registry
+from app.core.config import settings
+from app.core.wear import wear_flusher
 
 app = FastAPI(
     title="AI CyberWardrobe API",
@@ -20,6 +24,20 @@ app.add_middleware(
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+@app.on_event("startup")
+def warm_up_ai_services():
+    # Otherwise each service loads its weights on first use
+    if settings.AI_WARMUP_ON_STARTUP:
+        registry.warmup()
+
+@app.on_event("startup")
+def start_wear_flusher():
+    wear_flusher().start()
+
+@app.on_event("shutdown")
+def flush_wear_events():
+    wear_flusher().stop()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to AI CyberWardrobe API"}
@@ -27,8 +45,13 @@ async def root():
 # Import and include routers
 # from app.api import users, wardrobe, recommendations, etc.
 # app.include_router(users.router, prefix="/api/users", tags=["users"])
-# app.include_router(wardrobe.router, prefix="/api/wardrobe", tags=["wardrobe"])
 # app.include_router(recommendations.router, prefix="/api/recommendations", tags=["recommendations"])
+app.include_router(ingest.router, prefix="/api/wardrobe", tags=["wardrobe"])
+app.include_router(wardrobe.router, prefix="/api/wardrobe", tags=["wardrobe"])
+app.include_router(outfits.router, prefix="/api/outfits", tags=["outfits"])
+app.include_router(tryon.router, prefix="/api/tryon", tags=["tryon"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
+app.include_router(images.router, prefix="/api/images", tags=["images"])
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Enum, JSON, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, Float, Enum, JSON, ForeignKey
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import enum
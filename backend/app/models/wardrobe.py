@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, Enum, JSON, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Enum, JSON, ForeignKey, DateTime, Index, delete, event, insert, inspect
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import enum
 from datetime import datetime
+from typing import Any, Dict, List, Mapping, Tuple
 
 class ClothingType(str, enum.Enum):
     TOP = "top"
@@ -34,6 +35,8 @@ class WardrobeItem(Base):
     
     # Visual attributes
     image_path = Column(String)
+    image_hash = Column(String, nullable=True, index=True)  # SHA-256 of the uploaded photo
+    thumbnail_path = Column(String, nullable=True)
     color = Column(String)
     pattern = Column(String, nullable=True)
     material = Column(String)
@@ -56,6 +59,84 @@ class WardrobeItem(Base):
     owner = relationship("User", back_populates="wardrobe")
     outfits = relationship("Outfit", secondary="outfit_items", back_populates="items")
 
+    __table_args__ = (
+        # Filtered listings page newest-first by id within one owner (and type)
+        Index("ix_wardrobe_items_owner_id_id", "owner_id", "id"),
+        Index("ix_wardrobe_items_owner_type_id", "owner_id", "type", "id"),
+    )
+
+class TagKind(str, enum.Enum):
+    STYLE = "style"
+    SEASON = "season"
+    COLOR = "color"
+    WEATHER = "weather"
+
+# Item column(s) each tag kind is derived from
+TAG_SOURCES = {
+    TagKind.STYLE: ("style_tags",),
+    TagKind.SEASON: ("seasons",),
+    TagKind.COLOR: ("color", "color_palette"),
+    TagKind.WEATHER: ("weather_conditions",),
+}
+
+class WardrobeItemTag(Base):
+    """One style tag, season, color or weather condition of an item.
+
+    A normalized copy of the item's JSON columns, kept in sync by the mapper
+    events below and by bulk writers via ``item_tags``, so filters can use
+    an index instead of scanning JSON. ``owner_id`` is copied from the item
+    so a filter stays within one owner's index range.
+    """
+    __tablename__ = "wardrobe_item_tags"
+
+    item_id = Column(Integer, ForeignKey("wardrobe_items.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String(16), primary_key=True)
+    value = Column(String(64), primary_key=True)
+    owner_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_wardrobe_item_tags_owner_kind_value", "owner_id", "kind", "value", "item_id"),
+    )
+
+def _tag_value(value: Any) -> str:
+    return str(value.value if isinstance(value, enum.Enum) else value).strip().lower()
+
+def item_tags(item_id: int, row: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """Tag rows for an item given its column values (a dict or a WardrobeItem)."""
+    get = row.get if isinstance(row, Mapping) else lambda name: getattr(row, name, None)
+    seen = set()
+    tags = []
+    for kind, columns in TAG_SOURCES.items():
+        for column in columns:
+            values = get(column) or []
+            for value in ([values] if isinstance(values, (str, enum.Enum)) else values):
+                key: Tuple[str, str] = (kind.value, _tag_value(value))
+                if key[1] and key not in seen:
+                    seen.add(key)
+                    tags.append({"item_id": item_id, "owner_id": get("owner_id"), "kind": key[0], "value": key[1]})
+    return tags
+
+_TAGGED_COLUMNS = ("owner_id",) + tuple(column for columns in TAG_SOURCES.values() for column in columns)
+
+@event.listens_for(WardrobeItem, "after_insert")
+def _insert_tags(mapper, connection, target):
+    tags = item_tags(target.id, target)
+    if tags:
+        connection.execute(insert(WardrobeItemTag), tags)
+
+@event.listens_for(WardrobeItem, "after_update")
+def _update_tags(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[column].history.has_changes() for column in _TAGGED_COLUMNS):
+        return
+    connection.execute(delete(WardrobeItemTag).where(WardrobeItemTag.item_id == target.id))
+    _insert_tags(mapper, connection, target)
+
+@event.listens_for(WardrobeItem, "before_delete")
+def _delete_tags(mapper, connection, target):
+    # SQLite only honours ON DELETE CASCADE with foreign keys switched on
+    connection.execute(delete(WardrobeItemTag).where(WardrobeItemTag.item_id == target.id))
+
 class Outfit(Base):
     __tablename__ = "outfits"
 
@@ -77,8 +158,25 @@ class Outfit(Base):
     confidence_score = Column(Float)  # AI's confidence in the outfit
     style_explanation = Column(String)  # AI's explanation of the style
     
-    # Relationships
-    items = relationship("WardrobeItem", secondary="outfit_items", back_populates="outfits")
+    # Relationships; items come back in outfit order
+    items = relationship(
+        "WardrobeItem",
+        secondary="outfit_items",
+        order_by="OutfitItem.position",
+        back_populates="outfits"
+    )
+
+class WearEventBatch(Base):
+    """A batch of buffered wear events already added to the wear counts.
+
+    Written in the same transaction as the counts, so a batch retried after
+    a crash between commit and acknowledgement is recognized and skipped.
+    """
+    __tablename__ = "wear_event_batches"
+
+    id = Column(String(32), primary_key=True)
+    event_count = Column(Integer)
+    applied_at = Column(DateTime, default=datetime.utcnow, index=True)
 
 # Association table for outfit items
 class OutfitItem(Base):
@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Select, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.wardrobe import Outfit, OutfitItem, Season
+from app.repositories.wardrobe import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+
+# Slot order of a generated outfit, which becomes OutfitItem.position
+RECOMMENDATION_SLOTS = ("top", "bottom", "outerwear", "shoes")
+
+@dataclass
+class NewOutfit:
+    """An outfit to persist with ``save_outfits``; ``item_ids`` are in wearing order."""
+    name: str
+    item_ids: Sequence[int]
+    occasion: Optional[str] = None
+    season: Optional[Season] = None
+    style_tags: Sequence[str] = ()
+    description: Optional[str] = None
+    confidence_score: Optional[float] = None
+    style_explanation: Optional[str] = None
+
+    @classmethod
+    def from_recommendation(
+        cls,
+        outfit: Dict[str, Any],
+        occasion: str,
+        style: Optional[str] = None,
+        season: Optional[Season] = None
+    ) -> "NewOutfit":
+        """An outfit as returned by StyleRecommendationService.recommend_outfits."""
+        items = [outfit.get(slot) for slot in RECOMMENDATION_SLOTS] + list(outfit.get("accessories") or [])
+        return cls(
+            name=f"{style.title()} {occasion}" if style else occasion.title(),
+            item_ids=[item["id"] for item in items if item is not None],
+            occasion=occasion,
+            season=season,
+            style_tags=[style] if style else [],
+            confidence_score=outfit.get("score"),
+            style_explanation=outfit.get("style_explanation")
+        )
+
+@dataclass
+class OutfitPage:
+    outfits: List[Outfit] = field(default_factory=list)
+    # Pass back as ``cursor`` for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+def outfits_statement(owner_id: int, limit: int = 50, cursor: Optional[str] = None) -> Select:
+    """Newest-first page of an owner's outfits with their items.
+
+    ``selectinload`` fetches the items of the whole page in one more query
+    (joined through outfit_items, ordered by position) instead of one lazy
+    load per outfit, so a page costs two queries however many it holds.
+    """
+    statement = select(Outfit).where(Outfit.owner_id == owner_id).options(selectinload(Outfit.items))
+    if cursor:
+        statement = statement.where(Outfit.id < decode_cursor(cursor))
+    return statement.order_by(Outfit.id.desc()).limit(min(limit, MAX_PAGE_SIZE) + 1)
+
+def _page(outfits: Sequence[Outfit], limit: int) -> OutfitPage:
+    limit = min(limit, MAX_PAGE_SIZE)
+    if len(outfits) <= limit:
+        return OutfitPage(list(outfits))
+    outfits = list(outfits[:limit])
+    return OutfitPage(outfits, encode_cursor(outfits[-1].id))
+
+def list_outfits(db: Session, owner_id: int, limit: int = 50, cursor: Optional[str] = None) -> OutfitPage:
+    return _page(db.scalars(outfits_statement(owner_id, limit, cursor)).all(), limit)
+
+async def list_outfits_async(
+    db: AsyncSession,
+    owner_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> OutfitPage:
+    return _page((await db.scalars(outfits_statement(owner_id, limit, cursor))).all(), limit)
+
+def get_outfits(db: Session, outfit_ids: Sequence[int]) -> List[Outfit]:
+    """Outfits by id, items included, in the order asked for; unknown ids are skipped."""
+    statement = select(Outfit).where(Outfit.id.in_(outfit_ids)).options(selectinload(Outfit.items))
+    by_id = {outfit.id: outfit for outfit in db.scalars(statement)}
+    return [by_id[outfit_id] for outfit_id in outfit_ids if outfit_id in by_id]
+
+def save_outfits(db: Session, owner_id: int, outfits: Sequence[NewOutfit]) -> List[int]:
+    """Insert many outfits and their items in two executemany INSERTs; returns the new ids in order.
+
+    The caller commits. Both INSERTs are batched into multi-row statements
+    by SQLAlchemy's insertmanyvalues, so on PostgreSQL 1,000 outfits take a
+    handful of round trips rather than one per outfit and per item. SQLite
+    can't guarantee RETURNING order, so there the outfit INSERT runs once per
+    row (still in-process, and the item INSERT stays batched).
+    """
+    if not outfits:
+        return []
+    outfit_ids = db.scalars(
+        insert(Outfit).returning(Outfit.id, sort_by_parameter_order=True),
+        [
+            {
+                "owner_id": owner_id,
+                "name": outfit.name,
+                "description": outfit.description,
+                "occasion": outfit.occasion,
+                "season": outfit.season,
+                "style_tags": list(outfit.style_tags),
+                "confidence_score": outfit.confidence_score,
+                "style_explanation": outfit.style_explanation,
+                "wear_count": 0,
+            }
+            for outfit in outfits
+        ]
+    ).all()
+    links = [
+        {"outfit_id": outfit_id, "item_id": item_id, "position": position}
+        for outfit_id, outfit in zip(outfit_ids, outfits)
+        # An item appears once per outfit (it is part of the primary key)
+        for position, item_id in enumerate(dict.fromkeys(outfit.item_ids))
+    ]
+    if links:
+        db.execute(insert(OutfitItem), links)
+    return list(outfit_ids)
@@ -0,0 +1,91 @@
+import base64
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import Select, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.wardrobe import ClothingType, TagKind, WardrobeItem, WardrobeItemTag
+
+MAX_PAGE_SIZE = 200
+
+@dataclass
+class WardrobeFilter:
+    """Filter over one owner's wardrobe.
+
+    Values within a field are alternatives ("black or navy"); fields are
+    combined ("black or navy, and winter"). Type filters use the
+    (owner_id, type, id) index, tag filters the (owner_id, kind, value)
+    index on wardrobe_item_tags.
+    """
+    owner_id: int
+    types: Sequence[str] = ()
+    styles: Sequence[str] = ()
+    seasons: Sequence[str] = ()
+    colors: Sequence[str] = ()
+    weather: Sequence[str] = ()
+
+    def conditions(self) -> List[Any]:
+        conditions = [WardrobeItem.owner_id == self.owner_id]
+        if self.types:
+            conditions.append(WardrobeItem.type.in_([ClothingType(value.lower()) for value in self.types]))
+        for kind, values in (
+            (TagKind.STYLE, self.styles),
+            (TagKind.SEASON, self.seasons),
+            (TagKind.COLOR, self.colors),
+            (TagKind.WEATHER, self.weather),
+        ):
+            if values:
+                conditions.append(WardrobeItem.id.in_(select(WardrobeItemTag.item_id).where(
+                    WardrobeItemTag.owner_id == self.owner_id,
+                    WardrobeItemTag.kind == kind.value,
+                    WardrobeItemTag.value.in_([value.strip().lower() for value in values])
+                )))
+        return conditions
+
+@dataclass
+class WardrobePage:
+    items: List[WardrobeItem] = field(default_factory=list)
+    # Pass back as ``cursor`` for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+def encode_cursor(item_id: int) -> str:
+    return base64.urlsafe_b64encode(str(item_id).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+def page_statement(filters: WardrobeFilter, limit: int = 50, cursor: Optional[str] = None) -> Select:
+    """Newest-first page of matching items.
+
+    Keyset pagination: the cursor is the last id returned, so every page is
+    an index range scan starting below it rather than an OFFSET that reads
+    and discards all earlier rows. One extra row is fetched to tell whether
+    another page follows.
+    """
+    statement = select(WardrobeItem).where(*filters.conditions())
+    if cursor:
+        statement = statement.where(WardrobeItem.id < decode_cursor(cursor))
+    return statement.order_by(WardrobeItem.id.desc()).limit(min(limit, MAX_PAGE_SIZE) + 1)
+
+def _page(items: Sequence[WardrobeItem], limit: int) -> WardrobePage:
+    limit = min(limit, MAX_PAGE_SIZE)
+    if len(items) <= limit:
+        return WardrobePage(list(items))
+    items = list(items[:limit])
+    return WardrobePage(items, encode_cursor(items[-1].id))
+
+def list_items(db: Session, filters: WardrobeFilter, limit: int = 50, cursor: Optional[str] = None) -> WardrobePage:
+    return _page(db.scalars(page_statement(filters, limit, cursor)).all(), limit)
+
+async def list_items_async(
+    db: AsyncSession,
+    filters: WardrobeFilter,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> WardrobePage:
+    return _page((await db.scalars(page_statement(filters, limit, cursor))).all(), limit)
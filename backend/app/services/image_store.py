@@ -0,0 +1,261 @@
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from PIL import Image, ImageOps, features
+
+from ai.common.lru import LRUCache
+
+# Derivatives made at upload: name -> longest side in pixels
+DERIVATIVE_SIZES = {"thumb": 256, "medium": 1024}
+DERIVATIVE_QUALITY = {"webp": 80, "avif": 60}
+CONTENT_TYPES = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "avif": "image/avif",
+    "gif": "image/gif",
+    "bmp": "image/bmp",
+}
+# Content-addressed, so every stored object can be cached forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+def _avif_available() -> bool:
+    try:
+        if features.check("avif"):
+            return True
+    except ValueError:
+        pass
+    try:
+        # Older Pillow releases encode AVIF through the pillow-avif-plugin package
+        import pillow_avif  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+DERIVATIVE_FORMATS = ["webp", "avif"] if _avif_available() else ["webp"]
+
+def is_image_hash(value: str) -> bool:
+    return bool(_HASH_RE.match(value))
+
+@dataclass
+class StoredImage:
+    """Manifest of one stored image: its hash and every variant, by name (``original``, ``thumb.webp``...)."""
+    hash: str
+    width: int
+    height: int
+    # name -> {"key", "content_type", "size", "width", "height"}
+    variants: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"hash": self.hash, "width": self.width, "height": self.height, "variants": self.variants}
+
+    def url(self, variant: str = "original", prefix: str = "/api/images") -> str:
+        return f"{prefix}/{self.hash}/{variant}"
+
+    def variant_for(self, name: str, accept: str = "") -> Optional[str]:
+        """Variant matching ``name``; a bare derivative name picks the best format ``accept`` allows."""
+        if name in self.variants:
+            return name
+        for fmt in ("avif", "webp"):
+            variant = f"{name}.{fmt}"
+            # Every browser that matters decodes WebP; AVIF only when asked for
+            if variant in self.variants and (fmt == "webp" or CONTENT_TYPES[fmt] in accept):
+                return variant
+        return None
+
+class LocalImageBackend:
+    """Objects as files under ``root``, written atomically."""
+
+    def __init__(self, root: str = "storage/images"):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def open_range(self, key: str, start: int, end: int, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+        """Bytes ``start`` to ``end`` inclusive, in chunks."""
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+class S3ImageBackend:
+    """Objects in an S3 bucket. ``endpoint_url`` points it at MinIO or a moto server instead of AWS."""
+
+    def __init__(self, bucket: str, region: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        import boto3
+
+        self.client = boto3.client("s3", region_name=region, endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self.prefix + key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+        except self.client.exceptions.NoSuchKey:
+            return None
+
+    def open_range(self, key: str, start: int, end: int, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+        body = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key, Range=f"bytes={start}-{end}")["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+class ImageStore:
+    """Content-addressed images with pre-generated derivatives.
+
+    ``put`` keys an upload by the SHA-256 of its bytes, so the same photo is
+    stored once however often it is uploaded, and writes a thumbnail and a
+    medium-size rendition in WebP (and AVIF when Pillow can encode it)
+    alongside the original. The manifest is written last and marks the
+    image complete; an upload interrupted earlier is simply redone.
+    """
+
+    def __init__(self, backend: Any, manifest_cache_size: int = 4096, max_pixels: int = 50_000_000):
+        self.backend = backend
+        self.max_pixels = max_pixels
+        # Manifests never change once written, so found ones are cached for good
+        self._manifests = LRUCache(manifest_cache_size)
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "ImageStore":
+        if settings.IMAGE_STORAGE == "s3":
+            return cls(S3ImageBackend(
+                settings.AWS_S3_BUCKET,
+                settings.AWS_REGION,
+                prefix="images/",
+                endpoint_url=settings.AWS_S3_ENDPOINT_URL
+            ), max_pixels=settings.IMAGE_MAX_PIXELS)
+        if settings.IMAGE_STORAGE == "local":
+            return cls(LocalImageBackend(settings.IMAGE_DIR), max_pixels=settings.IMAGE_MAX_PIXELS)
+        raise ValueError(f"Unknown IMAGE_STORAGE: {settings.IMAGE_STORAGE}")
+
+    @staticmethod
+    def _key(image_hash: str, name: str) -> str:
+        return f"{image_hash[:2]}/{image_hash[2:4]}/{image_hash}/{name}"
+
+    def manifest(self, image_hash: str) -> Optional[StoredImage]:
+        if not is_image_hash(image_hash):
+            return None
+        stored = self._manifests.get(image_hash)
+        if stored is None:
+            data = self.backend.get(self._key(image_hash, "manifest.json"))
+            if data is None:
+                return None
+            values = json.loads(data)
+            stored = StoredImage(values["hash"], values["width"], values["height"], values["variants"])
+            self._manifests.set(image_hash, stored)
+        return stored
+
+    def put(self, data: bytes) -> StoredImage:
+        """Store an encoded image and its derivatives; returns the existing manifest for known content.
+
+        Raises ValueError for unsupported formats and images over ``max_pixels``;
+        Pillow's own errors (UnidentifiedImageError, DecompressionBombError,
+        OSError for truncated data) pass through.
+        """
+        image_hash = hashlib.sha256(data).hexdigest()
+        existing = self.manifest(image_hash)
+        if existing is not None:
+            return existing
+
+        with Image.open(io.BytesIO(data)) as decoded:
+            source_format = (decoded.format or "jpeg").lower()
+            if source_format not in CONTENT_TYPES:
+                raise ValueError(f"Unsupported image format: {decoded.format}")
+            # Checked from the header, before any pixels are decoded
+            if decoded.width * decoded.height > self.max_pixels:
+                raise ValueError(f"Image has more than {self.max_pixels} pixels")
+            # Phone photos store rotation in EXIF; bake it into the derivatives
+            image = ImageOps.exif_transpose(decoded)
+            image.load()
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+        stored = StoredImage(image_hash, image.width, image.height)
+        self._put_variant(stored, "original", data, source_format, image.size)
+        for name, size in DERIVATIVE_SIZES.items():
+            derivative = image.copy()
+            derivative.thumbnail((size, size), Image.LANCZOS)
+            for fmt in DERIVATIVE_FORMATS:
+                buffer = io.BytesIO()
+                derivative.save(buffer, fmt.upper(), quality=DERIVATIVE_QUALITY[fmt])
+                self._put_variant(stored, f"{name}.{fmt}", buffer.getvalue(), fmt, derivative.size)
+
+        manifest = json.dumps(stored.as_dict()).encode()
+        self.backend.put(self._key(image_hash, "manifest.json"), manifest, "application/json")
+        self._manifests.set(image_hash, stored)
+        return stored
+
+    def _put_variant(self, stored: StoredImage, name: str, data: bytes, fmt: str, size: Tuple[int, int]) -> None:
+        key = self._key(stored.hash, name)
+        self.backend.put(key, data, CONTENT_TYPES[fmt])
+        stored.variants[name] = {
+            "key": key,
+            "content_type": CONTENT_TYPES[fmt],
+            "size": len(data),
+            "width": size[0],
+            "height": size[1],
+        }
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single ``bytes=`` range.
+
+    Returns None when there is no usable range (serve the whole object) and
+    raises ValueError when the range lies beyond the object (416).
+    Malformed and multi-range headers are answered with the whole object,
+    which RFC 9110 allows.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    if not (start_text.isdigit() or start_text == "") or not (end_text.isdigit() or end_text == ""):
+        return None
+    if start_text == "":
+        # Suffix range: the last N bytes
+        if not end_text or int(end_text) == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(0, size - int(end_text)), size - 1
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
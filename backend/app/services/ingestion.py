@@ -0,0 +1,374 @@
+import io
+import os
+import queue
+import threading
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from PIL import Image
+from sqlalchemy import insert, select
+
+from ai.clothing_recognition.image import DecodedImage
+from app.models.wardrobe import ClothingType, WardrobeItem, WardrobeItemTag, item_tags
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+# Marks the end of a stage's input
+_DONE = object()
+
+@dataclass
+class IngestSource:
+    """One garment photo to ingest; ``read`` is called from an I/O worker thread."""
+    name: str
+    read: Callable[[], bytes]
+
+def _read_file(path: str) -> Callable[[], bytes]:
+    def read() -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+    return read
+
+def directory_sources(path: str) -> Iterator[IngestSource]:
+    """Every image under ``path``, in a stable order."""
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                full_path = os.path.join(root, name)
+                yield IngestSource(os.path.relpath(full_path, path), _read_file(full_path))
+
+def _too_large(name: str, size: int, max_bytes: int) -> Callable[[], bytes]:
+    def read() -> bytes:
+        raise ValueError(f"{name} is {size} bytes, over the {max_bytes} byte limit")
+    return read
+
+def zip_sources(path: str, max_member_bytes: Optional[int] = None) -> Iterator[IngestSource]:
+    """Every image inside a zip archive, read member by member.
+
+    Members are read as they are yielded, so the archive is closed once the
+    last one is queued; the bounded queues keep only a few in memory.
+    Members whose declared size is over ``max_member_bytes`` fail instead.
+    """
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            if max_member_bytes is not None and info.file_size > max_member_bytes:
+                yield IngestSource(info.filename, _too_large(info.filename, info.file_size, max_member_bytes))
+                continue
+            data = archive.read(info)
+            yield IngestSource(info.filename, lambda data=data: data)
+
+def path_sources(paths: Iterable[str], max_member_bytes: Optional[int] = None) -> Iterator[IngestSource]:
+    """Expand directories, zip files and single images into sources."""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from directory_sources(path)
+        elif zipfile.is_zipfile(path):
+            yield from zip_sources(path, max_member_bytes)
+        else:
+            yield IngestSource(os.path.basename(path), _read_file(path))
+
+@dataclass
+class StageStats:
+    name: str
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+
+    def as_dict(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.processed / elapsed, 2) if elapsed else 0.0,
+        }
+
+@dataclass
+class IngestReport:
+    """Progress snapshot of a pipeline run."""
+    stages: Dict[str, Dict[str, Any]]
+    created: int
+    skipped: int
+    failures: List[Tuple[str, str]]
+    elapsed: float
+    running: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "elapsed": round(self.elapsed, 3),
+            "created": self.created,
+            "skipped": self.skipped,
+            "failed": len(self.failures),
+            "failures": [{"source": name, "error": error} for name, error in self.failures[-50:]],
+            "stages": self.stages,
+        }
+
+@dataclass
+class _Item:
+    source: IngestSource
+    image: Optional[DecodedImage] = None
+    result: Optional[Dict[str, Any]] = None
+    row: Optional[Dict[str, Any]] = None
+
+@dataclass
+class IngestionPipeline:
+    """Streams garment photos through decode, recognition, post-processing and bulk insert.
+
+    Stages run concurrently and are joined by bounded queues, so at most a
+    few batches of decoded images are in memory at once. I/O stages use
+    thread pools, recognition runs in batches, and rows are written with one
+    bulk INSERT per ``write_batch_size`` items. Photos whose content hash is
+    already in the owner's wardrobe are skipped, which makes a re-run after a
+    crash resume where the last committed batch left off.
+    """
+    session_factory: Callable[[], Any]
+    recognition: Any
+    owner_id: int
+    output_dir: str = "static/wardrobe"
+    io_workers: int = 4
+    batch_size: int = 16
+    max_batch_wait: float = 0.5
+    write_batch_size: int = 200
+    queue_size: int = 16
+    thumbnail_size: int = 256
+    # Photos with more pixels fail before decoding (a small file can decode huge)
+    max_pixels: Optional[int] = None
+    progress: Optional[Callable[[IngestReport], None]] = None
+    progress_interval: float = 1.0
+    # When set, cutouts go into the content-addressed store with their derivatives
+    image_store: Optional[Any] = None
+    stats: Dict[str, StageStats] = field(init=False)
+
+    def __post_init__(self):
+        self.stats = {name: StageStats(name) for name in ("decode", "recognize", "postprocess", "write")}
+        self._lock = threading.Lock()
+        self._seen: Set[str] = set()
+        self.created = 0
+        self.skipped = 0
+        self.failures: List[Tuple[str, str]] = []
+        self._started = 0.0
+        self._running = False
+
+    def report(self) -> IngestReport:
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        with self._lock:
+            return IngestReport(
+                stages={name: stats.as_dict(elapsed) for name, stats in self.stats.items()},
+                created=self.created,
+                skipped=self.skipped,
+                failures=list(self.failures),
+                elapsed=elapsed,
+                running=self._running
+            )
+
+    def run(self, sources: Iterable[IngestSource]) -> IngestReport:
+        """Ingest every source and block until the last row is committed."""
+        for subdir in ("originals", "cutouts", "thumbnails"):
+            os.makedirs(os.path.join(self.output_dir, subdir), exist_ok=True)
+        self._seen = self._existing_hashes()
+        self._started = time.perf_counter()
+        self._running = True
+
+        to_decode: "queue.Queue" = queue.Queue(self.queue_size)
+        to_recognize: "queue.Queue" = queue.Queue(self.queue_size)
+        to_postprocess: "queue.Queue" = queue.Queue(self.queue_size)
+        to_write: "queue.Queue" = queue.Queue(self.write_batch_size)
+
+        threads = [
+            threading.Thread(target=self._feed, args=(sources, to_decode), name="ingest-source"),
+            *self._pool("decode", self.io_workers, self._decode, to_decode, to_recognize),
+            threading.Thread(
+                target=self._batches,
+                args=("recognize", self.batch_size, self.max_batch_wait, self._recognize, to_recognize, to_postprocess),
+                name="ingest-recognize"
+            ),
+            *self._pool("postprocess", self.io_workers, self._postprocess, to_postprocess, to_write),
+            threading.Thread(
+                target=self._batches,
+                args=("write", self.write_batch_size, self.max_batch_wait, self._write, to_write, None),
+                name="ingest-write"
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+
+        while any(thread.is_alive() for thread in threads):
+            threads[-1].join(self.progress_interval)
+            if self.progress is not None:
+                self.progress(self.report())
+
+        self._running = False
+        report = self.report()
+        if self.progress is not None:
+            self.progress(report)
+        return report
+
+    def _existing_hashes(self) -> Set[str]:
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(WardrobeItem.image_hash).where(
+                    WardrobeItem.owner_id == self.owner_id,
+                    WardrobeItem.image_hash.isnot(None)
+                )
+            )
+            return {image_hash for (image_hash,) in rows}
+
+    def _fail(self, stage: str, items: List[_Item], exc: Exception) -> None:
+        with self._lock:
+            self.stats[stage].failed += len(items)
+            self.failures.extend((item.source.name, f"{stage}: {exc}") for item in items)
+
+    def _feed(self, sources: Iterable[IngestSource], out_q: "queue.Queue") -> None:
+        try:
+            for source in sources:
+                out_q.put(_Item(source))
+        finally:
+            out_q.put(_DONE)
+
+    def _pool(self, stage: str, workers: int, fn, in_q: "queue.Queue", out_q: "queue.Queue") -> List[threading.Thread]:
+        """Threads that apply ``fn`` to single items; the last one to finish forwards _DONE."""
+        remaining = [workers]
+
+        def work():
+            while True:
+                item = in_q.get()
+                if item is _DONE:
+                    # Let sibling workers see the end of input too
+                    in_q.put(_DONE)
+                    with self._lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    if last:
+                        out_q.put(_DONE)
+                    return
+                start = time.perf_counter()
+                try:
+                    item = fn(item)
+                except Exception as exc:
+                    self._fail(stage, [item], exc)
+                    continue
+                finally:
+                    with self._lock:
+                        self.stats[stage].busy_seconds += time.perf_counter() - start
+                if item is not None:
+                    with self._lock:
+                        self.stats[stage].processed += 1
+                    out_q.put(item)
+
+        return [threading.Thread(target=work, name=f"ingest-{stage}-{i}") for i in range(workers)]
+
+    def _batches(self, stage: str, size: int, max_wait: float, fn, in_q: "queue.Queue", out_q: Optional["queue.Queue"]) -> None:
+        """Apply ``fn`` to batches of up to ``size`` items, flushing partial batches after ``max_wait``."""
+        batch: List[_Item] = []
+
+        def flush():
+            start = time.perf_counter()
+            try:
+                results = fn(batch)
+            except Exception as exc:
+                self._fail(stage, batch, exc)
+                results = []
+            with self._lock:
+                self.stats[stage].busy_seconds += time.perf_counter() - start
+                self.stats[stage].processed += len(results)
+            if out_q is not None:
+                for item in results:
+                    out_q.put(item)
+            batch.clear()
+
+        while True:
+            try:
+                item = in_q.get(timeout=max_wait if batch else None)
+            except queue.Empty:
+                flush()
+                continue
+            if item is _DONE:
+                if batch:
+                    flush()
+                if out_q is not None:
+                    out_q.put(_DONE)
+                return
+            batch.append(item)
+            if len(batch) >= size:
+                flush()
+
+    def _decode(self, item: _Item) -> Optional[_Item]:
+        data = item.source.read()
+        if self.max_pixels is not None:
+            # Only the header is parsed; Pillow also raises DecompressionBombError here
+            with Image.open(io.BytesIO(data)) as header:
+                if header.width * header.height > self.max_pixels:
+                    raise ValueError(f"Image has more than {self.max_pixels} pixels")
+        item.image = DecodedImage(data=data)
+        image_hash = item.image.content_hash
+        with self._lock:
+            # Already in the wardrobe (or earlier in this run): nothing to redo
+            if image_hash in self._seen:
+                self.skipped += 1
+                return None
+            self._seen.add(image_hash)
+        # Decode here on the I/O pool so recognition batches get ready pixels
+        item.image.decode()
+        return item
+
+    def _recognize(self, batch: List[_Item]) -> List[_Item]:
+        results = self.recognition.detect_clothing_batch([item.image for item in batch])
+        for item, result in zip(batch, results):
+            item.result = result
+        return batch
+
+    def _postprocess(self, item: _Item) -> _Item:
+        image_hash = item.image.content_hash
+        extension = os.path.splitext(item.source.name)[1].lower() or ".jpg"
+        original_path = os.path.join(self.output_dir, "originals", image_hash + extension)
+        cutout_format = getattr(self.recognition, "background_format", "png")
+        cutout_path = os.path.join(self.output_dir, "cutouts", f"{image_hash}.{cutout_format}")
+        thumbnail_path = os.path.join(self.output_dir, "thumbnails", image_hash + ".jpg")
+
+        with open(original_path, "wb") as f:
+            f.write(item.image.data)
+        self.recognition.remove_background(item.image, cutout_path)
+        if self.image_store is not None:
+            with open(cutout_path, "rb") as f:
+                stored = self.image_store.put(f.read())
+            cutout_path, thumbnail_path = stored.url(), stored.url("thumb")
+        else:
+            Image.fromarray(item.image.downscaled(self.thumbnail_size)).save(thumbnail_path, quality=85)
+
+        result = item.result
+        item.row = {
+            "owner_id": self.owner_id,
+            "name": os.path.splitext(os.path.basename(item.source.name))[0],
+            "type": ClothingType(result["category"]),
+            "image_path": cutout_path,
+            "image_hash": image_hash,
+            "thumbnail_path": thumbnail_path,
+            "color": result["colors"][0] if result["colors"] else None,
+            "color_palette": result["colors"],
+            "pattern": result["pattern"],
+            "seasons": [],
+            "weather_conditions": [],
+            "style_tags": [],
+        }
+        # The decoded pixels are no longer needed; free them before the write queue
+        item.image = None
+        return item
+
+    def _write(self, batch: List[_Item]) -> List[_Item]:
+        with self.session_factory() as db:
+            # Bulk INSERTs skip mapper events, so write the tag rows here
+            ids = db.scalars(
+                insert(WardrobeItem).returning(WardrobeItem.id, sort_by_parameter_order=True),
+                [item.row for item in batch]
+            ).all()
+            tags = [tag for item_id, item in zip(ids, batch) for tag in item_tags(item_id, item.row)]
+            if tags:
+                db.execute(insert(WardrobeItemTag), tags)
+            db.commit()
+        with self._lock:
+            self.created += len(batch)
+        return batch
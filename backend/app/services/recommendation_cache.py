@@ -0,0 +1,55 @@
+from typing import Any, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.models.user import UserProfile
+from app.models.wardrobe import WardrobeItem
+
+# Model -> column holding the user whose recommendations it affects
+_OWNER_COLUMNS = {WardrobeItem: "owner_id", UserProfile: "user_id"}
+
+_PENDING_KEY = "recommendation_cache_users"
+
+def _pending(session: Session) -> Set[Any]:
+    return session.info.setdefault(_PENDING_KEY, set())
+
+def register_invalidation(cache: Any) -> None:
+    """Invalidate a user's cached recommendations once a change to their wardrobe or profile commits.
+
+    Users touched during a transaction are collected on the session and only
+    invalidated after commit, so a concurrent request cannot re-cache the old
+    rows between flush and commit. ORM bulk INSERTs (``session.execute(insert(WardrobeItem), rows)``)
+    bypass mapper events and are picked up from their parameters instead.
+    """
+
+    def on_change(mapper, connection, target):
+        session = object_session(target)
+        user_id = getattr(target, _OWNER_COLUMNS[mapper.class_])
+        if session is not None and user_id is not None:
+            _pending(session).add(user_id)
+
+    for model in _OWNER_COLUMNS:
+        for name in ("after_insert", "after_update", "after_delete"):
+            event.listen(model, name, on_change)
+
+    @event.listens_for(Session, "do_orm_execute")
+    def on_bulk_insert(state):
+        if not state.is_insert:
+            return
+        model = state.bind_mapper.class_ if state.bind_mapper is not None else None
+        if model not in _OWNER_COLUMNS:
+            return
+        params = state.parameters
+        rows = params if isinstance(params, list) else [params or {}]
+        column = _OWNER_COLUMNS[model]
+        _pending(state.session).update(row[column] for row in rows if row.get(column) is not None)
+
+    @event.listens_for(Session, "after_commit")
+    def on_commit(session):
+        for user_id in session.info.pop(_PENDING_KEY, ()):
+            cache.invalidate(user_id)
+
+    @event.listens_for(Session, "after_rollback")
+    def on_rollback(session):
+        session.info.pop(_PENDING_KEY, None)
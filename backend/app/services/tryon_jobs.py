@@ -0,0 +1,370 @@
+import json
+import os
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+import warnings
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+JOB_KINDS = ("tryon", "video")
+# Earlier lanes run first: interactive previews overtake queued batch videos
+JOB_LANES = ("interactive", "batch")
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+class JobCancelled(Exception):
+    """Raised from the progress callback to abort a running job."""
+
+@dataclass
+class TryOnJob:
+    id: str
+    kind: str
+    lane: str
+    person_image: str
+    clothing_image: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    status: str = "queued"
+    step: int = 0
+    total_steps: int = 0
+    result_key: Optional[str] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "lane": self.lane,
+            "status": self.status,
+            "progress": self.step / self.total_steps if self.total_steps else 0.0,
+            "step": self.step,
+            "total_steps": self.total_steps,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+class SQLiteJobStore:
+    """Job state in a local SQLite file; survives restarts of a single-node deployment."""
+
+    _COLUMNS = [name for name in TryOnJob.__dataclass_fields__]
+
+    def __init__(self, path: str = "cache/tryon_jobs.sqlite3"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tryon_jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT, lane TEXT, person_image TEXT, clothing_image TEXT,"
+            " params TEXT, status TEXT, step INTEGER, total_steps INTEGER, result_key TEXT,"
+            " error TEXT, cancel_requested INTEGER, created_at REAL, updated_at REAL)"
+        )
+
+    def _row_to_job(self, row) -> TryOnJob:
+        values = dict(zip(self._COLUMNS, row))
+        values["params"] = json.loads(values["params"])
+        values["cancel_requested"] = bool(values["cancel_requested"])
+        return TryOnJob(**values)
+
+    def create(self, job: TryOnJob) -> None:
+        values = asdict(job)
+        values["params"] = json.dumps(values["params"])
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO tryon_jobs ({', '.join(self._COLUMNS)})"
+                f" VALUES ({', '.join('?' for _ in self._COLUMNS)})",
+                [values[name] for name in self._COLUMNS]
+            )
+
+    def get(self, job_id: str) -> Optional[TryOnJob]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM tryon_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE tryon_jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?",
+                [*fields.values(), job_id]
+            )
+
+    def request_cancel(self, job_id: str) -> None:
+        with self._lock:
+            # Queued jobs are cancelled outright; running ones stop at their next step
+            self._conn.execute(
+                "UPDATE tryon_jobs SET status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END,"
+                " cancel_requested = 1, updated_at = ? WHERE id = ?",
+                (time.time(), job_id)
+            )
+
+    def unfinished(self) -> List[TryOnJob]:
+        """Queued and running jobs, oldest first, e.g. to resume after a restart."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM tryon_jobs"
+                " WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+class RedisJobStore:
+    """Job state in Redis hashes, shared by the API and Celery workers."""
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "wearmind:tryon:job:", ttl_seconds: int = 7 * 24 * 3600):
+        import redis
+
+        # Same variable and default as Settings.REDIS_URL
+        self.client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    def create(self, job: TryOnJob) -> None:
+        key = self.prefix + job.id
+        self.client.hset(key, mapping={name: json.dumps(value) for name, value in asdict(job).items()})
+        self.client.expire(key, self.ttl_seconds)
+
+    def get(self, job_id: str) -> Optional[TryOnJob]:
+        values = self.client.hgetall(self.prefix + job_id)
+        if not values:
+            return None
+        return TryOnJob(**{name.decode(): json.loads(value) for name, value in values.items()})
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = time.time()
+        self.client.hset(self.prefix + job_id, mapping={name: json.dumps(value) for name, value in fields.items()})
+
+    def request_cancel(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job is None:
+            return
+        # A worker that picks up a cancelled job skips it
+        fields: Dict[str, Any] = {"cancel_requested": True}
+        if job.status == "queued":
+            fields["status"] = "cancelled"
+        self.update(job_id, **fields)
+
+class LocalResultStorage:
+    """Results under the backend's static directory, served by the /static mount."""
+
+    def __init__(self, directory: str = "static/tryon", url_prefix: str = "/static/tryon"):
+        self.directory = directory
+        self.url_prefix = url_prefix
+
+    def save(self, key: str, path: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        shutil.copyfile(path, os.path.join(self.directory, key))
+        return key
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+class S3ResultStorage:
+    """Results in the AWS_S3_BUCKET bucket, handed out as presigned URLs."""
+
+    def __init__(
+        self,
+        bucket: str,
+        region: str,
+        prefix: str = "tryon/",
+        url_expiry: int = 3600,
+        endpoint_url: Optional[str] = None
+    ):
+        import boto3
+
+        self.client = boto3.client("s3", region_name=region, endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.url_expiry = url_expiry
+
+    def save(self, key: str, path: str) -> str:
+        self.client.upload_file(path, self.bucket, self.prefix + key)
+        return key
+
+    def url(self, key: str) -> str:
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self.prefix + key}, ExpiresIn=self.url_expiry
+        )
+
+def result_storage_from_settings(settings: Any):
+    if settings.TRYON_RESULT_STORAGE == "s3":
+        return S3ResultStorage(settings.AWS_S3_BUCKET, settings.AWS_REGION, endpoint_url=settings.AWS_S3_ENDPOINT_URL)
+    if settings.TRYON_RESULT_STORAGE == "local":
+        return LocalResultStorage(settings.TRYON_RESULT_DIR)
+    raise ValueError(f"Unknown TRYON_RESULT_STORAGE: {settings.TRYON_RESULT_STORAGE}")
+
+def run_job(
+    job_id: str,
+    store: Any,
+    storage: Any,
+    service_factory: Callable[[], Any],
+    stale_after: Optional[float] = None
+) -> None:
+    """Run one queued job to completion, recording progress and the outcome in ``store``.
+
+    The service comes from ``service_factory`` inside the job's error
+    handling, so a model that fails to load fails the job rather than the
+    worker. With ``stale_after`` set, a job left ``running`` that has not
+    reported progress for that many seconds is taken to belong to a dead
+    worker and is run again from the start.
+    """
+    job = store.get(job_id)
+    if job is None:
+        return
+    stale = (
+        job.status == "running"
+        and stale_after is not None
+        and time.time() - job.updated_at > stale_after
+    )
+    if job.status != "queued" and not stale:
+        if job.status == "cancelled":
+            _remove_inputs(job)
+        return
+    store.update(job_id, status="running", step=0)
+
+    def progress(step: int, total_steps: int) -> None:
+        store.update(job_id, step=step, total_steps=total_steps)
+        current = store.get(job_id)
+        if current is not None and current.cancel_requested:
+            raise JobCancelled(job_id)
+
+    try:
+        service = service_factory()
+        with tempfile.TemporaryDirectory(prefix="tryon-job-") as work_dir:
+            if job.kind == "tryon":
+                output_path = os.path.join(work_dir, f"{job_id}.png")
+                image = service.generate_tryon(job.person_image, job.clothing_image, progress=progress, **job.params)
+                image.save(output_path)
+            else:
+                output_path = os.path.join(work_dir, f"{job_id}.mp4")
+                service.generate_video(
+                    job.person_image, job.clothing_image, output_path=output_path, progress=progress, **job.params
+                )
+            result_key = storage.save(os.path.basename(output_path), output_path)
+        store.update(job_id, status="succeeded", result_key=result_key)
+    except JobCancelled:
+        store.update(job_id, status="cancelled")
+    except Exception as exc:
+        store.update(job_id, status="failed", error=str(exc))
+    finally:
+        _remove_inputs(job)
+
+def _remove_inputs(job: TryOnJob) -> None:
+    # Uploaded inputs live in a directory of their own, named after the job
+    input_dir = os.path.dirname(job.person_image)
+    if os.path.basename(input_dir) == job.id:
+        shutil.rmtree(input_dir, ignore_errors=True)
+
+class InProcessJobQueue:
+    """Try-on jobs run by worker threads of the API process, with state in SQLite.
+
+    One worker by default, since jobs already use every core (or the GPU).
+    Jobs left queued or running by a previous process are resumed on start.
+    """
+
+    def __init__(self, store: SQLiteJobStore, storage: Any, service_factory: Callable[[], Any], workers: int = 1):
+        self.store = store
+        self.storage = storage
+        self.service_factory = service_factory
+        self.workers = workers
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        for job in store.unfinished():
+            if job.status == "running":
+                # Interrupted mid-run; start over
+                store.update(job.id, status="queued", step=0)
+            self._enqueue(job)
+
+    def _enqueue(self, job: TryOnJob) -> None:
+        with self._lock:
+            self._sequence += 1
+            self._queue.put((JOB_LANES.index(job.lane), self._sequence, job.id))
+            if not self._threads:
+                self._threads = [
+                    threading.Thread(target=self._work, name=f"tryon-worker-{i}", daemon=True)
+                    for i in range(self.workers)
+                ]
+                for thread in self._threads:
+                    thread.start()
+
+    def _work(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            try:
+                run_job(job_id, self.store, self.storage, self.service_factory)
+            except Exception as exc:
+                # Only the job store itself can fail here; keep serving later jobs
+                warnings.warn(f"try-on job {job_id} could not be run: {exc}")
+
+    def submit(self, job: TryOnJob) -> None:
+        self.store.create(job)
+        self._enqueue(job)
+
+    def get(self, job_id: str) -> Optional[TryOnJob]:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> None:
+        self.store.request_cancel(job_id)
+
+class CeleryJobQueue:
+    """Try-on jobs run by Celery workers, with state in Redis.
+
+    Each lane is its own Celery queue (``tryon.interactive``, ``tryon.batch``),
+    so interactive jobs can get dedicated workers:
+    ``celery -A app.services.tryon_tasks worker -Q tryon.interactive``.
+    Job input files must be on storage the workers share.
+    """
+
+    def __init__(self, store: RedisJobStore):
+        self.store = store
+
+    def submit(self, job: TryOnJob) -> None:
+        from app.services.tryon_tasks import run_tryon_job
+
+        self.store.create(job)
+        run_tryon_job.apply_async(args=[job.id], queue=f"tryon.{job.lane}")
+
+    def get(self, job_id: str) -> Optional[TryOnJob]:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> None:
+        self.store.request_cancel(job_id)
+
+def new_job(kind: str, lane: str, person_image: str, clothing_image: str, params: Dict[str, Any]) -> TryOnJob:
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if lane not in JOB_LANES:
+        raise ValueError(f"Unknown lane: {lane}")
+    return TryOnJob(
+        id=uuid.uuid4().hex,
+        kind=kind,
+        lane=lane,
+        person_image=person_image,
+        clothing_image=clothing_image,
+        params=params
+    )
+
+def create_job_queue(settings: Any, service_factory: Callable[[], Any]):
+    """The job queue described by the TRYON_JOB_* settings."""
+    if settings.TRYON_JOB_BACKEND == "celery":
+        return CeleryJobQueue(RedisJobStore(settings.REDIS_URL))
+    if settings.TRYON_JOB_BACKEND == "inprocess":
+        return InProcessJobQueue(
+            SQLiteJobStore(settings.TRYON_JOB_DB),
+            result_storage_from_settings(settings),
+            service_factory,
+            workers=settings.TRYON_WORKERS
+        )
+    raise ValueError(f"Unknown TRYON_JOB_BACKEND: {settings.TRYON_JOB_BACKEND}")
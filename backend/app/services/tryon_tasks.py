@@ -0,0 +1,22 @@
+from celery import Celery
+
+from app.core.ai import registry
+from app.core.config import settings
+from app.services.tryon_jobs import RedisJobStore, result_storage_from_settings, run_job
+
+celery_app = Celery("wearmind", broker=settings.REDIS_URL)
+# Take one job at a time so a worker never holds batch jobs ahead of new interactive ones
+celery_app.conf.worker_prefetch_multiplier = 1
+# A task whose worker died is redelivered; run_job restarts it once its job has gone stale
+celery_app.conf.task_acks_late = True
+celery_app.conf.task_reject_on_worker_lost = True
+
+@celery_app.task(name="tryon.run_job")
+def run_tryon_job(job_id: str) -> None:
+    run_job(
+        job_id,
+        RedisJobStore(settings.REDIS_URL),
+        result_storage_from_settings(settings),
+        lambda: registry.get("virtual_tryon"),
+        stale_after=settings.TRYON_JOB_STALE_SECONDS
+    )
@@ -0,0 +1,398 @@
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, delete, func, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.models.wardrobe import Outfit, WardrobeItem, WearEventBatch
+
+# Counted things, as the ``kind`` of pending lookups
+WEAR_KINDS = {"outfit": Outfit, "item": WardrobeItem}
+
+def _utc(timestamp: float) -> datetime:
+    # Naive UTC, like the DateTime columns it is compared with and written to
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+@dataclass
+class WearEvent:
+    """One "I wore this" tap: an outfit, the items in it, and when."""
+    outfit_id: Optional[int]
+    item_ids: List[int] = field(default_factory=list)
+    worn_at: float = field(default_factory=time.time)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    def keys(self) -> List[Tuple[str, int]]:
+        keys = [("outfit", self.outfit_id)] if self.outfit_id is not None else []
+        return keys + [("item", item_id) for item_id in dict.fromkeys(self.item_ids)]
+
+class _PendingWears:
+    """Wear counts and latest wear time of buffered events, by (kind, id)."""
+
+    def __init__(self):
+        self._wears: Dict[Tuple[str, int], List[float]] = {}
+
+    def add(self, events: Iterable[WearEvent]) -> None:
+        for event in events:
+            for key in event.keys():
+                entry = self._wears.setdefault(key, [0, 0.0])
+                entry[0] += 1
+                entry[1] = max(entry[1], event.worn_at)
+
+    def remove(self, events: Iterable[WearEvent]) -> None:
+        for event in events:
+            for key in event.keys():
+                entry = self._wears.get(key)
+                if entry is None:
+                    continue
+                # The latest time is kept until the count drains; by then the database has it
+                entry[0] -= 1
+                if entry[0] <= 0:
+                    del self._wears[key]
+
+    def get(self, kind: str, ids: Iterable[int]) -> Dict[int, Tuple[int, float]]:
+        found = {}
+        for item_id in ids:
+            entry = self._wears.get((kind, item_id))
+            if entry is not None:
+                found[item_id] = (int(entry[0]), entry[1])
+        return found
+
+def _read_events(path: str) -> List[WearEvent]:
+    events = []
+    with open(path) as f:
+        for line in f:
+            try:
+                events.append(WearEvent(**json.loads(line)))
+            except (ValueError, TypeError):
+                # A torn last line from a crash mid-append; the tap was never acknowledged
+                continue
+    return events
+
+class JournalWearBuffer:
+    """Wear events in an append-only journal on local disk, for single-process deployments.
+
+    ``append`` returns once the event is in the journal (and fsynced unless
+    ``fsync`` is off). ``take`` renames the journal to a batch file, which is
+    only deleted by ``ack`` after the batch is committed, so events survive a
+    crash at any point and are re-delivered at least once. The directory is
+    locked so a second process cannot share it; use RedisWearBuffer when
+    several API processes record wears.
+    """
+
+    def __init__(self, directory: str = "cache/wear_events", fsync: bool = True):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._lock_file = open(os.path.join(directory, "LOCK"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RuntimeError(
+                f"The wear journal in {directory} is locked by another process. The journal buffer "
+                "supports one API process only: run a single worker, or set WEAR_BUFFER_BACKEND=redis "
+                "(the default when REDIS_URL is set) for several."
+            )
+        self._pending = _PendingWears()
+        # Taken but unacknowledged batches, oldest first, including any left by a crash
+        self._batches: Dict[str, List[WearEvent]] = {}
+        for name in sorted(os.listdir(directory), key=lambda name: os.path.getmtime(os.path.join(directory, name))):
+            if name.endswith(".batch"):
+                self._batches[name[:-len(".batch")]] = _read_events(os.path.join(directory, name))
+        self._journal_path = os.path.join(directory, "journal.jsonl")
+        self._events = _read_events(self._journal_path) if os.path.exists(self._journal_path) else []
+        for events in [*self._batches.values(), self._events]:
+            self._pending.add(events)
+        self._journal = open(self._journal_path, "a")
+
+    def append(self, event: WearEvent) -> None:
+        line = json.dumps(asdict(event)) + "\n"
+        with self._lock:
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._events.append(event)
+            self._pending.add([event])
+
+    def take(self) -> Optional[Tuple[str, List[WearEvent]]]:
+        """The oldest unacknowledged batch, or a new one holding every journaled event."""
+        with self._lock:
+            if self._batches:
+                batch_id = next(iter(self._batches))
+                return batch_id, self._batches[batch_id]
+            if not self._events:
+                return None
+            batch_id = uuid.uuid4().hex
+            self._journal.close()
+            os.replace(self._journal_path, os.path.join(self.directory, batch_id + ".batch"))
+            self._journal = open(self._journal_path, "a")
+            self._batches[batch_id], self._events = self._events, []
+            return batch_id, self._batches[batch_id]
+
+    def ack(self, batch_id: str) -> None:
+        with self._lock:
+            events = self._batches.pop(batch_id, None)
+            if events is None:
+                return
+            self._pending.remove(events)
+            os.remove(os.path.join(self.directory, batch_id + ".batch"))
+
+    def pending(self, kind: str, ids: Iterable[int]) -> Dict[int, Tuple[int, float]]:
+        """Buffered (wear count, latest wear time) by id, for ids with unflushed wears."""
+        with self._lock:
+            return self._pending.get(kind, ids)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._events) + sum(len(events) for events in self._batches.values())
+
+# KEYS: events, batch list, batch set; ARGV: take time, batch id
+_TAKE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('RENAME', KEYS[1], KEYS[2])
+redis.call('ZADD', KEYS[3], ARGV[1], ARGV[2])
+return 1
+"""
+
+# KEYS: batch set, batch list, counts, latest; ARGV: batch id, then field/count pairs
+_ACK_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then return 0 end
+redis.call('DEL', KEYS[2])
+for i = 2, #ARGV, 2 do
+    if redis.call('HINCRBY', KEYS[3], ARGV[i], -tonumber(ARGV[i + 1])) <= 0 then
+        redis.call('HDEL', KEYS[3], ARGV[i])
+        redis.call('HDEL', KEYS[4], ARGV[i])
+    end
+end
+return 1
+"""
+
+class RedisWearBuffer:
+    """Wear events in a Redis list shared by every API process.
+
+    ``take`` atomically renames the list to a batch key and records it in a
+    sorted set by take time; ``ack`` deletes it after the batch is committed.
+    A batch not acknowledged within ``stale_after`` seconds (its flusher
+    died) is handed out again. Pending counts live in hashes updated in the
+    same transaction as the append and released by ``ack``.
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "wearmind:wear:", stale_after: float = 60.0):
+        import redis
+
+        # Same variable and default as Settings.REDIS_URL
+        self.client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self.prefix = prefix
+        self.stale_after = stale_after
+        self._take = self.client.register_script(_TAKE_SCRIPT)
+        self._ack = self.client.register_script(_ACK_SCRIPT)
+
+    def _key(self, name: str) -> str:
+        return self.prefix + name
+
+    def append(self, event: WearEvent) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.rpush(self._key("events"), json.dumps(asdict(event)))
+        for kind, item_id in event.keys():
+            pipe.hincrby(self._key("count"), f"{kind}:{item_id}", 1)
+            pipe.hset(self._key("latest"), f"{kind}:{item_id}", event.worn_at)
+        pipe.execute()
+
+    def _events(self, batch_id: str) -> List[WearEvent]:
+        return [WearEvent(**json.loads(value)) for value in self.client.lrange(self._key("batch:" + batch_id), 0, -1)]
+
+    def take(self) -> Optional[Tuple[str, List[WearEvent]]]:
+        now = time.time()
+        stale = self.client.zrangebyscore(self._key("batches"), "-inf", now - self.stale_after, start=0, num=1)
+        if stale:
+            batch_id = stale[0].decode()
+            # Claim it so other flushers leave it alone for another stale_after
+            self.client.zadd(self._key("batches"), {batch_id: now}, xx=True)
+            return batch_id, self._events(batch_id)
+        batch_id = uuid.uuid4().hex
+        keys = [self._key("events"), self._key("batch:" + batch_id), self._key("batches")]
+        if not self._take(keys=keys, args=[now, batch_id]):
+            return None
+        return batch_id, self._events(batch_id)
+
+    def ack(self, batch_id: str) -> None:
+        counts: Dict[str, int] = {}
+        for event in self._events(batch_id):
+            for kind, item_id in event.keys():
+                counts[f"{kind}:{item_id}"] = counts.get(f"{kind}:{item_id}", 0) + 1
+        keys = [self._key("batches"), self._key("batch:" + batch_id), self._key("count"), self._key("latest")]
+        self._ack(keys=keys, args=[batch_id, *(value for pair in counts.items() for value in pair)])
+
+    def pending(self, kind: str, ids: Iterable[int]) -> Dict[int, Tuple[int, float]]:
+        ids = list(ids)
+        if not ids:
+            return {}
+        fields = [f"{kind}:{item_id}" for item_id in ids]
+        counts = self.client.hmget(self._key("count"), fields)
+        latest = self.client.hmget(self._key("latest"), fields)
+        return {
+            item_id: (int(count), float(worn_at or 0))
+            for item_id, count, worn_at in zip(ids, counts, latest)
+            if count is not None and int(count) > 0
+        }
+
+    def size(self) -> int:
+        batches = self.client.zrange(self._key("batches"), 0, -1)
+        return self.client.llen(self._key("events")) + sum(
+            self.client.llen(self._key("batch:" + batch_id.decode())) for batch_id in batches
+        )
+
+def create_wear_buffer(settings: Any):
+    """The wear buffer described by the WEAR_* settings."""
+    if settings.WEAR_BUFFER_BACKEND == "redis":
+        return RedisWearBuffer(settings.REDIS_URL)
+    if settings.WEAR_BUFFER_BACKEND == "journal":
+        return JournalWearBuffer(settings.WEAR_JOURNAL_DIR, fsync=settings.WEAR_JOURNAL_FSYNC)
+    raise ValueError(f"Unknown WEAR_BUFFER_BACKEND: {settings.WEAR_BUFFER_BACKEND}")
+
+def _aggregate(wears: Iterable[Tuple[int, float]]) -> Dict[int, Tuple[int, float]]:
+    totals: Dict[int, Tuple[int, float]] = {}
+    for item_id, worn_at in wears:
+        count, latest = totals.get(item_id, (0, 0.0))
+        totals[item_id] = (count + 1, max(latest, worn_at))
+    return totals
+
+def _wear_update(model: Any):
+    """UPDATE adding ``b_count`` wears at ``b_worn`` to row ``b_id``, executed once per batch with many rows."""
+    table = model.__table__
+    worn_at = bindparam("b_worn")
+    return update(table).where(table.c.id == bindparam("b_id")).values(
+        wear_count=func.coalesce(table.c.wear_count, 0) + bindparam("b_count"),
+        # Late-arriving events never move last_worn backwards
+        last_worn=case(
+            (or_(table.c.last_worn.is_(None), table.c.last_worn < worn_at), worn_at),
+            else_=table.c.last_worn
+        )
+    )
+
+def apply_batch(db: Any, batch_id: str, events: List[WearEvent]) -> bool:
+    """Add a batch of events to the wear counts in one transaction; False if it was applied before.
+
+    Events are coalesced to one row per outfit and item, and each table gets
+    a single executemany UPDATE, with rows in id order so concurrent
+    flushers lock them in the same order.
+    """
+    try:
+        db.execute(insert(WearEventBatch).values(id=batch_id, event_count=len(events), applied_at=datetime.utcnow()))
+    except IntegrityError:
+        db.rollback()
+        return False
+    for kind, model in WEAR_KINDS.items():
+        totals = _aggregate((item_id, event.worn_at) for event in events for key, item_id in event.keys() if key == kind)
+        if totals:
+            db.execute(_wear_update(model), [
+                {"b_id": item_id, "b_count": count, "b_worn": _utc(latest)}
+                for item_id, (count, latest) in sorted(totals.items())
+            ])
+    db.commit()
+    return True
+
+class WearEventFlusher:
+    """Periodically drains a wear buffer into the database.
+
+    Every ``interval`` seconds each waiting batch is applied with
+    ``apply_batch`` and then acknowledged. A batch that fails stays in the
+    buffer and is retried on the next tick; one that committed but was not
+    acknowledged is recognized by its id and only acknowledged.
+    """
+
+    def __init__(
+        self,
+        buffer: Any,
+        session_factory: Callable[[], Any],
+        interval: float = 1.0,
+        batch_retention: timedelta = timedelta(days=7)
+    ):
+        self.buffer = buffer
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_retention = batch_retention
+        self.batches = 0
+        self.events = 0
+        self.last_error: Optional[str] = None
+        self._last_prune = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flush_lock = threading.Lock()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="wear-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread after a last flush."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as exc:
+                # Left in the buffer; retried on the next tick
+                self.last_error = repr(exc)
+
+    def flush(self) -> int:
+        """Apply every waiting batch; returns the number of events applied."""
+        applied = 0
+        with self._flush_lock:
+            while True:
+                batch = self.buffer.take()
+                if batch is None:
+                    break
+                batch_id, events = batch
+                with self.session_factory() as db:
+                    if apply_batch(db, batch_id, events):
+                        applied += len(events)
+                        self.batches += 1
+                self.buffer.ack(batch_id)
+            self.events += applied
+            if time.time() - self._last_prune > 3600:
+                self._prune()
+        return applied
+
+    def _prune(self) -> None:
+        with self.session_factory() as db:
+            db.execute(delete(WearEventBatch).where(WearEventBatch.applied_at < datetime.utcnow() - self.batch_retention))
+            db.commit()
+        self._last_prune = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered_events": self.buffer.size(),
+            "applied_batches": self.batches,
+            "applied_events": self.events,
+            "last_error": self.last_error,
+        }
+
+def with_pending_wears(buffer: Any, kind: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add buffered wears to serialized rows (dicts with ``id``, ``wear_count`` and ``last_worn``).
+
+    Between a batch's commit and its acknowledgement, a moment per flush,
+    its wears are counted twice.
+    """
+    pending = buffer.pending(kind, [row["id"] for row in rows])
+    for row in rows:
+        if row["id"] in pending:
+            count, latest = pending[row["id"]]
+            row["wear_count"] = (row["wear_count"] or 0) + count
+            latest = _utc(latest).isoformat()
+            row["last_worn"] = max(row["last_worn"] or latest, latest)
+    return rows
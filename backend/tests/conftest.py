@@ -0,0 +1,30 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# app/ lives in backend/, the ai/ package at the repository root
+sys.path[:0] = [BACKEND, os.path.dirname(BACKEND)]
+# Settings read DATABASE_URL when app.core.database is first imported
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="wearmind-tests-"), "test.db")
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.wardrobe import WardrobeItem  # noqa: E402
+
+WARDROBE_SIZE = 20
+
+@pytest.fixture
+def db():
+    """A session on a fresh schema with user 1 owning WARDROBE_SIZE items."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as session:
+        session.add(User(id=1, email="test@example.com", hashed_password="", full_name="Test"))
+        session.execute(WardrobeItem.__table__.insert(), [
+            {"id": i, "owner_id": 1, "name": f"item {i}", "image_path": ""} for i in range(1, WARDROBE_SIZE + 1)
+        ])
+        session.commit()
+        yield session
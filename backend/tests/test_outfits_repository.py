@@ -0,0 +1,55 @@
+from app.core.database import QueryCounter
+from app.models.wardrobe import Outfit
+from app.repositories.outfits import NewOutfit, get_outfits, list_outfits, save_outfits
+
+def new_outfits(count: int):
+    # Item ids deliberately out of numeric order, to check position ordering
+    return [NewOutfit(name=f"outfit {n}", item_ids=[(n + 5) % 20 + 1, n % 20 + 1, (n + 11) % 20 + 1]) for n in range(count)]
+
+def test_save_outfits_batches_item_inserts(db):
+    outfits = new_outfits(30)
+    with QueryCounter() as queries:
+        ids = save_outfits(db, 1, outfits)
+    db.commit()
+    assert len(ids) == 30 and ids == sorted(ids)
+    # SQLite can't order RETURNING rows, so outfits go in one per row; the items stay one statement
+    assert queries.count == len(outfits) + 1
+    assert sum("INSERT INTO outfit_items" in statement for statement in queries.statements) == 1
+
+def test_saved_items_keep_their_positions(db):
+    outfits = new_outfits(5)
+    ids = save_outfits(db, 1, outfits)
+    db.commit()
+    db.expire_all()
+    for outfit_id, outfit in zip(ids, outfits):
+        assert [item.id for item in db.get(Outfit, outfit_id).items] == list(outfit.item_ids)
+
+def test_page_loads_items_in_two_queries(db):
+    outfits = new_outfits(40)
+    ids = save_outfits(db, 1, outfits)
+    db.commit()
+    db.expire_all()
+    with QueryCounter() as queries:
+        page = list_outfits(db, 1, limit=25)
+        loaded = {outfit.id: [item.id for item in outfit.items] for outfit in page.outfits}
+    assert queries.count == 2
+    assert len(page.outfits) == 25 and page.next_cursor is not None
+    expected = dict(zip(ids, (list(outfit.item_ids) for outfit in outfits)))
+    assert all(items == expected[outfit_id] for outfit_id, items in loaded.items())
+
+    with QueryCounter() as queries:
+        rest = list_outfits(db, 1, limit=25, cursor=page.next_cursor)
+    assert queries.count == 2
+    assert len(rest.outfits) == 15 and rest.next_cursor is None
+
+def test_get_outfits_in_two_queries_and_requested_order(db):
+    ids = save_outfits(db, 1, new_outfits(10))
+    db.commit()
+    db.expire_all()
+    wanted = [ids[7], ids[2], 10_000, ids[5]]
+    with QueryCounter() as queries:
+        outfits = get_outfits(db, wanted)
+        for outfit in outfits:
+            outfit.items
+    assert queries.count == 2
+    assert [outfit.id for outfit in outfits] == [ids[7], ids[2], ids[5]]
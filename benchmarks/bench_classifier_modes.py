@@ -0,0 +1,55 @@
+"""Latency and throughput of each classifier inference mode on CPU.
+
+Latency is a single image per forward pass; throughput uses ``--batch-size``.
+"""
+import argparse
+import time
+
+import torch
+
+from ai.clothing_recognition.optimize import INFERENCE_MODES, InferenceConfig, apply_thread_settings, optimize_model
+from ai.clothing_recognition.service import ClothingRecognitionService
+from benchmarks._common import ensure_classifier_weights
+
+def measure(model: torch.nn.Module, batch: torch.Tensor, iterations: int) -> float:
+    """Mean seconds per forward pass after warm-up."""
+    with torch.no_grad():
+        for _ in range(3):
+            model(batch)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            model(batch)
+    return (time.perf_counter() - start) / iterations
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default="models/clothing_classifier.pth")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--interop-threads", type=int)
+    parser.add_argument("--modes", default=",".join(INFERENCE_MODES))
+    args = parser.parse_args()
+
+    apply_thread_settings(InferenceConfig(num_threads=args.threads, num_interop_threads=args.interop_threads))
+    service = ClothingRecognitionService(model_path=ensure_classifier_weights(args.model_path))
+    reference = service.base_model.cpu()
+
+    single = torch.randn(1, 3, 224, 224)
+    batch = torch.randn(args.batch_size, 3, 224, 224)
+    calibration = [torch.randn(8, 3, 224, 224) for _ in range(4)]
+
+    print(f"threads: {torch.get_num_threads()} intra-op, {torch.get_num_interop_threads()} inter-op")
+    print(f"{'mode':>30} {'p1 latency ms':>14} {'img/s @' + str(args.batch_size):>12}")
+    for mode in args.modes.split(","):
+        for channels_last in (False, True):
+            config = InferenceConfig(mode=mode, channels_last=channels_last)
+            model = optimize_model(reference, config, single, calibration)
+            memory_format = torch.channels_last if channels_last else torch.contiguous_format
+            latency = measure(model, single.contiguous(memory_format=memory_format), args.iterations)
+            throughput = args.batch_size / measure(model, batch.contiguous(memory_format=memory_format), max(1, args.iterations // 4))
+            label = mode + (" + channels_last" if channels_last else "")
+            print(f"{label:>30} {latency * 1000:>14.1f} {throughput:>12.1f}")
+
+if __name__ == "__main__":
+    main()
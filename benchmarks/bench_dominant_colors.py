@@ -0,0 +1,66 @@
+"""Latency of dominant-color extraction: histogram ColorEngine vs legacy k-means.
+
+Synthetic garment photos are built from blocks of known palette colors on a
+near-white background, so the script also reports how often each method names
+the garment's main color.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ai.clothing_recognition.colors import PALETTE, ColorEngine
+from ai.clothing_recognition.image import DecodedImage
+from ai.clothing_recognition.service import ClothingRecognitionService
+
+def synthetic_garment(rng: np.random.Generator, width: int, height: int):
+    """Return (rgb, main_color_name) for a noisy two-color garment on white."""
+    names = list(PALETTE)
+    main, accent = rng.choice(len(names), size=2, replace=False)
+    image = np.full((height, width, 3), 250, dtype=np.int16)
+    top, bottom = height // 8, height - height // 8
+    left, right = width // 6, width - width // 6
+    image[top:bottom, left:right] = PALETTE[names[main]]
+    image[top:top + (bottom - top) // 4, left:right] = PALETTE[names[accent]]
+    image += rng.integers(-8, 9, size=image.shape, dtype=np.int16)
+    return np.clip(image, 0, 255).astype(np.uint8), names[main]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--skip-kmeans", action="store_true", help="the legacy path takes seconds per 12MP image")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    samples = [synthetic_garment(rng, args.width, args.height) for _ in range(args.images)]
+
+    engine = ColorEngine()
+    # Only the legacy method and color table are needed, not the classifier
+    legacy = ClothingRecognitionService.__new__(ClothingRecognitionService)
+    legacy.colors = {name: PALETTE[name] for name in PALETTE}
+
+    methods = {"histogram": lambda image: engine.dominant_colors(image)}
+    if not args.skip_kmeans:
+        methods["kmeans"] = lambda image: legacy._get_dominant_colors_kmeans(image)
+
+    print(f"{args.images} images at {args.width}x{args.height}")
+    for name, extract in methods.items():
+        latencies, correct = [], 0
+        for rgb, expected in samples:
+            # Fresh wrapper so the downscale is paid inside the timing
+            image = DecodedImage(rgb=rgb)
+            start = time.perf_counter()
+            colors = extract(image)
+            latencies.append(time.perf_counter() - start)
+            correct += expected in colors
+        latencies_ms = np.array(latencies) * 1000
+        print(
+            f"{name:>10}: p50 {np.percentile(latencies_ms, 50):8.1f} ms  "
+            f"p95 {np.percentile(latencies_ms, 95):8.1f} ms  "
+            f"main color found {correct}/{len(samples)}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Bytes and time to fill a wardrobe grid from originals versus stored derivatives.
+
+Uploads phone-sized photos through /api/images, then loads a grid of them
+four ways: the full-size originals the grids used before, the WebP and AVIF
+thumbnails, and a repeat visit revalidating the thumbnails by ETag (304s). A
+second upload of the same photos shows the content-hash dedup, e.g.
+
+    python -m benchmarks.bench_image_store --photos 24
+    AWS_S3_ENDPOINT_URL=http://localhost:5000 python -m benchmarks.bench_image_store --storage s3 --bucket bench
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+def photo(rng, size=(3024, 4032)) -> bytes:
+    """A JPEG that compresses like a photo: smooth shading plus sensor noise."""
+    from PIL import Image
+
+    small = rng.integers(0, 256, size=(12, 9, 3), dtype=np.uint8)
+    image = Image.fromarray(small).resize(size, Image.BICUBIC)
+    pixels = np.asarray(image).astype(np.int16) + rng.integers(-6, 7, size=(size[1], size[0], 3))
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+def load_grid(client, urls, headers=None):
+    start = time.perf_counter()
+    total = 0
+    statuses = set()
+    for url in urls:
+        response = client.get(url, headers=headers or {})
+        statuses.add(response.status_code)
+        total += len(response.content)
+    return total, time.perf_counter() - start, statuses
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=24)
+    parser.add_argument("--storage", choices=["local", "s3"], default="local")
+    parser.add_argument("--bucket", default="wearmind-bench")
+    args = parser.parse_args()
+
+    os.environ["IMAGE_STORAGE"] = args.storage
+    os.environ["IMAGE_DIR"] = tempfile.mkdtemp(prefix="wearmind-bench-images-")
+    os.environ["AWS_S3_BUCKET"] = args.bucket
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api import images
+    from app.core.images import image_store
+
+    if args.storage == "s3":
+        store = image_store()
+        store.backend.client.create_bucket(Bucket=args.bucket)
+
+    app = FastAPI()
+    app.include_router(images.router, prefix="/api/images")
+    client = TestClient(app)
+
+    rng = np.random.default_rng(0)
+    photos = [photo(rng) for _ in range(args.photos)]
+    start = time.perf_counter()
+    uploads = [client.post("/api/images", files={"file": (f"{i}.jpg", data, "image/jpeg")}).json()
+               for i, data in enumerate(photos)]
+    upload_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for i, data in enumerate(photos):
+        client.post("/api/images", files={"file": (f"again-{i}.jpg", data, "image/jpeg")})
+    dedup_time = time.perf_counter() - start
+    print(f"upload with derivatives: {upload_time / args.photos * 1000:8.1f} ms/photo")
+    print(f"re-upload (deduplicated): {dedup_time / args.photos * 1000:8.1f} ms/photo")
+
+    originals = [upload["urls"]["original"] for upload in uploads]
+    thumbs = [upload["urls"]["thumb"] for upload in uploads]
+    rows = [
+        ("originals", originals, {}),
+        ("thumbs (webp)", thumbs, {"Accept": "image/webp,*/*"}),
+        ("thumbs (avif)", thumbs, {"Accept": "image/avif,image/webp,*/*"}),
+    ]
+    baseline = None
+    for label, urls, headers in rows:
+        total, elapsed, statuses = load_grid(client, urls, headers)
+        baseline = baseline or total
+        print(f"{label:>16}: {total / 1024:10.1f} KiB {elapsed * 1000:8.1f} ms  {baseline / total:6.1f}x smaller  {sorted(statuses)}")
+
+    etags = [client.get(url, headers={"Accept": "image/avif"}).headers["etag"] for url in thumbs]
+    start = time.perf_counter()
+    statuses = {client.get(url, headers={"Accept": "image/avif", "If-None-Match": etag}).status_code
+                for url, etag in zip(thumbs, etags)}
+    print(f"{'revalidated':>16}: {0:10.1f} KiB {(time.perf_counter() - start) * 1000:8.1f} ms  {sorted(statuses)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Images/sec of the clothing classifier at different batch sizes on CPU.
+
+Measures the classification forward pass alone and, with ``--end-to-end``,
+``detect_clothing_batch`` including color and pattern analysis. A micro-batched
+run with concurrent single-image callers is reported for comparison.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+from PIL import Image
+
+from ai.clothing_recognition.service import ClothingRecognitionService
+from benchmarks._common import best_of, ensure_classifier_weights, synthetic_images
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default="models/clothing_classifier.pth")
+    parser.add_argument("--batch-sizes", default="1,8,32,64")
+    parser.add_argument("--images", type=int, default=128)
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads())
+    parser.add_argument("--end-to-end", action="store_true")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    service = ClothingRecognitionService(model_path=ensure_classifier_weights(args.model_path))
+    service.device = torch.device("cpu")
+    service.model = service.model.to(service.device)
+
+    paths = synthetic_images(args.images)
+    tensors = [service.preprocess(Image.open(path).convert("RGB")) for path in paths]
+
+    print(f"CPU threads: {args.threads}, images: {args.images}")
+    print(f"{'batch':>6} {'classify img/s':>15} {'end-to-end img/s':>17}")
+    for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+        def classify():
+            for start in range(0, len(tensors), batch_size):
+                service._classify_tensors(tensors[start:start + batch_size])
+
+        classify()  # warm up allocator and kernels for this shape
+        classify_rate = len(tensors) / best_of(classify)
+
+        end_to_end = ""
+        if args.end_to_end:
+            service.max_batch_size = batch_size
+            elapsed = best_of(lambda: service.detect_clothing_batch(paths), repeats=1)
+            end_to_end = f"{len(paths) / elapsed:.1f}"
+
+        print(f"{batch_size:>6} {classify_rate:>15.1f} {end_to_end:>17}")
+
+    # Concurrent single-image callers merged by the micro-batcher
+    batch_size = max(int(size) for size in args.batch_sizes.split(","))
+    service.enable_micro_batching(max_batch_size=batch_size, max_wait_ms=10.0)
+    with ThreadPoolExecutor(max_workers=batch_size) as pool:
+        elapsed = best_of(lambda: list(pool.map(service._batcher, tensors)))
+    service.disable_micro_batching()
+    print(f"micro-batched ({batch_size} concurrent callers): {len(tensors) / elapsed:.1f} img/s")
+
+if __name__ == "__main__":
+    main()
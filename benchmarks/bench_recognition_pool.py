@@ -0,0 +1,62 @@
+"""Throughput and memory of RecognitionProcessPool as the worker count grows.
+
+RSS counts shared pages once per process, so it over-states the real cost of
+forked workers; PSS splits shared pages between the processes mapping them and
+is the number that shows whether the weights are really shared. Linux only.
+"""
+import argparse
+import os
+import time
+
+from ai.clothing_recognition.pool import RecognitionProcessPool
+from ai.clothing_recognition.service import ClothingRecognitionService
+from benchmarks._common import ensure_classifier_weights, synthetic_images
+
+def child_pids(pid: int):
+    pids = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            pids.extend(int(child) for child in f.read().split())
+    return pids
+
+def memory_kb(pid: int):
+    """(RSS, PSS) of a process in kB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values["Rss"], values["Pss"]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default="models/clothing_classifier.pth")
+    parser.add_argument("--workers", default=f"1,2,4,{os.cpu_count()}")
+    parser.add_argument("--images", type=int, default=256)
+    args = parser.parse_args()
+
+    service = ClothingRecognitionService(model_path=ensure_classifier_weights(args.model_path))
+    paths = synthetic_images(args.images)
+    parent_rss, parent_pss = memory_kb(os.getpid())
+    print(f"parent after model load: RSS {parent_rss / 1024:.0f} MB, PSS {parent_pss / 1024:.0f} MB")
+
+    print(f"{'workers':>8} {'img/s':>8} {'total RSS MB':>13} {'total PSS MB':>13} {'PSS/worker MB':>14}")
+    for num_workers in sorted({int(n) for n in args.workers.split(",")}):
+        with RecognitionProcessPool(service, num_workers=num_workers) as pool:
+            start = time.perf_counter()
+            for _ in pool.map(paths):
+                pass
+            throughput = len(paths) / (time.perf_counter() - start)
+
+            workers = [memory_kb(pid) for pid in child_pids(os.getpid())]
+            total_rss = parent_rss + sum(rss for rss, _ in workers)
+            total_pss = memory_kb(os.getpid())[1] + sum(pss for _, pss in workers)
+            per_worker = sum(pss for _, pss in workers) / max(1, len(workers))
+            print(
+                f"{num_workers:>8} {throughput:>8.1f} {total_rss / 1024:>13.0f} "
+                f"{total_pss / 1024:>13.0f} {per_worker / 1024:>14.0f}"
+            )
+
+if __name__ == "__main__":
+    main()
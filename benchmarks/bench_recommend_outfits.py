@@ -0,0 +1,43 @@
+"""Latency of recommend_outfits as the wardrobe grows.
+
+Reports the one-off cost of building the wardrobe index and the per-call
+latency with a cold index (no wardrobe version) and a cached one.
+"""
+import argparse
+import time
+
+from ai.style_recommendation.service import StyleRecommendationService
+from ai.style_recommendation.wardrobe_index import WardrobeIndex
+from benchmarks._common import ensure_style_weights, synthetic_wardrobe
+
+def per_call_ms(fn, calls: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default="models/style_recommender.pth")
+    parser.add_argument("--sizes", default="50,500,5000")
+    parser.add_argument("--recommendations", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    service = StyleRecommendationService(model_path=ensure_style_weights(args.model_path))
+    weather = {"temperature": 10, "humidity": 60, "precipitation": 0}
+
+    print(f"{'items':>6} {'index build ms':>15} {'cold index ms':>14} {'cached index ms':>16}")
+    for size in [int(n) for n in args.sizes.split(",")]:
+        wardrobe = synthetic_wardrobe(size)
+        build_ms = per_call_ms(lambda: WardrobeIndex(wardrobe), max(1, args.calls // 5))
+
+        cold = {"id": 1, "height": 170, "weight": 60, "wardrobe": wardrobe}
+        cached = dict(cold, wardrobe_version=f"v{size}")
+        cold_ms = per_call_ms(lambda: service.recommend_outfits(cold, weather, "casual", args.recommendations), args.calls)
+        cached_ms = per_call_ms(lambda: service.recommend_outfits(cached, weather, "casual", args.recommendations), args.calls)
+        print(f"{size:>6} {build_ms:>15.2f} {cold_ms:>14.2f} {cached_ms:>16.2f}")
+
+if __name__ == "__main__":
+    main()
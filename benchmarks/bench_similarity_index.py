@@ -0,0 +1,86 @@
+"""Recall vs latency of the garment similarity index.
+
+Builds an EmbeddingStore of synthetic clustered unit vectors (garment
+embeddings cluster by category and style in the same way), then reports
+per-query latency of exact search and recall@k / latency of the ivf index
+for a range of ``nprobe`` values. Also times incremental adds and deletes.
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from ai.clothing_recognition.embedding_store import EmbeddingStore
+from ai.clothing_recognition.similarity import SimilarityIndex
+
+def synthetic_embeddings(count: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 65536):
+        size = min(65536, count - start)
+        labels = rng.integers(0, clusters, size)
+        vectors[start:start + size] = centers[labels] + rng.normal(scale=0.6, size=(size, dim))
+    return vectors
+
+def per_query(index: SimilarityIndex, queries: np.ndarray, k: int):
+    start = time.perf_counter()
+    results = [index.search(query, k)[0] for query in queries]
+    return results, (time.perf_counter() - start) / len(queries)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=2048)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int)
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32,64")
+    args = parser.parse_args()
+
+    store = EmbeddingStore(tempfile.mkdtemp(prefix="wearmind-bench-embeddings-"), dim=args.dim)
+    vectors = synthetic_embeddings(args.count, args.dim, args.clusters)
+    start = time.perf_counter()
+    for offset in range(0, args.count, 10_000):
+        store.add(range(offset, min(offset + 10_000, args.count)), vectors[offset:offset + 10_000])
+    store.flush()
+    print(f"stored {args.count} x {args.dim} float16 in {time.perf_counter() - start:.1f}s "
+          f"({args.count * args.dim * 2 / 2**20:.0f} MiB on disk)")
+
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(args.count, args.queries, replace=False)] + rng.normal(
+        scale=0.3, size=(args.queries, args.dim)
+    ).astype(np.float32)
+    del vectors
+
+    exact = SimilarityIndex(store, mode="exact")
+    truth, exact_latency = per_query(exact, queries, args.k)
+    print(f"\n{'mode':>12} {'recall@' + str(args.k):>10} {'ms/query':>10}")
+    print(f"{'exact':>12} {1.0:>10.3f} {exact_latency * 1e3:>10.2f}")
+
+    ivf = SimilarityIndex(store, mode="ivf", nlist=args.nlist)
+    start = time.perf_counter()
+    ivf.train()
+    print(f"{'':>12} (ivf trained with nlist={ivf.nlist} in {time.perf_counter() - start:.1f}s)")
+    for nprobe in (int(value) for value in args.nprobe.split(",")):
+        ivf.nprobe = nprobe
+        results, latency = per_query(ivf, queries, args.k)
+        recall = np.mean([
+            len({item_id for item_id, _ in found} & {item_id for item_id, _ in expected}) / args.k
+            for found, expected in zip(results, truth)
+        ])
+        print(f"{'ivf/' + str(nprobe):>12} {recall:>10.3f} {latency * 1e3:>10.2f}")
+
+    new_vectors = synthetic_embeddings(1000, args.dim, args.clusters, seed=2)
+    start = time.perf_counter()
+    ivf.add(range(args.count, args.count + 1000), new_vectors)
+    add_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    ivf.delete(range(0, 1000))
+    delete_seconds = time.perf_counter() - start
+    print(f"\nincremental: add 1000 in {add_seconds * 1e3:.1f} ms, delete 1000 in {delete_seconds * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    main()
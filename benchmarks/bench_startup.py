@@ -0,0 +1,78 @@
+"""Cold-start cost of each AI service, measured in a fresh interpreter.
+
+For every service this reports the time to import its module, to construct it
+through the model registry, and to serve the first and second inference. The
+registry's own import time shows what a process pays before any service is used.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks._common import ensure_classifier_weights, ensure_style_weights, synthetic_images
+
+PROBE = r"""
+import json, sys, time
+name, model_path, image_path = sys.argv[1:4]
+timings = {}
+
+start = time.perf_counter()
+from ai.registry import SERVICES, registry
+timings["registry_import"] = time.perf_counter() - start
+
+module_name, _, attribute = SERVICES[name].partition(":")
+start = time.perf_counter()
+module = __import__(module_name, fromlist=[attribute])
+timings["module_import"] = time.perf_counter() - start
+
+service_cls = getattr(module, attribute)
+if name == "virtual_tryon":
+    registry.register(name, service_cls)
+else:
+    registry.register(name, lambda: service_cls(model_path=model_path))
+start = time.perf_counter()
+service = registry.get(name)
+timings["construct"] = time.perf_counter() - start
+
+def infer():
+    if name == "clothing_recognition":
+        service.detect_clothing(image_path)
+    elif name == "style_recommendation":
+        service.recommend_outfits({"height": 170, "weight": 60, "wardrobe": []}, {"temperature": 18}, "casual")
+    else:
+        service.generate_tryon(image_path, image_path, num_inference_steps=1)
+
+for label in ("first_inference", "second_inference"):
+    start = time.perf_counter()
+    infer()
+    timings[label] = time.perf_counter() - start
+
+print(json.dumps(timings))
+"""
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--services", default="clothing_recognition,style_recommendation")
+    parser.add_argument("--classifier-path", default="models/clothing_classifier.pth")
+    parser.add_argument("--style-path", default="models/style_recommender.pth")
+    args = parser.parse_args()
+
+    model_paths = {
+        "clothing_recognition": ensure_classifier_weights(args.classifier_path),
+        "style_recommendation": ensure_style_weights(args.style_path),
+        "virtual_tryon": "",
+    }
+    image_path = synthetic_images(1, size=(512, 512))[0]
+
+    columns = ["registry_import", "module_import", "construct", "first_inference", "second_inference"]
+    print(f"{'service':>22} " + " ".join(f"{column:>17}" for column in columns) + "   (seconds)")
+    for name in args.services.split(","):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE, name, model_paths[name], image_path],
+            check=True, capture_output=True, text=True
+        ).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        print(f"{name:>22} " + " ".join(f"{timings[column]:>17.3f}" for column in columns))
+
+if __name__ == "__main__":
+    main()
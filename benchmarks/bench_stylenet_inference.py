@@ -0,0 +1,73 @@
+"""StyleNet latency and cold start: torch vs the exported NumPy weights.
+
+Latency is timed in-process for a single feature row and for batches.
+Cold start is timed in a fresh interpreter per backend: importing the
+service module, constructing it and serving the first inference.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from ai.style_recommendation.numpy_model import export_npz
+from ai.style_recommendation.service import StyleRecommendationService
+from benchmarks._common import best_of, ensure_style_weights
+
+PROBE = r"""
+import json, sys, time
+model_path, numpy_path, backend = sys.argv[1:4]
+timings = {}
+start = time.perf_counter()
+from ai.style_recommendation.service import StyleRecommendationService
+timings["import"] = time.perf_counter() - start
+start = time.perf_counter()
+service = StyleRecommendationService(model_path=model_path, numpy_path=numpy_path, inference_backend=backend)
+timings["construct"] = time.perf_counter() - start
+start = time.perf_counter()
+service.recommend_outfits({"height": 170, "weight": 60, "wardrobe": []}, {"temperature": 18}, "casual")
+timings["first_inference"] = time.perf_counter() - start
+timings["torch_imported"] = "torch" in sys.modules
+print(json.dumps(timings))
+"""
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default="models/style_recommender.pth")
+    parser.add_argument("--batch-sizes", default="1,64,1024")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    model_path = ensure_style_weights(args.model_path)
+    numpy_path = export_npz(model_path, os.path.join(tempfile.mkdtemp(), "style.npz"))
+    services = {
+        backend: StyleRecommendationService(model_path=model_path, numpy_path=numpy_path, inference_backend=backend)
+        for backend in ("torch", "numpy")
+    }
+
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>8} " + " ".join(f"{backend + ' (us/row)':>18}" for backend in services))
+    for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+        features = rng.uniform(0, 100, size=(batch_size, 7)).astype(np.float32)
+        row = []
+        for service in services.values():
+            seconds = best_of(lambda: service._style_logits(features), repeats=args.repeats)
+            row.append(seconds / batch_size * 1e6)
+        print(f"{batch_size:>8} " + " ".join(f"{value:>18.2f}" for value in row))
+
+    columns = ["import", "construct", "first_inference"]
+    print(f"\n{'cold start':>10} " + " ".join(f"{column:>16}" for column in columns) + "   (seconds)")
+    for backend in services:
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE, model_path, numpy_path, backend],
+            check=True, capture_output=True, text=True
+        ).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        note = "" if timings["torch_imported"] else "   (torch never imported)"
+        print(f"{backend:>10} " + " ".join(f"{timings[column]:>16.3f}" for column in columns) + note)
+
+if __name__ == "__main__":
+    main()
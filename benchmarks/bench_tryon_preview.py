@@ -0,0 +1,54 @@
+"""Time to first image: generate_tryon vs the progressive preview mode.
+
+For each variant this reports when the first image is available and when
+the final full-resolution image is.
+"""
+import argparse
+import time
+
+from ai.virtual_tryon.service import VirtualTryOnService
+from benchmarks._common import synthetic_images
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--person-image")
+    parser.add_argument("--clothing-image")
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--preview-steps", type=int, default=6)
+    parser.add_argument("--preview-size", type=int, default=256)
+    parser.add_argument("--refine-strength", type=float, default=0.6)
+    args = parser.parse_args()
+
+    if args.person_image and args.clothing_image:
+        person_image, clothing_image = args.person_image, args.clothing_image
+    else:
+        person_image, clothing_image = synthetic_images(2, size=(512, 512))
+    service = VirtualTryOnService()
+    # Warm up both pipelines and the tiny VAE so loading isn't timed
+    for _ in service.generate_tryon_progressive(person_image, clothing_image, num_inference_steps=2, preview_steps=1):
+        pass
+
+    print(f"{'variant':>28} {'first image (s)':>16} {'final image (s)':>16}")
+    start = time.perf_counter()
+    service.generate_tryon(person_image, clothing_image, num_inference_steps=args.steps)
+    elapsed = time.perf_counter() - start
+    print(f"{'generate_tryon':>28} {elapsed:>16.2f} {elapsed:>16.2f}")
+
+    for tiny_vae in (False, True):
+        start = time.perf_counter()
+        times = []
+        for _stage, _image in service.generate_tryon_progressive(
+            person_image,
+            clothing_image,
+            num_inference_steps=args.steps,
+            preview_size=args.preview_size,
+            preview_steps=args.preview_steps,
+            refine_strength=args.refine_strength,
+            tiny_vae=tiny_vae
+        ):
+            times.append(time.perf_counter() - start)
+        label = "progressive" + (" + tiny VAE" if tiny_vae else "")
+        print(f"{label:>28} {times[0]:>16.2f} {times[-1]:>16.2f}")
+
+if __name__ == "__main__":
+    main()
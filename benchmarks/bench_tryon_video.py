@@ -0,0 +1,75 @@
+"""Per-frame wall time of try-on video generation.
+
+"per-frame calls" reproduces the old generate_video, which called
+generate_tryon once per frame (reloading both images, rebuilding the control
+image and re-encoding the prompts every time). "batched" shares that work
+across frames and batches them; "batched + latent reuse" also seeds frames
+from the first frame's latents so they need fewer denoising steps.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from ai.virtual_tryon.service import DEFAULT_PROMPT, VirtualTryOnService
+from benchmarks._common import synthetic_images
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--person-image")
+    parser.add_argument("--clothing-image")
+    parser.add_argument("--frames", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--refine-strength", type=float, default=0.4)
+    args = parser.parse_args()
+
+    if args.person_image and args.clothing_image:
+        person_image, clothing_image = args.person_image, args.clothing_image
+    else:
+        person_image, clothing_image = synthetic_images(2, size=(512, 512))
+    service = VirtualTryOnService()
+    output_dir = tempfile.mkdtemp(prefix="wearmind-bench-video-")
+
+    # One throwaway frame so model warm-up isn't charged to the first variant
+    service.generate_tryon(person_image, clothing_image, num_inference_steps=2)
+
+    def per_frame_calls():
+        frames = [
+            service.generate_tryon(
+                person_image,
+                clothing_image,
+                prompt=f"{DEFAULT_PROMPT}, pose {i+1}/{args.frames}",
+                num_inference_steps=args.steps
+            )
+            for i in range(args.frames)
+        ]
+        service._save_frames_as_video(frames, os.path.join(output_dir, "per_frame.mp4"))
+
+    def batched(refine_strength):
+        return lambda: service.generate_video(
+            person_image,
+            clothing_image,
+            num_frames=args.frames,
+            output_path=os.path.join(output_dir, "batched.mp4"),
+            num_inference_steps=args.steps,
+            batch_size=args.batch_size,
+            refine_strength=refine_strength
+        )
+
+    variants = [
+        ("per-frame calls", per_frame_calls),
+        ("batched", batched(None)),
+        ("batched + latent reuse", batched(args.refine_strength)),
+    ]
+    print(f"{args.frames} frames, {args.steps} steps, device {service.device}")
+    baseline = None
+    for label, run in variants:
+        start = time.perf_counter()
+        run()
+        per_frame = (time.perf_counter() - start) / args.frames
+        baseline = baseline or per_frame
+        print(f"{label:>24}: {per_frame:7.2f} s/frame ({baseline / per_frame:4.1f}x)")
+
+if __name__ == "__main__":
+    main()
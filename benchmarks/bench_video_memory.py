@@ -0,0 +1,70 @@
+"""Peak RSS of writing try-on videos: collected frames vs the streaming writer.
+
+Frames are synthetic PIL images produced at the pipeline's output size, so
+the numbers isolate the video path from the diffusion models. "collected"
+reproduces the old generate_video, which kept every frame in a list and
+wrote them at the end; "streaming" and "segmented" use StreamingVideoWriter.
+Each run happens in a fresh interpreter so peaks don't carry over.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+PROBE = r"""
+import json, os, resource, sys, tempfile
+import cv2
+import numpy as np
+from PIL import Image
+from ai.virtual_tryon.video import StreamingVideoWriter
+
+mode, frames, size = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+rng = np.random.default_rng(0)
+noise = rng.integers(0, 256, size=(size, size, 3), dtype=np.uint8)
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+output_dir = tempfile.mkdtemp()
+
+def frame(i):
+    # A new image per frame, like pipeline output
+    return Image.fromarray(np.roll(noise, i, axis=1))
+
+if mode == "collected":
+    collected = [frame(i) for i in range(frames)]
+    video = cv2.VideoWriter(os.path.join(output_dir, "out.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 30, (size, size))
+    for image in collected:
+        video.write(cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR))
+    video.release()
+else:
+    segment_seconds = 2.0 if mode == "segmented" else None
+    name = "out.m3u8" if segment_seconds else "out.mp4"
+    with StreamingVideoWriter(os.path.join(output_dir, name), segment_seconds=segment_seconds) as writer:
+        for i in range(frames):
+            writer.write(frame(i))
+
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is in KiB on Linux
+print(json.dumps({"peak_mib": peak / 1024, "growth_mib": (peak - baseline) / 1024}))
+"""
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", default="30,120,300")
+    parser.add_argument("--size", type=int, default=512)
+    args = parser.parse_args()
+
+    modes = ("collected", "streaming", "segmented")
+    print(f"{args.size}x{args.size} frames; peak RSS in MiB (growth over interpreter baseline)")
+    print(f"{'frames':>8} " + " ".join(f"{mode:>22}" for mode in modes))
+    for frames in (int(value) for value in args.frames.split(",")):
+        cells = []
+        for mode in modes:
+            output = subprocess.run(
+                [sys.executable, "-c", PROBE, mode, str(frames), str(args.size)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            cells.append(f"{result['peak_mib']:.0f} (+{result['growth_mib']:.0f})")
+        print(f"{frames:>8} " + " ".join(f"{cell:>22}" for cell in cells))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Top-1 agreement of each optimized classifier mode against the fp32 model.
+
+Point ``--images-dir`` at a folder of real garment photos; the first
+``--calibration`` of them calibrate static int8 and the rest are scored.
+Without it, synthetic images are used, which only checks the plumbing.
+"""
+import argparse
+import os
+
+import torch
+
+from ai.clothing_recognition.image import DecodedImage
+from ai.clothing_recognition.optimize import INFERENCE_MODES, InferenceConfig, optimize_model
+from ai.clothing_recognition.service import ClothingRecognitionService
+from benchmarks._common import ensure_classifier_weights, synthetic_images
+
+def load_batches(service: ClothingRecognitionService, paths, batch_size: int):
+    return [
+        torch.stack([service.preprocess(DecodedImage.from_source(path).pil) for path in paths[i:i + batch_size]])
+        for i in range(0, len(paths), batch_size)
+    ]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default="models/clothing_classifier.pth")
+    parser.add_argument("--images-dir")
+    parser.add_argument("--calibration", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-agreement", type=float, default=0.99)
+    args = parser.parse_args()
+
+    if args.images_dir:
+        paths = sorted(
+            os.path.join(args.images_dir, name) for name in os.listdir(args.images_dir)
+            if name.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))
+        )
+    else:
+        paths = synthetic_images(args.calibration + 128)
+    calibration_paths, eval_paths = paths[:args.calibration], paths[args.calibration:]
+
+    service = ClothingRecognitionService(model_path=ensure_classifier_weights(args.model_path))
+    reference = service.base_model.cpu()
+    calibration = load_batches(service, calibration_paths, args.batch_size)
+    batches = load_batches(service, eval_paths, args.batch_size)
+
+    with torch.no_grad():
+        expected = torch.cat([reference(batch).argmax(dim=1) for batch in batches])
+
+    print(f"{len(expected)} images scored against fp32 eager")
+    failed = False
+    for mode in INFERENCE_MODES:
+        for channels_last in (False, True):
+            config = InferenceConfig(mode=mode, channels_last=channels_last)
+            model = optimize_model(reference, config, batches[0][:1], calibration)
+            with torch.no_grad():
+                predicted = torch.cat([
+                    model(batch.contiguous(memory_format=torch.channels_last) if channels_last else batch).argmax(dim=1)
+                    for batch in batches
+                ])
+            agreement = (predicted == expected).float().mean().item()
+            failed |= agreement < args.min_agreement
+            label = mode + (" + channels_last" if channels_last else "")
+            print(f"{label:>30}: top-1 agreement {agreement:.2%}")
+
+    if failed:
+        raise SystemExit(f"some modes fell below {args.min_agreement:.0%} agreement")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Agreement of the NumPy StyleNet path with the torch model.
+
+Exports the checkpoint to a temporary ``.npz``, runs both backends on random
+feature rows in realistic ranges and compares logits and top-3 styles.
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import torch
+
+from ai.style_recommendation.model import StyleNet
+from ai.style_recommendation.numpy_model import NumpyStyleNet, export_npz, top_k
+from benchmarks._common import ensure_style_weights
+
+def random_features(count: int, seed: int = 0) -> np.ndarray:
+    """Rows shaped like _prepare_feature_matrix output."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(150, 200, count),       # height
+        rng.uniform(40, 120, count),        # weight
+        rng.integers(0, 7, count),          # preferred style
+        rng.uniform(-10, 40, count),        # temperature
+        rng.uniform(0, 100, count),         # humidity
+        rng.uniform(0, 20, count),          # precipitation
+        rng.choice([0.0, 0.3, 0.6, 0.9], count),  # occasion
+    ]).astype(np.float32)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default="models/style_recommender.pth")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    model_path = ensure_style_weights(args.model_path)
+    reference = StyleNet()
+    reference.load_state_dict(torch.load(model_path, map_location="cpu"))
+    reference.eval()
+    numpy_model = NumpyStyleNet(export_npz(model_path, os.path.join(tempfile.mkdtemp(), "style.npz")))
+
+    features = random_features(args.rows)
+    with torch.no_grad():
+        expected = reference(torch.from_numpy(features)).numpy()
+    actual = numpy_model(features)
+    single = np.stack([numpy_model(row) for row in features[:1000]])
+
+    # Compare relative to the logit scale so large inputs don't trip the check
+    scale = max(1.0, float(np.abs(expected).max()))
+    max_error = float(np.abs(actual - expected).max()) / scale
+    single_error = float(np.abs(single - expected[:1000]).max()) / scale
+    agreement = float((top_k(actual, 3) == top_k(expected, 3)).all(axis=1).mean())
+    print(f"{args.rows} rows: max relative logit error {max_error:.2e} (batched), {single_error:.2e} (single)")
+    print(f"top-3 styles identical for {agreement:.4%} of rows")
+
+    if max(max_error, single_error) > args.tolerance:
+        raise SystemExit(f"NumPy logits differ from torch by more than {args.tolerance}")
+
+if __name__ == "__main__":
+    main()
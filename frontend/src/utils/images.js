@@ -0,0 +1,21 @@
+// URLs served by the backend image store: /api/images/<sha256>/<variant>
+const STORED_IMAGE = /^(\/api\/images\/[0-9a-f]{64})(\/[^/]*)?$/;
+
+// Rendered width of one card in the 1 / 3 / 4 column grids
+export const GRID_SIZES = '(min-width: 1024px) 25vw, (min-width: 768px) 33vw, 100vw';
+
+// Attributes for a grid <img>: the 256px thumbnail by default and the
+// 1024px rendition only for screens that need it. The server picks AVIF or
+// WebP from the Accept header. Other URLs are passed through unchanged.
+export function gridImage(url) {
+  const match = url && url.match(STORED_IMAGE);
+  if (!match) {
+    return { src: url };
+  }
+  const base = match[1];
+  return {
+    src: `${base}/thumb`,
+    srcset: `${base}/thumb 256w, ${base}/medium 1024w`,
+    sizes: GRID_SIZES
+  };
+}